@@ -1,12 +1,18 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 import os
 import json
+import uuid
+from collections import deque
 
 from utils.logger import get_logger
 from utils.mock_llm import MockLLM
 from schemas.customer import CustomerProfile
 from schemas.email import EmailCampaign
-from config.settings import select_production_model
+from config.settings import select_production_model, BATCH_MAX_WORKERS, BATCH_MAX_SIZE, CHAT_MEMORY_MAX_TURNS
+from utils.cache import with_llm_cache, get_llm_cache
+from utils.concurrency import imap_bounded
+from utils.instrumentation import StageMetrics
+from orchestration.memory import SessionMemoryStore
 
 # Create Flask application
 app = Flask(__name__)
@@ -16,7 +22,10 @@ logger = get_logger(__name__)
 
 # Initialize the mock LLM for demo purposes
 SELECTED_MODEL = select_production_model()
-mock_llm = MockLLM(model_name=SELECTED_MODEL)
+mock_llm = with_llm_cache(MockLLM(model_name=SELECTED_MODEL))
+
+# Recent (user, assistant) turns per chat session
+chat_sessions = SessionMemoryStore(lambda: deque(maxlen=CHAT_MEMORY_MAX_TURNS))
 
 @app.route('/')
 def index():
@@ -39,6 +48,114 @@ def about():
     """About page with project information"""
     return render_template('about.html')
 
+# Generation stages in order: (streamed stage name, metrics stage name, prompt sent to the LLM)
+GENERATION_STAGES = [
+    ("insights", "analysis", "analyze customer data"),
+    ("draft", "generation", "generate personalized marketing email"),
+    ("final", "refinement", "optimize and refine marketing email")
+]
+
+def _build_email_payload(customer, customer_insights, email_draft, final_email, metrics):
+    """Build the API payload from the outputs of the three generation stages"""
+    # Extract subject line
+    with metrics.stage("subject_extraction"):
+        if "Subject:" in final_email:
+            email_subject = final_email.split("Subject:")[1].split("\n")[0].strip()
+        else:
+            email_subject = f"Special Offer for {customer.name} from Octopus Energy"
+    
+    return {
+        "email_subject": email_subject,
+        "email_body": final_email,
+        "customer_insights": customer_insights,
+        "draft_version": email_draft,
+        "final_version": final_email,
+        "metadata": metrics.as_metadata()
+    }
+
+def _generate_email_payload(customer):
+    """Run the three generation stages for a customer and build the API payload"""
+    metrics = StageMetrics()
+    
+    # Generate mock responses for each stage
+    outputs = []
+    for _, stage, prompt in GENERATION_STAGES:
+        with metrics.stage(stage):
+            output = mock_llm.invoke(prompt)
+        metrics.record_tokens(stage, prompt=prompt, completion=output)
+        outputs.append(output)
+    
+    return _build_email_payload(customer, *outputs, metrics)
+
+def _wants_stream():
+    """Whether the client asked for a Server-Sent Events response"""
+    return (
+        request.args.get("stream", "").lower() in ("1", "true", "yes")
+        or "text/event-stream" in request.headers.get("Accept", "")
+    )
+
+def _sse(event, data):
+    """Format a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _sse_response(events):
+    """Wrap an event generator in a non-buffered streaming response"""
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _stream_email_events(customer):
+    """Yield stage boundaries and tokens as each generation stage produces them"""
+    try:
+        metrics = StageMetrics()
+        outputs = []
+        for stage, metrics_stage, prompt in GENERATION_STAGES:
+            yield _sse("stage", {"stage": stage})
+            
+            chunks = []
+            with metrics.stage(metrics_stage):
+                for chunk in mock_llm.stream(prompt):
+                    chunks.append(chunk)
+                    yield _sse("token", {"stage": stage, "text": chunk})
+            outputs.append("".join(chunks))
+            metrics.record_tokens(metrics_stage, prompt=prompt, completion=outputs[-1])
+        
+        yield _sse("done", _build_email_payload(customer, *outputs, metrics))
+    except Exception as e:
+        logger.error(f"Error streaming email: {str(e)}")
+        yield _sse("error", {"error": str(e)})
+
+def _session_id():
+    """Chat session ID from the request body or X-Session-ID header, or a new one"""
+    return (
+        (request.json or {}).get('session_id')
+        or request.headers.get('X-Session-ID')
+        or uuid.uuid4().hex
+    )
+
+def _chat_prompt(history, user_message):
+    """Prefix the user's message with the session's earlier turns"""
+    turns = [f"User: {question}\nAssistant: {answer}" for question, answer in history]
+    return "\n\n".join(turns + [f"User: {user_message}\nAssistant:"])
+
+def _stream_chat_events(user_message, session_id):
+    """Yield the assistant reply token by token, recording the turn once complete"""
+    try:
+        history = chat_sessions.get(session_id)
+        chunks = []
+        for chunk in mock_llm.stream(_chat_prompt(history, user_message)):
+            chunks.append(chunk)
+            yield _sse("token", {"text": chunk})
+        
+        response = "".join(chunks)
+        history.append((user_message, response))
+        yield _sse("done", {"response": response, "session_id": session_id})
+    except Exception as e:
+        logger.error(f"Error streaming chat: {str(e)}")
+        yield _sse("error", {"error": str(e)})
+
 @app.route('/api/generate-email', methods=['POST'])
 def generate_email():
     """API endpoint to generate email based on customer data"""
@@ -49,27 +166,55 @@ def generate_email():
         # Create CustomerProfile object
         customer = CustomerProfile(**customer_data)
         
-        # Generate mock responses for each stage
-        customer_insights = mock_llm.invoke("analyze customer data")
-        email_draft = mock_llm.invoke("generate personalized marketing email")
-        final_email = mock_llm.invoke("optimize and refine marketing email")
-        
-        # Extract subject line
-        if "Subject:" in final_email:
-            email_subject = final_email.split("Subject:")[1].split("\n")[0].strip()
-        else:
-            email_subject = f"Special Offer for {customer.name} from Octopus Energy"
+        # Stream stages and tokens as they are produced if requested
+        if _wants_stream():
+            return _sse_response(_stream_email_events(customer))
         
         # Return generated email
+        return jsonify(_generate_email_payload(customer))
+    except Exception as e:
+        logger.error(f"Error generating email: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/generate-emails/batch', methods=['POST'])
+def generate_emails_batch():
+    """
+    API endpoint to generate emails for a list of customers concurrently.
+    Accepts {"customers": [...], "max_workers": N} and returns one result per
+    customer in input order, with per-item errors instead of failing the batch.
+    """
+    try:
+        payload = request.json or {}
+        customers = payload.get("customers", [])
+        
+        if not isinstance(customers, list) or not customers:
+            return jsonify({"error": "'customers' must be a non-empty list"}), 400
+        if len(customers) > BATCH_MAX_SIZE:
+            return jsonify({"error": f"Batch size exceeds limit of {BATCH_MAX_SIZE}"}), 400
+        
+        # Clamp the requested concurrency to the configured limit
+        max_workers = min(int(payload.get("max_workers", BATCH_MAX_WORKERS)), BATCH_MAX_WORKERS)
+        
+        def generate_one(customer_data):
+            return _generate_email_payload(CustomerProfile(**customer_data))
+        
+        results = []
+        for index, email, error in imap_bounded(generate_one, customers, max_workers=max_workers):
+            customer_id = customers[index].get("customer_id") if isinstance(customers[index], dict) else None
+            if error:
+                logger.error(f"Error generating email for item {index}: {str(error)}")
+                results.append({"index": index, "customer_id": customer_id, "error": str(error)})
+            else:
+                results.append({"index": index, "customer_id": customer_id, **email})
+        
+        failed = sum(1 for result in results if "error" in result)
         return jsonify({
-            "email_subject": email_subject,
-            "email_body": final_email,
-            "customer_insights": customer_insights,
-            "draft_version": email_draft,
-            "final_version": final_email
+            "results": results,
+            "succeeded": len(results) - failed,
+            "failed": failed
         })
     except Exception as e:
-        logger.error(f"Error generating email: {str(e)}")
+        logger.error(f"Error generating email batch: {str(e)}")
         return jsonify({"error": str(e)}), 400
 
 @app.route('/api/chat', methods=['POST'])
@@ -78,12 +223,18 @@ def chat():
     try:
         # Get user message from request
         user_message = request.json.get('message', '')
+        session_id = _session_id()
         
-        # Generate mock response based on the message content
-        response = mock_llm.invoke(user_message)
+        if _wants_stream():
+            return _sse_response(_stream_chat_events(user_message, session_id))
         
-        # Return agent response
-        return jsonify({"response": response})
+        # Generate mock response from the message and the session's earlier turns
+        history = chat_sessions.get(session_id)
+        response = mock_llm.invoke(_chat_prompt(history, user_message))
+        history.append((user_message, str(response)))
+        
+        # Return agent response with the session ID so the client can continue the conversation
+        return jsonify({"response": response, "session_id": session_id})
     except Exception as e:
         logger.error(f"Error in chat: {str(e)}")
         return jsonify({"error": str(e)}), 400
@@ -94,6 +245,14 @@ def get_models():
     from config.settings import AVAILABLE_MODELS
     return jsonify({"models": AVAILABLE_MODELS})
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """API endpoint to get LLM response cache hit/miss counters"""
+    cache = get_llm_cache()
+    if cache is None:
+        return jsonify({"backend": "none"})
+    return jsonify(cache.stats())
+
 if __name__ == '__main__':
     print("Starting Octopus Energy Email Marketing Assistant...")
     print("Open http://localhost:5000 in your browser")
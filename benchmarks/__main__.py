@@ -0,0 +1,10 @@
+# benchmarks/__main__.py
+
+"""
+Run the offline benchmark suite: python -m benchmarks --help
+"""
+
+from benchmarks.runner import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+# benchmarks/runner.py
+
+"""
+Deterministic offline benchmarks for the email generation pipeline.
+
+Each scenario drives one entry point with MockLLM configured for simulated
+latency, at several concurrency levels, and reports latency percentiles,
+throughput and peak RSS. Results are written as JSON so runs from different
+commits can be compared.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Benchmark customers, fixed so every run sends identical requests
+BENCHMARK_CUSTOMERS = [
+    {
+        "customer_id": "BENCH001",
+        "name": "Alex Johnson",
+        "tariff_type": "Standard Variable",
+        "energy_usage": 350,
+        "potential_savings": 12,
+        "recommended_plan": "GreenFlex",
+        "location": "London",
+        "peak_usage_time": "Evening",
+        "history_summary": "Customer for 2 years, previously inquired about solar"
+    },
+    {
+        "customer_id": "BENCH002",
+        "name": "Sarah Williams",
+        "tariff_type": "Economy 7",
+        "energy_usage": 480,
+        "potential_savings": 18,
+        "recommended_plan": "Agile Octopus",
+        "location": "Manchester",
+        "peak_usage_time": "Morning and Evening",
+        "history_summary": "New customer, switched from competitor last month"
+    },
+    {
+        "customer_id": "BENCH003",
+        "name": "Mohammed Khan",
+        "tariff_type": "Fixed Rate",
+        "energy_usage": 290,
+        "potential_savings": 8,
+        "recommended_plan": "Super Green Octopus",
+        "location": "Birmingham",
+        "peak_usage_time": "Daytime",
+        "history_summary": "Customer for 5 years, very environmentally conscious"
+    }
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in megabytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def summarize(latencies_ms, wall_seconds, errors, first_error=None):
+    """Summarize per-request latencies for one concurrency level"""
+    summary = {
+        "requests": len(latencies_ms) + errors,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "requests_per_second": round(len(latencies_ms) / wall_seconds, 2) if wall_seconds else 0.0,
+        "wall_seconds": round(wall_seconds, 3),
+        "peak_rss_mb": peak_rss_mb()
+    }
+    if first_error:
+        summary["first_error"] = first_error
+    return summary
+
+
+def describe_error(error):
+    """One-line description of an exception for the report"""
+    return f"{type(error).__name__}: {error}"
+
+
+def run_threaded(func, payloads, concurrency):
+    """Call func on every payload from a thread pool and time each call"""
+    from utils.concurrency import imap_bounded
+
+    def timed(payload):
+        start = time.perf_counter()
+        func(payload)
+        return (time.perf_counter() - start) * 1000
+
+    latencies, errors, first_error = [], 0, None
+    start = time.perf_counter()
+    for _, latency, error in imap_bounded(timed, payloads, max_workers=concurrency):
+        if error:
+            errors += 1
+            first_error = first_error or describe_error(error)
+        else:
+            latencies.append(latency)
+    return summarize(latencies, time.perf_counter() - start, errors, first_error)
+
+
+def run_async(coroutine_func, payloads, concurrency):
+    """Await coroutine_func on every payload with bounded concurrency"""
+    async def run_all():
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, errors, first_error = [], 0, None
+
+        async def timed(payload):
+            nonlocal errors, first_error
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await coroutine_func(payload)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                except Exception as e:
+                    errors += 1
+                    first_error = first_error or describe_error(e)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[timed(payload) for payload in payloads])
+        return summarize(latencies, time.perf_counter() - start, errors, first_error)
+
+    return asyncio.run(run_all())
+
+
+def bench_workflow(requests, concurrency):
+    """EmailCampaignWorkflow.generate_campaign on a thread pool"""
+    from orchestration.workflow import EmailCampaignWorkflow
+    from schemas.customer import CustomerProfile
+
+    workflow = EmailCampaignWorkflow(model_name="mock-gpt-4", trace_name="benchmark")
+    profiles = [CustomerProfile(**BENCHMARK_CUSTOMERS[i % len(BENCHMARK_CUSTOMERS)])
+                for i in range(requests)]
+    return run_threaded(workflow.generate_campaign, profiles, concurrency)
+
+
+def bench_workflow_async(requests, concurrency):
+    """EmailCampaignWorkflow.agenerate_campaign on a single event loop"""
+    from orchestration.workflow import EmailCampaignWorkflow
+    from schemas.customer import CustomerProfile
+
+    workflow = EmailCampaignWorkflow(model_name="mock-gpt-4", trace_name="benchmark")
+    profiles = [CustomerProfile(**BENCHMARK_CUSTOMERS[i % len(BENCHMARK_CUSTOMERS)])
+                for i in range(requests)]
+    return run_async(workflow.agenerate_campaign, profiles, concurrency)
+
+
+def bench_flask_route(requests, concurrency):
+    """POST /api/generate-email through the Flask test client"""
+    from app import app
+
+    def post(payload):
+        # Test clients are not thread-safe, so each call gets its own
+        response = app.test_client().post("/api/generate-email", json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+
+    payloads = [BENCHMARK_CUSTOMERS[i % len(BENCHMARK_CUSTOMERS)] for i in range(requests)]
+    return run_threaded(post, payloads, concurrency)
+
+
+def bench_evaluator(requests, concurrency):
+    """EmailContentEvaluator.evaluate_run against MockLLM evaluator responses"""
+    from types import SimpleNamespace
+    from evaluation.evaluators import EmailContentEvaluator
+    from utils.mock_llm import MockLLM
+
+    evaluator = EmailContentEvaluator()
+    evaluator.eval_llm = MockLLM(model_name="mock-gpt-3.5-turbo")
+    email = MockLLM(latency_ms=0, token_latency_ms=0).invoke("optimize and refine")
+
+    runs = [
+        SimpleNamespace(
+            outputs={"final_email": email},
+            inputs={
+                "customer_name": BENCHMARK_CUSTOMERS[i % len(BENCHMARK_CUSTOMERS)]["name"],
+                "tariff_type": BENCHMARK_CUSTOMERS[i % len(BENCHMARK_CUSTOMERS)]["tariff_type"]
+            }
+        )
+        for i in range(requests)
+    ]
+    return run_threaded(evaluator.evaluate_run, runs, concurrency)
+
+
+SCENARIOS = {
+    "workflow": bench_workflow,
+    "workflow_async": bench_workflow_async,
+    "flask_route": bench_flask_route,
+    "evaluator": bench_evaluator
+}
+
+
+def git_commit():
+    """Current git commit, so results can be compared between commits"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Offline throughput and latency benchmarks for the generation pipeline"
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS),
+                        default=sorted(SCENARIOS), help="Scenarios to run")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16],
+                        help="Concurrency levels to measure")
+    parser.add_argument("--requests", type=int, default=48,
+                        help="Requests per concurrency level")
+    parser.add_argument("--latency-ms", type=int, default=50,
+                        help="Simulated fixed latency per LLM call")
+    parser.add_argument("--token-latency-ms", type=float, default=0.2,
+                        help="Simulated generation time per completion token")
+    parser.add_argument("--prompt-token-latency-ms", type=float, default=0.0,
+                        help="Simulated processing time per prompt token (cached prefix tokens are discounted)")
+    parser.add_argument("--output", default=None,
+                        help="JSON results file (default: benchmarks/results/<commit>-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Settings are read at import time, so configure the mock before importing the app.
+    # The response cache, insight store and evaluation cache are disabled so every
+    # request pays the simulated LLM cost of every stage.
+    os.environ["MOCK_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["MOCK_LLM_TOKEN_LATENCY_MS"] = str(args.token_latency_ms)
+    os.environ["MOCK_LLM_PROMPT_TOKEN_LATENCY_MS"] = str(args.prompt_token_latency_ms)
+    os.environ["MOCK_LLM_STREAM_DELAY_MS"] = "0"
+    os.environ["LLM_CACHE_BACKEND"] = "none"
+    os.environ["INSIGHT_STORE_BACKEND"] = "none"
+    os.environ["EVALUATION_CACHE_BACKEND"] = "none"
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "token_latency_ms": args.token_latency_ms,
+            "prompt_token_latency_ms": args.prompt_token_latency_ms
+        },
+        "scenarios": {}
+    }
+
+    failed = []
+    for name in args.scenarios:
+        report["scenarios"][name] = {}
+        for concurrency in args.concurrency:
+            try:
+                result = SCENARIOS[name](args.requests, concurrency)
+            except Exception as e:
+                result = {"error": describe_error(e)}
+            report["scenarios"][name][str(concurrency)] = result
+            print(f"{name:<16} c={concurrency:<4} {json.dumps(result)}")
+            error = result.get("error") or result.get("first_error")
+            if error and name not in failed:
+                # Log the first failure of each scenario; its latencies would be meaningless
+                print(f"{name} failed: {error}", file=sys.stderr)
+                failed.append(name)
+
+    output = args.output or os.path.join(
+        "benchmarks", "results",
+        f"{commit or 'unknown'}-{datetime.now().strftime('%Y%m%d%H%M%S')}.json"
+    )
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote benchmark results to {output}")
+
+    if failed:
+        raise SystemExit(f"Benchmark scenarios with failed requests: {', '.join(failed)}")
+    return report
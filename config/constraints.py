@@ -1,4 +1,4 @@
-# config/constants.py
+# config/constraints.py
 
 """
 Constants used throughout the application.
@@ -14,6 +14,16 @@ CAMPAIGN_TYPES = {
     "SMART_METER": "smart_meter"
 }
 
+# Campaign generation modes
+GENERATION_MODES = {
+    "FULL": "full",                              # analysis, generation and refinement LLM stages
+    "CONDITIONAL_REFINE": "conditional_refine",  # refinement only when the draft fails a quick check
+    "NO_REFINE": "no_refine",                    # analysis and generation, draft sent as-is
+    "COMBINED": "combined",                      # one prompt that analyses and writes the email
+    "TEMPLATE_ASSISTED": "template_assisted",    # template plus one short LLM-written paragraph
+    "TEMPLATE_ONLY": "template_only"             # rendered from templates with no LLM call
+}
+
 # Tariff types
 TARIFF_TYPES = [
     "Standard Variable",
@@ -2,11 +2,28 @@
 # config/settings.py
 
 import os
+import json
+import logging
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+
+def _json_env(name):
+    """Read a JSON object from an environment variable, falling back to {} if it is malformed"""
+    raw = os.getenv(name, "{}")
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError as e:
+        logging.getLogger(__name__).error(f"Ignoring malformed {name} ({e.msg}); using {{}}")
+        return {}
+    if not isinstance(value, dict):
+        logging.getLogger(__name__).error(f"Ignoring {name}: expected a JSON object; using {{}}")
+        return {}
+    return value
+
+
 # API Keys (will be empty in demo mode)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
@@ -38,6 +55,111 @@ AVAILABLE_MODELS = [
 # Flag to determine if we're running in demo mode without APIs
 DEMO_MODE = True
 
+# Batch Generation Settings
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "8"))
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "1000"))
+ASYNC_MAX_CONCURRENCY = int(os.getenv("ASYNC_MAX_CONCURRENCY", "1000"))
+
+# Maximum number of (model, temperature) workflows kept alive in the registry
+WORKFLOW_REGISTRY_MAX_SIZE = int(os.getenv("WORKFLOW_REGISTRY_MAX_SIZE", "8"))
+
+# Chat Session Memory Settings
+CHAT_MEMORY_STRATEGY = os.getenv("CHAT_MEMORY_STRATEGY", "window")  # window or summary
+CHAT_MEMORY_MAX_TURNS = int(os.getenv("CHAT_MEMORY_MAX_TURNS", "10"))
+CHAT_MEMORY_MAX_TOKENS = int(os.getenv("CHAT_MEMORY_MAX_TOKENS", "1000"))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "1000"))
+CHAT_SESSION_TTL_SECONDS = int(os.getenv("CHAT_SESSION_TTL_SECONDS", "1800"))
+
+# Chat Intent Router Settings
+CHAT_ROUTER_ENABLED = os.getenv("CHAT_ROUTER_ENABLED", "true").lower() == "true"
+ROUTER_MIN_CONFIDENCE = float(os.getenv("ROUTER_MIN_CONFIDENCE", "0.8"))
+
+# Evaluation Settings
+EVALUATION_MAX_CONCURRENCY = int(os.getenv("EVALUATION_MAX_CONCURRENCY", "4"))
+EVALUATION_FUSED_MODE = os.getenv("EVALUATION_FUSED_MODE", "False").lower() in ("true", "1", "t")
+# Settle clearly good or clearly broken emails with the heuristic scorer and
+# send only the ambiguous middle band to the LLM evaluators
+EVALUATION_HEURISTIC_GATE = os.getenv("EVALUATION_HEURISTIC_GATE", "False").lower() in ("true", "1", "t")
+
+# Repair requests sent per evaluation dimension whose scores cannot be parsed
+EVALUATION_PARSE_REPAIR_RETRIES = int(os.getenv("EVALUATION_PARSE_REPAIR_RETRIES", "1"))
+
+# Evaluation Cache Settings
+EVALUATION_CACHE_BACKEND = os.getenv("EVALUATION_CACHE_BACKEND", "sqlite")  # memory, sqlite or none
+EVALUATION_CACHE_MAX_ENTRIES = int(os.getenv("EVALUATION_CACHE_MAX_ENTRIES", "100000"))
+EVALUATION_CACHE_PATH = os.getenv("EVALUATION_CACHE_PATH", "./data/evaluation_cache.sqlite3")
+# The rubric version of cached evaluations is a hash of the evaluator prompt templates;
+# this salt is mixed in, so bumping it discards cached evaluations without a template change
+EVALUATION_RUBRIC_VERSION = os.getenv("EVALUATION_RUBRIC_VERSION", "v1")
+
+# Heuristic Scoring Settings
+# Email length and subject constraints checked without an LLM call
+EMAIL_MIN_WORDS = int(os.getenv("EMAIL_MIN_WORDS", "100"))
+EMAIL_MAX_WORDS = int(os.getenv("EMAIL_MAX_WORDS", "150"))
+EMAIL_SUBJECT_MAX_CHARS = int(os.getenv("EMAIL_SUBJECT_MAX_CHARS", "60"))
+# Heuristic scores (0-10) at or above the pass score need no LLM evaluation or
+# refinement; scores below the fail score are treated as clearly broken
+HEURISTIC_PASS_SCORE = float(os.getenv("HEURISTIC_PASS_SCORE", "8.5"))
+HEURISTIC_FAIL_SCORE = float(os.getenv("HEURISTIC_FAIL_SCORE", "4.0"))
+
+# Model Comparison Settings
+COMPARISON_MAX_WORKERS = int(os.getenv("COMPARISON_MAX_WORKERS", "8"))
+COMPARISON_MODEL_CONCURRENCY = int(os.getenv("COMPARISON_MODEL_CONCURRENCY", "2"))
+# JSONL checkpoint of completed comparison results; empty disables checkpointing
+COMPARISON_CHECKPOINT_PATH = os.getenv("COMPARISON_CHECKPOINT_PATH", "")
+
+# LLM Response Cache Settings
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")  # memory, sqlite or none
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./data/llm_cache.sqlite3")
+
+# Customer Insight Store Settings
+INSIGHT_STORE_BACKEND = os.getenv("INSIGHT_STORE_BACKEND", "memory")  # memory, sqlite or none
+INSIGHT_STORE_MAX_ENTRIES = int(os.getenv("INSIGHT_STORE_MAX_ENTRIES", "100000"))
+INSIGHT_MAX_AGE_SECONDS = int(os.getenv("INSIGHT_MAX_AGE_SECONDS", str(30 * 24 * 3600)))
+INSIGHT_STORE_PATH = os.getenv("INSIGHT_STORE_PATH", "./data/customer_insights.sqlite3")
+
+# Width of the monthly kWh usage bands used to group customers into analysis cohorts
+COHORT_USAGE_BAND_KWH = int(os.getenv("COHORT_USAGE_BAND_KWH", "100"))
+
+# Bump when prompt templates change so cached responses are not reused
+PROMPT_TEMPLATE_VERSION = os.getenv("PROMPT_TEMPLATE_VERSION", "1")
+
+# Traffic split between prompt variants per workflow stage, as JSON, e.g.
+# {"generation": {"email_generation": 0.9, "generation_v2": 0.1}}
+# Stages that are not listed serve their default prompt
+PROMPT_VARIANT_WEIGHTS = _json_env("PROMPT_VARIANT_WEIGHTS")
+
+# Generation mode per campaign type, as JSON, e.g. {"seasonal": "template_only"}
+# Modes are full, conditional_refine, no_refine, combined, template_assisted and
+# template_only; unlisted types use the default
+CAMPAIGN_GENERATION_MODES = _json_env("CAMPAIGN_GENERATION_MODES")
+DEFAULT_GENERATION_MODE = os.getenv("DEFAULT_GENERATION_MODE", "full")
+
+
+# Customer Ingestion Settings
+# Records validated per chunk when streaming customer files
+INGESTION_CHUNK_SIZE = int(os.getenv("INGESTION_CHUNK_SIZE", "1000"))
+# Bad rows kept with their errors in an ingestion report; further ones are only counted
+INGESTION_MAX_REPORTED_BAD_ROWS = int(os.getenv("INGESTION_MAX_REPORTED_BAD_ROWS", "100"))
+
+# Campaign Export Settings
+EXPORT_FORMAT = os.getenv("EXPORT_FORMAT", "jsonl.gz")  # jsonl.gz, csv or parquet
+EXPORT_DIR = os.getenv("EXPORT_DIR", "./data/exports")
+# Records per part file; an interrupted export resumes after the last completed part
+EXPORT_PART_SIZE = int(os.getenv("EXPORT_PART_SIZE", "10000"))
+EXPORT_PARQUET_ROW_GROUP_SIZE = int(os.getenv("EXPORT_PARQUET_ROW_GROUP_SIZE", "1000"))
+
+# Mock LLM Settings
+MOCK_LLM_LATENCY_MS = int(os.getenv("MOCK_LLM_LATENCY_MS", "0"))
+MOCK_LLM_TOKEN_LATENCY_MS = float(os.getenv("MOCK_LLM_TOKEN_LATENCY_MS", "0"))
+MOCK_LLM_STREAM_DELAY_MS = int(os.getenv("MOCK_LLM_STREAM_DELAY_MS", "15"))
+# Simulated prompt processing time per input token
+MOCK_LLM_PROMPT_TOKEN_LATENCY_MS = float(os.getenv("MOCK_LLM_PROMPT_TOKEN_LATENCY_MS", "0"))
+# Fraction of the normal cost and latency charged for prompt tokens read from the prefix cache
+MOCK_LLM_CACHED_PREFIX_DISCOUNT = float(os.getenv("MOCK_LLM_CACHED_PREFIX_DISCOUNT", "0.1"))
+
 # Application Settings
 DEBUG = os.getenv("DEBUG", "True").lower() in ("true", "1", "t")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -0,0 +1,156 @@
+# evaluation/cache.py
+
+"""
+Persistent cache of email evaluation results.
+
+LLM evaluation is deterministic enough (temperature 0) that re-scoring an
+identical email gives the same answer, and comparison runs and A/B re-scoring
+resubmit the same texts many times. Results are keyed on a hash of the email
+content, the customer context shown to the evaluator, the evaluator
+configuration, EVALUATION_MODEL and the rubric version. The rubric version is a
+hash of the evaluator prompt templates salted with EVALUATION_RUBRIC_VERSION, so
+editing a prompt invalidates the evaluations made with it. Keys are prefixed
+with the rubric version, so every entry for a rubric can be dropped at once.
+"""
+
+import hashlib
+import json
+import threading
+
+from config.settings import (
+    EVALUATION_CACHE_BACKEND,
+    EVALUATION_CACHE_MAX_ENTRIES,
+    EVALUATION_CACHE_PATH,
+    EVALUATION_MODEL,
+    EVALUATION_RUBRIC_VERSION
+)
+from utils.cache import InMemoryLRUCache, SQLiteCache, MISSING
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def rubric_version(templates, salt=EVALUATION_RUBRIC_VERSION):
+    """
+    Derive a rubric version from the evaluator prompt templates.
+
+    Args:
+        templates: JSON-serialisable prompt templates of every evaluated dimension
+        salt: Extra version string mixed in
+
+    Returns:
+        str: "<salt>-<first 16 hex digits of the templates' SHA-256>"
+    """
+    payload = json.dumps(templates, sort_keys=True, default=str)
+    return f"{salt}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
+
+
+def evaluation_cache_key(email_content, context=None, rubric_version=EVALUATION_RUBRIC_VERSION,
+                         model_name=EVALUATION_MODEL):
+    """
+    Build the cache key for an evaluation.
+
+    Args:
+        email_content: Email text being evaluated
+        context: JSON-serialisable inputs that also shape the result, e.g. the
+            customer name and tariff shown to the evaluator and its dimensions
+        rubric_version: Version of the evaluator prompts and scoring rubric
+        model_name: Evaluation model
+
+    Returns:
+        str: "<rubric_version>:<SHA-256 hex digest>"
+    """
+    payload = json.dumps({
+        "email_content": email_content,
+        "context": context or {},
+        "model_name": model_name
+    }, sort_keys=True, default=str)
+    return f"{rubric_version}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class EvaluationCache:
+    """
+    Evaluation results keyed by email content hash, on any cache backend.
+    """
+
+    def __init__(self, cache, rubric_version=EVALUATION_RUBRIC_VERSION, model_name=EVALUATION_MODEL):
+        """
+        Args:
+            cache: InMemoryLRUCache or SQLiteCache
+            rubric_version: Rubric version new entries are stored under
+            model_name: Evaluation model new entries are stored for
+        """
+        self.cache = cache
+        self.rubric_version = rubric_version
+        self.model_name = model_name
+
+    def with_rubric(self, rubric_version):
+        """Return a view of the same backend storing entries under another rubric version"""
+        return EvaluationCache(self.cache, rubric_version, self.model_name)
+
+    def key(self, email_content, context=None):
+        return evaluation_cache_key(email_content, context, self.rubric_version, self.model_name)
+
+    def get(self, email_content, context=None):
+        """Return the cached evaluation for an email, or None"""
+        results = self.cache.get(self.key(email_content, context))
+        return None if results is MISSING else results
+
+    def put(self, email_content, results, context=None):
+        """Store the evaluation for an email"""
+        self.cache.set(self.key(email_content, context), results)
+
+    def invalidate(self, rubric_version=None):
+        """
+        Drop every cached evaluation made under a rubric version.
+
+        Args:
+            rubric_version: Version to drop (defaults to the current one)
+
+        Returns:
+            int: Number of entries removed
+        """
+        rubric_version = rubric_version or self.rubric_version
+        removed = self.cache.delete_prefix(f"{rubric_version}:")
+        logger.info(f"Invalidated {removed} cached evaluations for rubric {rubric_version}")
+        return removed
+
+    def stats(self):
+        """Return hit/miss counters of the underlying backend"""
+        return {**self.cache.stats(), "rubric_version": self.rubric_version}
+
+
+def create_evaluation_cache(backend=EVALUATION_CACHE_BACKEND):
+    """
+    Create an evaluation cache for the configured backend.
+
+    Args:
+        backend: "memory", "sqlite" or "none"
+
+    Returns:
+        EvaluationCache, or None if caching is disabled
+    """
+    # Entries never expire; a rubric change is handled by the version in the key
+    if backend == "memory":
+        return EvaluationCache(InMemoryLRUCache(max_entries=EVALUATION_CACHE_MAX_ENTRIES, ttl_seconds=0))
+    elif backend == "sqlite":
+        return EvaluationCache(SQLiteCache(path=EVALUATION_CACHE_PATH, ttl_seconds=0, table="evaluations"))
+    elif backend in ("none", "", None):
+        return None
+    else:
+        raise ValueError(f"Unsupported evaluation cache backend: {backend}")
+
+
+_evaluation_cache = None
+_evaluation_cache_lock = threading.Lock()
+
+
+def get_evaluation_cache():
+    """Return the process-wide evaluation cache, creating it on first use"""
+    global _evaluation_cache
+    with _evaluation_cache_lock:
+        if _evaluation_cache is None:
+            _evaluation_cache = create_evaluation_cache()
+            if _evaluation_cache is not None:
+                logger.info(f"Using {EVALUATION_CACHE_BACKEND} evaluation cache")
+        return _evaluation_cache
@@ -5,29 +5,108 @@ from langchain.evaluation.schema import StringEvaluator
 from langchain.smith import RunEvaluator
 from langchain_core.outputs import LLMResult
 from langchain_openai import OpenAI
+from pydantic import ValidationError
 
-import json
-import re
+import copy
+import inspect
+import time
 from typing import Dict, List, Any, Optional, Union
 
-from config.settings import OPENAI_API_KEY, EVALUATION_MODEL
+from config.settings import (
+    OPENAI_API_KEY, EVALUATION_MODEL, EVALUATION_MAX_CONCURRENCY, EVALUATION_FUSED_MODE,
+    EVALUATION_HEURISTIC_GATE, EVALUATION_PARSE_REPAIR_RETRIES
+)
+from evaluation.cache import get_evaluation_cache, rubric_version
+from evaluation.heuristics import HeuristicGate
+from evaluation.parsing import (
+    JSONExtractionError, ParseStats, extract_json, parse_dimension, validate_dimension,
+    describe_validation_error
+)
+from evaluation.rubrics import (
+    FUSED_PROMPT, REPAIR_PROMPT, DIMENSION_PROMPTS, CONTENT_QUALITY_PROMPT, BRAND_ALIGNMENT_PROMPT,
+    PERSONALIZATION_PROMPT, CTA_EFFECTIVENESS_PROMPT
+)
+from schemas.evaluation import DIMENSION_SCHEMAS
 from evaluation.metrics import (
     calculate_engagement_score,
     calculate_conversion_potential_score,
     calculate_brand_alignment_score
 )
+from utils.concurrency import map_bounded
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Dimensions scored by the fused rubric prompt, with the overall key each block must contain
+FUSED_DIMENSIONS = {
+    "content_quality": "overall_content_quality",
+    "brand_alignment": "overall_brand_alignment",
+    "personalization": "overall_personalization",
+    "cta_effectiveness": "overall_cta_effectiveness"
+}
+
 class EmailContentEvaluator(RunEvaluator):
     """
     Custom evaluator for assessing email marketing content quality.
     Used with LangSmith to evaluate model outputs systematically.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency=EVALUATION_MAX_CONCURRENCY,
+        fused=EVALUATION_FUSED_MODE,
+        heuristic_gate=EVALUATION_HEURISTIC_GATE,
+        use_cache=True,
+        parse_repair_retries=EVALUATION_PARSE_REPAIR_RETRIES
+    ):
         self.eval_llm = OpenAI(model_name=EVALUATION_MODEL, temperature=0)
+        self.max_concurrency = max_concurrency
+        # Score the built-in dimensions with a single combined rubric prompt
+        self.fused = fused
+        # Settle clearly good or broken emails heuristically, without LLM calls
+        self.heuristic_gate = HeuristicGate() if heuristic_gate else None
+        # Evaluations of identical emails, persisted across runs
+        self._shared_cache = get_evaluation_cache() if use_cache else None
+        # Repair requests allowed per dimension whose scores cannot be parsed
+        self.parse_repair_retries = parse_repair_retries
+        self.parse_stats = ParseStats()
+        
+        # Evaluation dimensions, keyed by the result name used in evaluation/metrics.py.
+        # Each evaluator takes (email_content, customer_name, tariff_type).
+        self.dimensions = {
+            "content_quality": lambda email, name, tariff: self._evaluate_content_quality(email),
+            "brand_alignment": lambda email, name, tariff: self._evaluate_brand_alignment(email),
+            "personalization": self._evaluate_personalization,
+            "cta_effectiveness": lambda email, name, tariff: self._evaluate_cta(email)
+        }
+        # Prompt template of each dimension, hashed into the rubric version of cached evaluations
+        self.rubrics = dict(DIMENSION_PROMPTS)
+        self.cache = self._rubric_cache()
+    
+    def register_dimension(self, name, evaluator, rubric=None):
+        """
+        Add an evaluation dimension that runs alongside the built-in ones
+        
+        Args:
+            name: Key the dimension's result is stored under
+            evaluator: Callable taking (email_content, customer_name, tariff_type)
+                and returning a dict of scores
+            rubric: Prompt template the evaluator scores with (defaults to its source code);
+                changing it invalidates cached evaluations
+        """
+        self.dimensions[name] = evaluator
+        self.rubrics[name] = rubric if rubric is not None else _evaluator_source(evaluator)
+        self.cache = self._rubric_cache()
+    
+    def _rubric_cache(self):
+        """View of the shared evaluation cache under the rubric version of the current prompts"""
+        if self._shared_cache is None:
+            return None
+        return self._shared_cache.with_rubric(rubric_version({
+            "fused": FUSED_PROMPT,
+            "repair": REPAIR_PROMPT,
+            "dimensions": self.rubrics
+        }))
     
     def evaluate_run(self, run):
         """Evaluate a LangSmith run containing an email generation"""
@@ -43,22 +122,40 @@ class EmailContentEvaluator(RunEvaluator):
             customer_name = run.inputs.get("customer_name", "Customer")
             tariff_type = run.inputs.get("tariff_type", "Unknown")
             
-            # Run all evaluations
-            results = {}
-            
-            # Content quality evaluation
-            results["content_quality"] = self._evaluate_content_quality(email_content)
+            # Score heuristically first; only the ambiguous middle band needs the LLM
+            assessment = None
+            if self.heuristic_gate:
+                assessment = self.heuristic_gate.assess(email_content, {
+                    "name": run.inputs.get("customer_name"),
+                    "tariff_type": run.inputs.get("tariff_type"),
+                    "energy_usage": run.inputs.get("energy_usage"),
+                    "location": run.inputs.get("location"),
+                    "potential_savings": run.inputs.get("potential_savings"),
+                    "recommended_plan": run.inputs.get("recommended_plan")
+                })
+                if assessment["verdict"] != HeuristicGate.REVIEW:
+                    return self._heuristic_results(assessment)
             
-            # Brand voice alignment
-            results["brand_alignment"] = self._evaluate_brand_alignment(email_content)
+            # Identical emails evaluated before, with the same context, are not re-scored
+            cache_context = {
+                "customer_name": customer_name,
+                "tariff_type": tariff_type,
+                "fused": self.fused,
+                "dimensions": sorted(self.dimensions)
+            }
+            cached = self.cache.get(email_content, cache_context) if self.cache else None
+            if cached is not None:
+                results = copy.deepcopy(cached)
+                results["from_cache"] = True
+                if assessment:
+                    results["heuristic"] = assessment
+                return results
             
-            # Personalization assessment
-            results["personalization"] = self._evaluate_personalization(
-                email_content, customer_name, tariff_type
-            )
-            
-            # Call-to-action strength
-            results["cta_effectiveness"] = self._evaluate_cta(email_content)
+            # Run all evaluation dimensions, in one fused call or concurrently
+            if self.fused:
+                results = self._evaluate_fused(email_content, customer_name, tariff_type)
+            else:
+                results = self._evaluate_dimensions(email_content, customer_name, tariff_type)
             
             # Calculate aggregate scores
             results["engagement_score"] = calculate_engagement_score(results)
@@ -71,6 +168,15 @@ class EmailContentEvaluator(RunEvaluator):
                 results["conversion_potential"] * 0.4 +
                 results["brand_alignment_score"] * 0.3
             )
+            results["evaluation_tier"] = "llm"
+            
+            # Failed dimensions fall back to default scores, so only complete evaluations are kept
+            if self.cache and not any(
+                isinstance(result, dict) and "error" in result for result in results.values()
+            ):
+                self.cache.put(email_content, copy.deepcopy(results), cache_context)
+            if assessment:
+                results["heuristic"] = assessment
             
             return results
             
@@ -78,145 +184,162 @@ class EmailContentEvaluator(RunEvaluator):
             logger.error(f"Error in email evaluation: {str(e)}")
             return {"error": str(e), "overall_score": 0}
     
-    def _evaluate_content_quality(self, email_content):
-        """Evaluate the general quality of the email content"""
-        prompt = f"""
-        Evaluate the following marketing email content for an energy company.
-        Rate each aspect on a scale of 1-10:
+    def _heuristic_results(self, assessment):
+        """
+        Build evaluation results from a heuristic assessment alone.
+        The heuristic score stands in for every aggregate score.
+        """
+        score = assessment["heuristic_score"]
+        return {
+            "heuristic": assessment,
+            "evaluation_tier": "heuristic",
+            "engagement_score": score,
+            "conversion_potential": score,
+            "brand_alignment_score": score,
+            "overall_score": score
+        }
+    
+    def _evaluate_dimensions(self, email_content, customer_name, tariff_type, names=None):
+        """Dispatch the registered dimensions (all by default) to a bounded thread pool"""
+        names = list(self.dimensions) if names is None else list(names)
+        if not names:
+            return {}
         
-        EMAIL CONTENT:
-        {email_content}
+        outcomes = map_bounded(
+            lambda name: self.dimensions[name](email_content, customer_name, tariff_type),
+            names,
+            max_workers=min(self.max_concurrency, len(names))
+        )
         
-        EVALUATION CRITERIA:
-        1. Clarity: Is the message clear and easy to understand?
-        2. Conciseness: Is the content appropriately brief without unnecessary text?
-        3. Grammar & Spelling: Is the text free of errors?
-        4. Persuasiveness: Does the content make a compelling case?
-        5. Readability: Is the content well-structured and easy to scan?
+        results = {}
+        for name, (result, error) in zip(names, outcomes):
+            if error:
+                logger.error(f"Error evaluating {name}: {str(error)}")
+                result = {"error": str(error)}
+            results[name] = result
         
-        Provide your ratings and brief explanations in JSON format:
-        {{
-            "clarity": {{score: X, reason: "explanation"}},
-            "conciseness": {{score: X, reason: "explanation"}},
-            "grammar": {{score: X, reason: "explanation"}},
-            "persuasiveness": {{score: X, reason: "explanation"}},
-            "readability": {{score: X, reason: "explanation"}},
-            "overall_content_quality": X
-        }}
+        return results
+    
+    def _evaluate_fused(self, email_content, customer_name, tariff_type):
+        """
+        Score all built-in dimensions with one combined rubric prompt.
+        Malformed dimension blocks get a repair request; blocks still invalid or
+        missing from the fused output are re-scored with their individual
+        prompts, as are any custom registered dimensions.
         """
+        prompt = FUSED_PROMPT.format(
+            customer_name=customer_name, tariff_type=tariff_type, email_content=email_content
+        )
         
-        result = self.eval_llm.invoke(prompt)
-        return self._extract_json(result)
-    
-    def _evaluate_brand_alignment(self, email_content):
-        """Evaluate how well the email aligns with Octopus Energy's brand voice"""
-        prompt = f"""
-        Evaluate how well this email aligns with Octopus Energy's brand voice guidelines.
-        Rate each aspect on a scale of 1-10:
+        try:
+            output = self.eval_llm.invoke(prompt)
+            fused = self._extract_json(output)
+        except Exception as e:
+            logger.error(f"Error in fused evaluation: {str(e)}")
+            output, fused = None, {"error": str(e)}
         
-        OCTOPUS ENERGY BRAND VOICE:
-        - Friendly and conversational
-        - Clear and jargon-free
-        - Helpful and transparent
-        - Eco-conscious
-        - Slightly quirky and different from traditional energy companies
-        - Never overly formal, corporate, or aggressive
+        # Keep well-formed dimension blocks; ask for a repair of the malformed ones only
+        results = {}
+        for name in FUSED_DIMENSIONS:
+            try:
+                results[name] = validate_dimension(name, fused[name])
+                continue
+            except (KeyError, TypeError):
+                # A block the model never scored is evaluated separately below
+                error = fused.get("error")
+            except ValidationError as e:
+                error = describe_validation_error(e)
+            if output is not None and error:
+                repaired = self._repair_dimension(name, output, error)
+                if "error" not in repaired:
+                    results[name] = repaired
         
-        EMAIL CONTENT:
-        {email_content}
+        fallback = [name for name in self.dimensions if name not in results]
+        if fallback:
+            logger.warning(f"Fused evaluation incomplete, scoring separately: {', '.join(fallback)}")
+            results.update(self._evaluate_dimensions(
+                email_content, customer_name, tariff_type, names=fallback
+            ))
         
-        EVALUATION CRITERIA:
-        1. Tone Alignment: How well does the tone match Octopus Energy's friendly, conversational style?
-        2. Language Clarity: Is the language clear, accessible, and jargon-free?
-        3. Brand Personality: Does it convey helpfulness, transparency, and eco-consciousness?
-        4. Distinctiveness: Does it stand out from generic corporate energy messaging?
+        return results
+    
+    def _evaluate_content_quality(self, email_content):
+        """Evaluate the general quality of the email content"""
+        prompt = CONTENT_QUALITY_PROMPT.format(email_content=email_content)
         
-        Provide your ratings and brief explanations in JSON format:
-        {{
-            "tone_alignment": {{score: X, reason: "explanation"}},
-            "language_clarity": {{score: X, reason: "explanation"}},
-            "brand_personality": {{score: X, reason: "explanation"}},
-            "distinctiveness": {{score: X, reason: "explanation"}},
-            "overall_brand_alignment": X
-        }}
-        """
+        result = self.eval_llm.invoke(prompt)
+        return self._parse_dimension("content_quality", result)
+    
+    def _evaluate_brand_alignment(self, email_content):
+        """Evaluate how well the email aligns with Octopus Energy's brand voice"""
+        prompt = BRAND_ALIGNMENT_PROMPT.format(email_content=email_content)
         
         result = self.eval_llm.invoke(prompt)
-        return self._extract_json(result)
+        return self._parse_dimension("brand_alignment", result)
     
     def _evaluate_personalization(self, email_content, customer_name, tariff_type):
         """Evaluate how well the email is personalized to the customer"""
-        prompt = f"""
-        Evaluate how effectively this email is personalized for the specific customer.
-        
-        CUSTOMER DETAILS:
-        - Name: {customer_name}
-        - Current Tariff: {tariff_type}
-        
-        EMAIL CONTENT:
-        {email_content}
-        
-        EVALUATION CRITERIA (rate 1-10):
-        1. Name Usage: How effectively is the customer's name incorporated?
-        2. Tariff Relevance: How well does the email reference their current tariff?
-        3. Specific Needs: Does the email address specific needs implied by their tariff type?
-        4. Tailored Benefits: Are benefits framed in terms of this customer's situation?
-        5. Personal Connection: Does the email establish a personal connection rather than feeling generic?
-        
-        Provide your ratings and brief explanations in JSON format:
-        {{
-            "name_usage": {{score: X, reason: "explanation"}},
-            "tariff_relevance": {{score: X, reason: "explanation"}},
-            "specific_needs": {{score: X, reason: "explanation"}},
-            "tailored_benefits": {{score: X, reason: "explanation"}},
-            "personal_connection": {{score: X, reason: "explanation"}},
-            "overall_personalization": X
-        }}
-        """
+        prompt = PERSONALIZATION_PROMPT.format(
+            customer_name=customer_name, tariff_type=tariff_type, email_content=email_content
+        )
         
         result = self.eval_llm.invoke(prompt)
-        return self._extract_json(result)
+        return self._parse_dimension("personalization", result)
     
     def _evaluate_cta(self, email_content):
         """Evaluate the effectiveness of the call-to-action"""
-        prompt = f"""
-        Evaluate the call-to-action (CTA) in this marketing email.
-        
-        EMAIL CONTENT:
-        {email_content}
-        
-        EVALUATION CRITERIA (rate 1-10):
-        1. Clarity: Is the CTA clear about what action to take?
-        2. Prominence: Is the CTA easy to find and visually distinct?
-        3. Persuasiveness: Does the CTA give a compelling reason to act?
-        4. Urgency: Does the CTA create an appropriate sense of urgency?
-        5. Value Proposition: Is the value of taking action clear in the CTA?
-        
-        Provide your ratings and brief explanations in JSON format:
-        {{
-            "clarity": {{score: X, reason: "explanation"}},
-            "prominence": {{score: X, reason: "explanation"}},
-            "persuasiveness": {{score: X, reason: "explanation"}},
-            "urgency": {{score: X, reason: "explanation"}},
-            "value_proposition": {{score: X, reason: "explanation"}},
-            "overall_cta_effectiveness": X
-        }}
-        """
+        prompt = CTA_EFFECTIVENESS_PROMPT.format(email_content=email_content)
         
         result = self.eval_llm.invoke(prompt)
-        return self._extract_json(result)
+        return self._parse_dimension("cta_effectiveness", result)
+    
+    def _parse_dimension(self, name, output):
+        """Parse and validate a dimension's scores, requesting repairs if they are malformed"""
+        result, error = parse_dimension(name, output, self.parse_stats)
+        if error:
+            return self._repair_dimension(name, output, error)
+        return result
+    
+    def _repair_dimension(self, name, output, error):
+        """
+        Ask the evaluation model to restate one dimension's scores as valid JSON.
+        Only the failing dimension is repaired, from the model's previous answer,
+        so the email is not evaluated again.
+        """
+        for _ in range(self.parse_repair_retries):
+            logger.warning(f"Could not parse {name} scores ({error}), requesting a repair")
+            self.parse_stats.record_repair()
+            output = self.eval_llm.invoke(self._repair_prompt(name, output, error))
+            result, error = parse_dimension(name, output, self.parse_stats)
+            if error is None:
+                return result
+        logger.error(f"Giving up on {name} scores: {error}")
+        return {"error": error}
+    
+    def _repair_prompt(self, name, output, error):
+        """Prompt asking for one dimension's scores from a previous answer, as strict JSON"""
+        schema = DIMENSION_SCHEMAS.get(name)
+        keys = ", ".join(schema.model_fields) if schema else "the scores you gave"
+        return REPAIR_PROMPT.format(name=name, error=error, output=output, keys=keys)
     
     def _extract_json(self, text):
         """Extract and parse JSON from LLM output"""
+        start = time.perf_counter()
         try:
-            # Find JSON object in text
-            match = re.search(r'\{.*\}', text, re.DOTALL)
-            if match:
-                json_str = match.group(0)
-                return json.loads(json_str)
-            return {"error": "No JSON found in response"}
-        except json.JSONDecodeError:
-            return {"error": "Invalid JSON in response"}
+            parsed, lenient = extract_json(text)
+            self.parse_stats.record(True, (time.perf_counter() - start) * 1000, lenient)
+            return parsed
+        except JSONExtractionError as e:
+            self.parse_stats.record(False, (time.perf_counter() - start) * 1000)
+            return {"error": str(e)}
+
+
+def _evaluator_source(evaluator):
+    """Source code of a dimension evaluator, or its name if the source is unavailable"""
+    try:
+        return inspect.getsource(evaluator)
+    except (OSError, TypeError):
+        return getattr(evaluator, "__qualname__", type(evaluator).__qualname__)
 
 
 # evaluation/metrics.py
@@ -0,0 +1,171 @@
+# evaluation/heuristics.py
+
+"""
+Rule-based pre-scoring of generated emails.
+
+Checks that need no LLM call (customer details mentioned, word count, subject
+length, CTA and bullet list present) are combined into a 0-10 heuristic score.
+HeuristicGate uses it to settle emails that are clearly fine or clearly broken,
+so only the ambiguous middle band is sent to the LLM evaluators.
+"""
+
+import re
+import threading
+
+from config.settings import (
+    EMAIL_MIN_WORDS,
+    EMAIL_MAX_WORDS,
+    EMAIL_SUBJECT_MAX_CHARS,
+    HEURISTIC_PASS_SCORE,
+    HEURISTIC_FAIL_SCORE
+)
+from evaluation.metrics import calculate_personalization_score, calculate_reading_time
+
+# Relative weight of each check in the heuristic score
+HEURISTIC_CHECK_WEIGHTS = {
+    "name_mentioned": 1.5,
+    "tariff_mentioned": 1.5,
+    "savings_mentioned": 1.5,
+    "plan_mentioned": 1.0,
+    "word_count_ok": 1.5,
+    "subject_length_ok": 1.0,
+    "has_cta": 1.5,
+    "has_bullets": 0.5
+}
+
+SUBJECT_PATTERN = re.compile(r"^\s*Subject:([^\n]*)", re.MULTILINE)
+# A bracketed button, e.g. [Check My Savings], or a common call-to-action phrase
+CTA_PATTERN = re.compile(
+    r"\[[^\]\n]+\]|\b(?:click here|sign up|switch now|switch today|book now|get started|learn more|find out more)\b",
+    re.IGNORECASE
+)
+BULLET_PATTERN = re.compile(r"^\s*[•\-\*]\s+\S", re.MULTILINE)
+
+
+def _mentioned(value, email_content):
+    """Whether a customer field appears in the email, or None if the field is unknown"""
+    if value in (None, ""):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).lower() in email_content.lower()
+
+
+def heuristic_checks(email_content, customer_data):
+    """
+    Run the rule-based checks on an email.
+
+    Args:
+        email_content: Generated email text, optionally starting with a "Subject:" line
+        customer_data: Dict with any of name, tariff_type, energy_usage, location,
+            potential_savings and recommended_plan
+
+    Returns:
+        Dict with the outcome of every check (True, False, or None when it does
+        not apply), plus word_count, subject_length, personalization_score and
+        reading_time_seconds
+    """
+    subject_match = SUBJECT_PATTERN.search(email_content)
+    subject = subject_match.group(1).strip() if subject_match else None
+    # Body word count, excluding the subject line
+    body = email_content[subject_match.end():] if subject_match else email_content
+    word_count = len(body.split())
+
+    return {
+        "checks": {
+            "name_mentioned": _mentioned(customer_data.get("name"), email_content),
+            "tariff_mentioned": _mentioned(customer_data.get("tariff_type"), email_content),
+            "savings_mentioned": _mentioned(customer_data.get("potential_savings"), email_content),
+            "plan_mentioned": _mentioned(customer_data.get("recommended_plan"), email_content),
+            "word_count_ok": EMAIL_MIN_WORDS <= word_count <= EMAIL_MAX_WORDS,
+            "subject_length_ok": None if subject is None else 0 < len(subject) <= EMAIL_SUBJECT_MAX_CHARS,
+            "has_cta": bool(CTA_PATTERN.search(body)),
+            "has_bullets": bool(BULLET_PATTERN.search(body))
+        },
+        "word_count": word_count,
+        "subject_length": None if subject is None else len(subject),
+        "personalization_score": calculate_personalization_score(email_content, customer_data),
+        "reading_time_seconds": calculate_reading_time(body)
+    }
+
+
+def heuristic_score(checks):
+    """
+    Combine check outcomes into a score.
+
+    Args:
+        checks: Dict of check name to True, False or None, as from heuristic_checks
+
+    Returns:
+        float: Weighted share of applicable checks passed, on a scale of 0-10
+    """
+    applicable = {name: passed for name, passed in checks.items() if passed is not None}
+    total_weight = sum(HEURISTIC_CHECK_WEIGHTS.get(name, 1.0) for name in applicable)
+    if not total_weight:
+        return 5.0
+    passed_weight = sum(HEURISTIC_CHECK_WEIGHTS.get(name, 1.0) for name, passed in applicable.items() if passed)
+    return round(passed_weight / total_weight * 10, 1)
+
+
+class HeuristicGate:
+    """
+    Decides from the heuristic score whether an email needs LLM evaluation.
+
+    Emails scoring at least pass_score are clearly fine and those below
+    fail_score clearly broken; anything in between is sent for review.
+    """
+
+    PASS = "pass"
+    FAIL = "fail"
+    REVIEW = "review"
+
+    def __init__(self, pass_score=HEURISTIC_PASS_SCORE, fail_score=HEURISTIC_FAIL_SCORE):
+        """
+        Args:
+            pass_score: Heuristic score at or above which an email passes outright
+            fail_score: Heuristic score below which an email fails outright
+        """
+        if fail_score > pass_score:
+            raise ValueError(f"fail_score ({fail_score}) must not exceed pass_score ({pass_score})")
+        self.pass_score = pass_score
+        self.fail_score = fail_score
+        self._counts = {self.PASS: 0, self.FAIL: 0, self.REVIEW: 0}
+        self._lock = threading.Lock()
+
+    def assess(self, email_content, customer_data):
+        """
+        Score an email and classify it.
+
+        Args:
+            email_content: Generated email text
+            customer_data: Customer fields, as for heuristic_checks
+
+        Returns:
+            Dict from heuristic_checks with heuristic_score and verdict
+            ("pass", "fail" or "review") added
+        """
+        assessment = heuristic_checks(email_content, customer_data)
+        score = heuristic_score(assessment["checks"])
+        if score >= self.pass_score:
+            verdict = self.PASS
+        elif score < self.fail_score:
+            verdict = self.FAIL
+        else:
+            verdict = self.REVIEW
+
+        with self._lock:
+            self._counts[verdict] += 1
+        assessment["heuristic_score"] = score
+        assessment["verdict"] = verdict
+        return assessment
+
+    def stats(self):
+        """Return verdict counts and the share of emails settled without an LLM call"""
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        return {
+            **counts,
+            "total": total,
+            "settled_rate": round((counts[self.PASS] + counts[self.FAIL]) / total, 3) if total else 0.0
+        }
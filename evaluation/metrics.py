@@ -2,8 +2,53 @@
 
 """
 Metrics and scoring functions for evaluating email marketing content.
+
+The calculate_* functions score one nested evaluation dict at a time. The
+batch_* functions compute the same scores over columns of flattened sub-scores
+(a pandas DataFrame or a dict of NumPy arrays keyed by dotted paths such as
+"content_quality.readability.score"), treating missing or non-numeric values as
+masked rather than raising.
 """
 
+import numpy as np
+import pandas as pd
+
+# Flattened sub-score columns and weights behind each composite score
+ENGAGEMENT_WEIGHTS = {
+    "content_quality.overall_content_quality": 0.4,
+    "personalization.overall_personalization": 0.4,
+    "content_quality.readability.score": 0.2
+}
+CONVERSION_POTENTIAL_WEIGHTS = {
+    "content_quality.persuasiveness.score": 0.3,
+    "cta_effectiveness.overall_cta_effectiveness": 0.5,
+    "personalization.overall_personalization": 0.2
+}
+BRAND_ALIGNMENT_WEIGHTS = {
+    "brand_alignment.tone_alignment.score": 0.3,
+    "brand_alignment.language_clarity.score": 0.2,
+    "brand_alignment.brand_personality.score": 0.3,
+    "brand_alignment.distinctiveness.score": 0.2
+}
+OVERALL_WEIGHTS = {
+    "engagement_score": 0.3,
+    "conversion_potential": 0.4,
+    "brand_alignment_score": 0.3
+}
+
+# Lower bounds of each letter grade, highest first
+GRADE_THRESHOLDS = [
+    (9.5, "A+"),
+    (9.0, "A"),
+    (8.0, "A-"),
+    (7.0, "B+"),
+    (6.0, "B"),
+    (5.0, "C"),
+    (4.0, "D")
+]
+
+DEFAULT_SCORE = 5.0
+
 def calculate_engagement_score(evaluation_results):
     """
     Calculate an engagement score based on content quality, personalization, and readability.
@@ -202,4 +247,157 @@ def grade_performance(score):
     elif score >= 4.0:
         return "D"
     else:
-        return "F"
\ No newline at end of file
+        return "F"
+
+def flatten_evaluation_results(evaluation_results):
+    """
+    Flatten nested evaluation dicts into one column per sub-score.
+    
+    Args:
+        evaluation_results: Iterable of evaluation dicts as returned by EmailContentEvaluator
+        
+    Returns:
+        pandas.DataFrame with dotted-path columns, e.g. "content_quality.readability.score"
+    """
+    return pd.json_normalize(list(evaluation_results), sep=".")
+
+def _score_columns(scores, columns):
+    """
+    Return the requested columns as a float matrix, with NaN where a value is
+    missing or not numeric.
+    """
+    if not isinstance(scores, pd.DataFrame):
+        scores = pd.DataFrame(scores)
+    return np.column_stack([
+        pd.to_numeric(scores[column], errors="coerce").to_numpy(dtype=float)
+        if column in scores else np.full(len(scores), np.nan)
+        for column in columns
+    ])
+
+def _round_score(values):
+    """
+    Round to one decimal place exactly as the built-in round() does.
+    
+    np.round rounds values * 10, which can land on .5 for values whose exact
+    binary value lies just below or above the midpoint. Those ties are resolved
+    from the exact error of the product (10 * x = 8 * x + 2 * x, both exact).
+    """
+    eight, two = values * 8, values * 2
+    scaled = eight + two
+    tail = scaled - eight
+    error = (eight - (scaled - tail)) + (two - tail)
+    rounded = np.rint(scaled)
+    tie = np.abs(scaled - np.floor(scaled) - 0.5) == 0
+    rounded = np.where(tie & (error > 0), np.ceil(scaled), rounded)
+    rounded = np.where(tie & (error < 0), np.floor(scaled), rounded)
+    return rounded / 10
+
+def _weighted_sum(values, weights):
+    """
+    Sum weighted columns left to right, in the same order as the per-dict
+    functions, so results round identically.
+    """
+    total = np.zeros(values.shape[0])
+    for index, weight in enumerate(weights.values()):
+        total = total + values[:, index] * weight
+    return total
+
+def _batch_weighted_score(scores, weights):
+    """
+    Weighted sum over rows, falling back to DEFAULT_SCORE for any row missing a
+    component, as the per-dict functions do on KeyError.
+    """
+    values = _score_columns(scores, list(weights))
+    composite = _weighted_sum(values, weights)
+    return _round_score(np.where(np.isnan(values).any(axis=1), DEFAULT_SCORE, composite))
+
+def batch_engagement_score(scores):
+    """
+    Vectorised calculate_engagement_score.
+    
+    Args:
+        scores: DataFrame or dict of arrays of flattened sub-scores
+        
+    Returns:
+        numpy.ndarray: Engagement score per row
+    """
+    return _batch_weighted_score(scores, ENGAGEMENT_WEIGHTS)
+
+def batch_conversion_potential_score(scores):
+    """
+    Vectorised calculate_conversion_potential_score.
+    
+    Args:
+        scores: DataFrame or dict of arrays of flattened sub-scores
+        
+    Returns:
+        numpy.ndarray: Conversion potential score per row
+    """
+    return _batch_weighted_score(scores, CONVERSION_POTENTIAL_WEIGHTS)
+
+def batch_brand_alignment_score(scores):
+    """
+    Vectorised calculate_brand_alignment_score.
+    
+    Args:
+        scores: DataFrame or dict of arrays of flattened sub-scores
+        
+    Returns:
+        numpy.ndarray: Brand alignment score per row
+    """
+    return _batch_weighted_score(scores, BRAND_ALIGNMENT_WEIGHTS)
+
+def batch_overall_score(scores):
+    """
+    Vectorised calculate_overall_score.
+    
+    Missing composite scores default to 5.0 individually, matching the
+    per-dict function.
+    
+    Args:
+        scores: DataFrame or dict of arrays with engagement_score,
+            conversion_potential and brand_alignment_score columns
+        
+    Returns:
+        numpy.ndarray: Overall score per row
+    """
+    values = np.nan_to_num(_score_columns(scores, list(OVERALL_WEIGHTS)), nan=DEFAULT_SCORE)
+    return _round_score(_weighted_sum(values, OVERALL_WEIGHTS))
+
+def batch_grade_performance(scores):
+    """
+    Vectorised grade_performance.
+    
+    Args:
+        scores: Array-like of numeric scores (0-10)
+        
+    Returns:
+        numpy.ndarray: Letter grade per score; NaN scores grade as "F"
+    """
+    scores = np.asarray(scores, dtype=float)
+    return np.select(
+        [scores >= threshold for threshold, _ in GRADE_THRESHOLDS],
+        [grade for _, grade in GRADE_THRESHOLDS],
+        default="F"
+    )
+
+def score_evaluations(scores):
+    """
+    Compute every composite score and grade for a batch of evaluations.
+    
+    Args:
+        scores: DataFrame or dict of arrays of flattened sub-scores, e.g. from
+            flatten_evaluation_results
+        
+    Returns:
+        pandas.DataFrame with engagement_score, conversion_potential,
+        brand_alignment_score, overall_score and grade columns
+    """
+    composites = pd.DataFrame({
+        "engagement_score": batch_engagement_score(scores),
+        "conversion_potential": batch_conversion_potential_score(scores),
+        "brand_alignment_score": batch_brand_alignment_score(scores)
+    })
+    composites["overall_score"] = batch_overall_score(composites)
+    composites["grade"] = batch_grade_performance(composites["overall_score"])
+    return composites
@@ -0,0 +1,247 @@
+# evaluation/parsing.py
+
+"""
+Extraction of JSON objects from evaluator LLM output.
+
+The evaluator prompts ask for loosely specified JSON, and models answer with
+unquoted keys, single quotes, trailing commas or prose around the object. The
+output is scanned once for brace-balanced candidates, ignoring braces inside
+strings. Each candidate is tried as strict JSON and then as JSON5-style lenient
+JSON, and the first object that parses is returned. Dimension results are then
+validated into the typed score schemas.
+"""
+
+import json
+import re
+import threading
+import time
+
+from pydantic import ValidationError
+
+from schemas.evaluation import DIMENSION_SCHEMAS
+
+_IDENTIFIER_START = re.compile(r"[A-Za-z_$]")
+_IDENTIFIER = re.compile(r"[A-Za-z0-9_$]*")
+_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+
+
+class JSONExtractionError(ValueError):
+    """Raised when no JSON object can be recovered from a text"""
+
+
+def iter_json_candidates(text):
+    """
+    Yield each top-level brace-balanced {...} substring of text, in order.
+
+    Quotes are tracked so braces inside string values do not unbalance the scan.
+    """
+    depth = 0
+    start = None
+    quote = None
+    escaped = False
+    for index, char in enumerate(text):
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in "\"'" and depth:
+            quote = char
+        elif char == "{":
+            if depth == 0:
+                start = index
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                yield text[start:index + 1]
+
+
+def to_strict_json(candidate):
+    """
+    Rewrite JSON5-style text as strict JSON.
+
+    Quotes bare keys, converts single-quoted strings, drops comments and
+    trailing commas, and maps Python literals to their JSON equivalents.
+    """
+    out = []
+    index = 0
+    length = len(candidate)
+    while index < length:
+        char = candidate[index]
+        if char in "\"'":
+            # Copy a string, re-quoting single-quoted ones
+            end = index + 1
+            chars = []
+            while end < length and candidate[end] != char:
+                if candidate[end] == "\\" and end + 1 < length:
+                    chars.append(candidate[end:end + 2])
+                    end += 2
+                    continue
+                chars.append('\\"' if candidate[end] == '"' else candidate[end])
+                end += 1
+            body = "".join(chars)
+            if char == "'":
+                body = body.replace("\\'", "'")
+            out.append('"' + body + '"')
+            index = end + 1
+        elif candidate.startswith("//", index):
+            newline = candidate.find("\n", index)
+            index = length if newline == -1 else newline
+        elif candidate.startswith("/*", index):
+            close = candidate.find("*/", index + 2)
+            index = length if close == -1 else close + 2
+        elif char == ",":
+            # Drop a trailing comma before a closing bracket
+            lookahead = index + 1
+            while lookahead < length and candidate[lookahead].isspace():
+                lookahead += 1
+            if lookahead >= length or candidate[lookahead] not in "}]":
+                out.append(char)
+            index += 1
+        elif _IDENTIFIER_START.match(char):
+            word = char + _IDENTIFIER.match(candidate, index + 1).group(0)
+            index += len(word)
+            if word in _LITERALS:
+                out.append(_LITERALS[word])
+            else:
+                out.append(json.dumps(word))
+        else:
+            out.append(char)
+            index += 1
+    return "".join(out)
+
+
+def extract_json(text):
+    """
+    Extract the first JSON object from LLM output.
+
+    Args:
+        text: Model output, possibly with prose or code fences around the object
+
+    Returns:
+        Tuple of (parsed dict, whether lenient parsing was needed)
+
+    Raises:
+        JSONExtractionError: If no candidate parses as an object
+    """
+    text = str(text)
+    found = False
+    for candidate in iter_json_candidates(text):
+        found = True
+        try:
+            parsed = json.loads(candidate)
+            lenient = False
+        except json.JSONDecodeError:
+            try:
+                parsed = json.loads(to_strict_json(candidate))
+                lenient = True
+            except json.JSONDecodeError:
+                continue
+        if isinstance(parsed, dict):
+            return parsed, lenient
+    raise JSONExtractionError("Invalid JSON in response" if found else "No JSON found in response")
+
+
+def validate_dimension(name, data):
+    """
+    Validate a dimension's scores against its schema.
+
+    Args:
+        name: Dimension name
+        data: Parsed dict; for dimensions without a schema it is returned unchanged
+
+    Returns:
+        Dict of validated scores, with overall score filled in if it was missing
+
+    Raises:
+        ValidationError: If the scores do not match the schema
+    """
+    schema = DIMENSION_SCHEMAS.get(name)
+    if schema is None:
+        return data
+    # Repaired answers sometimes wrap the scores in the dimension name
+    if isinstance(data, dict) and list(data) == [name] and isinstance(data[name], dict):
+        data = data[name]
+    return schema.model_validate(data).model_dump()
+
+
+def describe_validation_error(error):
+    """Short description of a validation error, for repair prompts and logs"""
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in item['loc']) or 'value'}: {item['msg']}"
+            for item in error.errors()[:5]
+        )
+    return str(error)
+
+
+class ParseStats:
+    """
+    Thread-safe counters for evaluator output parsing.
+    """
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.lenient = 0
+        self.repairs = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, succeeded, elapsed_ms, lenient=False):
+        """Record one parse attempt"""
+        with self._lock:
+            self.attempts += 1
+            self.total_ms += elapsed_ms
+            if succeeded:
+                self.successes += 1
+                self.lenient += int(lenient)
+            else:
+                self.failures += 1
+
+    def record_repair(self):
+        """Record a repair request sent to the evaluation model"""
+        with self._lock:
+            self.repairs += 1
+
+    def stats(self):
+        """Return parse success rate, lenient and repair counts and parse time"""
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "successes": self.successes,
+                "failures": self.failures,
+                "success_rate": round(self.successes / self.attempts, 3) if self.attempts else 0.0,
+                "lenient_parses": self.lenient,
+                "repair_requests": self.repairs,
+                "total_ms": round(self.total_ms, 3),
+                "avg_ms": round(self.total_ms / self.attempts, 4) if self.attempts else 0.0
+            }
+
+
+def parse_dimension(name, text, stats=None):
+    """
+    Extract and validate one dimension's scores from LLM output.
+
+    Args:
+        name: Dimension name
+        text: Model output
+        stats: Optional ParseStats to record the attempt in
+
+    Returns:
+        Tuple of (validated scores dict, None) or (None, error description)
+    """
+    start = time.perf_counter()
+    lenient = False
+    try:
+        data, lenient = extract_json(text)
+        result, error = validate_dimension(name, data), None
+    except (JSONExtractionError, ValidationError) as e:
+        result, error = None, describe_validation_error(e)
+    if stats is not None:
+        stats.record(error is None, (time.perf_counter() - start) * 1000, lenient)
+    return result, error
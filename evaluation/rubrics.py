@@ -0,0 +1,198 @@
+# evaluation/rubrics.py
+
+"""
+Prompt templates of the LLM evaluator.
+
+Templates are filled in with str.format, so literal braces are doubled. The
+evaluation cache derives its rubric version from a hash of these templates,
+so editing one stops cached evaluations made with the old text from being reused.
+"""
+
+FUSED_PROMPT = """
+Evaluate the following marketing email for Octopus Energy across four dimensions.
+Rate every criterion on a scale of 1-10.
+
+CUSTOMER DETAILS:
+- Name: {customer_name}
+- Current Tariff: {tariff_type}
+
+OCTOPUS ENERGY BRAND VOICE:
+- Friendly and conversational
+- Clear and jargon-free
+- Helpful and transparent
+- Eco-conscious
+- Slightly quirky and different from traditional energy companies
+- Never overly formal, corporate, or aggressive
+
+EMAIL CONTENT:
+{email_content}
+
+EVALUATION CRITERIA:
+content_quality: clarity, conciseness, grammar, persuasiveness, readability
+brand_alignment: tone_alignment, language_clarity, brand_personality, distinctiveness
+personalization: name_usage, tariff_relevance, specific_needs, tailored_benefits, personal_connection
+cta_effectiveness: clarity, prominence, persuasiveness, urgency, value_proposition
+
+Provide your ratings and brief explanations as a single JSON object:
+{{
+    "content_quality": {{
+        "clarity": {{"score": X, "reason": "explanation"}},
+        "conciseness": {{"score": X, "reason": "explanation"}},
+        "grammar": {{"score": X, "reason": "explanation"}},
+        "persuasiveness": {{"score": X, "reason": "explanation"}},
+        "readability": {{"score": X, "reason": "explanation"}},
+        "overall_content_quality": X
+    }},
+    "brand_alignment": {{
+        "tone_alignment": {{"score": X, "reason": "explanation"}},
+        "language_clarity": {{"score": X, "reason": "explanation"}},
+        "brand_personality": {{"score": X, "reason": "explanation"}},
+        "distinctiveness": {{"score": X, "reason": "explanation"}},
+        "overall_brand_alignment": X
+    }},
+    "personalization": {{
+        "name_usage": {{"score": X, "reason": "explanation"}},
+        "tariff_relevance": {{"score": X, "reason": "explanation"}},
+        "specific_needs": {{"score": X, "reason": "explanation"}},
+        "tailored_benefits": {{"score": X, "reason": "explanation"}},
+        "personal_connection": {{"score": X, "reason": "explanation"}},
+        "overall_personalization": X
+    }},
+    "cta_effectiveness": {{
+        "clarity": {{"score": X, "reason": "explanation"}},
+        "prominence": {{"score": X, "reason": "explanation"}},
+        "persuasiveness": {{"score": X, "reason": "explanation"}},
+        "urgency": {{"score": X, "reason": "explanation"}},
+        "value_proposition": {{"score": X, "reason": "explanation"}},
+        "overall_cta_effectiveness": X
+    }}
+}}
+"""
+
+CONTENT_QUALITY_PROMPT = """
+Evaluate the following marketing email content for an energy company.
+Rate each aspect on a scale of 1-10:
+
+EMAIL CONTENT:
+{email_content}
+
+EVALUATION CRITERIA:
+1. Clarity: Is the message clear and easy to understand?
+2. Conciseness: Is the content appropriately brief without unnecessary text?
+3. Grammar & Spelling: Is the text free of errors?
+4. Persuasiveness: Does the content make a compelling case?
+5. Readability: Is the content well-structured and easy to scan?
+
+Provide your ratings and brief explanations in JSON format:
+{{
+    "clarity": {{score: X, reason: "explanation"}},
+    "conciseness": {{score: X, reason: "explanation"}},
+    "grammar": {{score: X, reason: "explanation"}},
+    "persuasiveness": {{score: X, reason: "explanation"}},
+    "readability": {{score: X, reason: "explanation"}},
+    "overall_content_quality": X
+}}
+"""
+
+BRAND_ALIGNMENT_PROMPT = """
+Evaluate how well this email aligns with Octopus Energy's brand voice guidelines.
+Rate each aspect on a scale of 1-10:
+
+OCTOPUS ENERGY BRAND VOICE:
+- Friendly and conversational
+- Clear and jargon-free
+- Helpful and transparent
+- Eco-conscious
+- Slightly quirky and different from traditional energy companies
+- Never overly formal, corporate, or aggressive
+
+EMAIL CONTENT:
+{email_content}
+
+EVALUATION CRITERIA:
+1. Tone Alignment: How well does the tone match Octopus Energy's friendly, conversational style?
+2. Language Clarity: Is the language clear, accessible, and jargon-free?
+3. Brand Personality: Does it convey helpfulness, transparency, and eco-consciousness?
+4. Distinctiveness: Does it stand out from generic corporate energy messaging?
+
+Provide your ratings and brief explanations in JSON format:
+{{
+    "tone_alignment": {{score: X, reason: "explanation"}},
+    "language_clarity": {{score: X, reason: "explanation"}},
+    "brand_personality": {{score: X, reason: "explanation"}},
+    "distinctiveness": {{score: X, reason: "explanation"}},
+    "overall_brand_alignment": X
+}}
+"""
+
+PERSONALIZATION_PROMPT = """
+Evaluate how effectively this email is personalized for the specific customer.
+
+CUSTOMER DETAILS:
+- Name: {customer_name}
+- Current Tariff: {tariff_type}
+
+EMAIL CONTENT:
+{email_content}
+
+EVALUATION CRITERIA (rate 1-10):
+1. Name Usage: How effectively is the customer's name incorporated?
+2. Tariff Relevance: How well does the email reference their current tariff?
+3. Specific Needs: Does the email address specific needs implied by their tariff type?
+4. Tailored Benefits: Are benefits framed in terms of this customer's situation?
+5. Personal Connection: Does the email establish a personal connection rather than feeling generic?
+
+Provide your ratings and brief explanations in JSON format:
+{{
+    "name_usage": {{score: X, reason: "explanation"}},
+    "tariff_relevance": {{score: X, reason: "explanation"}},
+    "specific_needs": {{score: X, reason: "explanation"}},
+    "tailored_benefits": {{score: X, reason: "explanation"}},
+    "personal_connection": {{score: X, reason: "explanation"}},
+    "overall_personalization": X
+}}
+"""
+
+CTA_EFFECTIVENESS_PROMPT = """
+Evaluate the call-to-action (CTA) in this marketing email.
+
+EMAIL CONTENT:
+{email_content}
+
+EVALUATION CRITERIA (rate 1-10):
+1. Clarity: Is the CTA clear about what action to take?
+2. Prominence: Is the CTA easy to find and visually distinct?
+3. Persuasiveness: Does the CTA give a compelling reason to act?
+4. Urgency: Does the CTA create an appropriate sense of urgency?
+5. Value Proposition: Is the value of taking action clear in the CTA?
+
+Provide your ratings and brief explanations in JSON format:
+{{
+    "clarity": {{score: X, reason: "explanation"}},
+    "prominence": {{score: X, reason: "explanation"}},
+    "persuasiveness": {{score: X, reason: "explanation"}},
+    "urgency": {{score: X, reason: "explanation"}},
+    "value_proposition": {{score: X, reason: "explanation"}},
+    "overall_cta_effectiveness": X
+}}
+"""
+
+REPAIR_PROMPT = """
+Your previous evaluation could not be read for the "{name}" dimension: {error}
+
+PREVIOUS RESPONSE:
+{output}
+
+Restate only the {name} scores as a single valid JSON object with double-quoted
+keys and numeric scores from 1-10. Use these keys: {keys}
+Each criterion is an object {{"score": X, "reason": "explanation"}}; the overall
+score is a number.
+"""
+
+# Individual prompt for each built-in dimension, keyed by result name
+DIMENSION_PROMPTS = {
+    "content_quality": CONTENT_QUALITY_PROMPT,
+    "brand_alignment": BRAND_ALIGNMENT_PROMPT,
+    "personalization": PERSONALIZATION_PROMPT,
+    "cta_effectiveness": CTA_EFFECTIVENESS_PROMPT
+}
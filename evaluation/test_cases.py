@@ -1,16 +1,27 @@
 # evaluation/test_cases.py
 
+import hashlib
 import json
+import os
+import threading
+from types import SimpleNamespace
 import pandas as pd
 import matplotlib.pyplot as plt
 from typing import Dict, List, Any
 from langchain_core.tracers import LangChainTracer
 from langsmith import Client
 
-from config.settings import LANGSMITH_API_KEY, AVAILABLE_MODELS
+from config.constraints import GENERATION_MODES, TARGET_SCORES
+from config.settings import (
+    LANGSMITH_API_KEY, AVAILABLE_MODELS, COMPARISON_MAX_WORKERS,
+    COMPARISON_MODEL_CONCURRENCY, COMPARISON_CHECKPOINT_PATH, PROMPT_TEMPLATE_VERSION
+)
+from orchestration.registry import workflow_registry
 from orchestration.workflow import EmailCampaignWorkflow
 from schemas.customer import CustomerProfile
 from evaluation.evaluators import EmailContentEvaluator
+from utils.concurrency import map_bounded
+from utils.ingestion import IngestionReport, iter_customer_profiles
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -29,23 +40,25 @@ class ModelComparisonRunner:
         self.results = {}
     
     def load_test_cases(self, test_case_path="./data/test_customers.json"):
-        """Load customer test cases from JSON file"""
+        """
+        Load customer test cases from a JSON, JSONL or CSV file, optionally gzipped
+        
+        Rows that fail validation are skipped and reported in self.ingestion_report.
+        """
+        self.ingestion_report = IngestionReport()
         try:
-            with open(test_case_path, 'r') as f:
-                test_cases = json.load(f)
-            
-            # Convert to CustomerProfile objects
-            self.test_customers = [
-                CustomerProfile(**customer_data)
-                for customer_data in test_cases
-            ]
-            logger.info(f"Loaded {len(self.test_customers)} test cases")
-            return self.test_customers
+            self.test_customers = list(iter_customer_profiles(test_case_path, report=self.ingestion_report))
         except Exception as e:
             logger.error(f"Error loading test cases: {str(e)}")
+            self.test_customers = []
+        
+        if not self.test_customers:
             # Fallback to sample test cases
             self.test_customers = self._generate_sample_test_cases()
             return self.test_customers
+        
+        logger.info(f"Loaded {len(self.test_customers)} test cases")
+        return self.test_customers
     
     def _generate_sample_test_cases(self):
         """Generate sample test cases if file loading fails"""
@@ -85,54 +98,251 @@ class ModelComparisonRunner:
             ),
         ]
     
-    def run_comparisons(self):
-        """Run email generation with all models on all test cases"""
-        results = []
+    def run_comparisons(
+        self,
+        max_workers=COMPARISON_MAX_WORKERS,
+        per_model_concurrency=COMPARISON_MODEL_CONCURRENCY,
+        checkpoint_path=COMPARISON_CHECKPOINT_PATH
+    ):
+        """
+        Run email generation with all models on all test cases
+        
+        (model, customer) pairs are fanned out to a shared worker pool, with at most
+        per_model_concurrency in flight for any one model. If a checkpoint path is
+        given, every completed result is appended to it, so an interrupted run
+        resumes where it stopped. The checkpoint starts with a header recording the
+        models, prompt version and customer set, and is only resumed by a run with
+        the same header.
         
-        for model_name in self.models_to_test:
-            logger.info(f"Testing model: {model_name}")
+        Args:
+            max_workers: Total number of concurrent generations
+            per_model_concurrency: Maximum concurrent generations per model
+            checkpoint_path: JSONL file of completed results (empty disables checkpointing)
             
-            try:
-                # Initialize workflow with this model
-                workflow = EmailCampaignWorkflow(
-                    model_name=model_name,
-                    trace_name=f"{self.project_name}-{model_name}"
-                )
+        Returns:
+            List of result records for every completed (model, customer) pair
+            
+        Raises:
+            ValueError: If the checkpoint was written by a run with a different header
+        """
+        header = self._checkpoint_header()
+        completed = self._load_checkpoint(checkpoint_path, header)
+        if checkpoint_path and not os.path.exists(checkpoint_path):
+            if os.path.dirname(checkpoint_path):
+                os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+            with open(checkpoint_path, 'w') as f:
+                f.write(json.dumps({"checkpoint": header}) + "\n")
+        
+        # Interleave models so the per-model caps don't starve the shared pool
+        pairs = [
+            (model_name, customer)
+            for customer in self.test_customers
+            for model_name in self.models_to_test
+        ]
+        completed = {
+            (model_name, customer.customer_id): completed[(model_name, customer.customer_id)]
+            for model_name, customer in pairs
+            if (model_name, customer.customer_id) in completed
+        }
+        if completed:
+            logger.info(f"Resuming comparison: {len(completed)} results already checkpointed")
+        tasks = [
+            (model_name, customer) for model_name, customer in pairs
+            if (model_name, customer.customer_id) not in completed
+        ]
+        
+        model_slots = {
+            model_name: threading.BoundedSemaphore(per_model_concurrency)
+            for model_name in self.models_to_test
+        }
+        checkpoint_lock = threading.Lock()
+        
+        def run_task(task):
+            model_name, customer = task
+            with model_slots[model_name]:
+                workflow = self._get_workflow(model_name)
                 
-                # Run all test cases
-                model_results = []
-                for customer in self.test_customers:
-                    try:
-                        # Generate email campaign
-                        campaign = workflow.generate_campaign(customer)
-                        
-                        # Evaluate the campaign
-                        evaluation = self.evaluator.evaluate_run(campaign)
-                        
-                        # Record results
-                        model_results.append({
-                            "customer_id": customer.customer_id,
-                            "model": model_name,
-                            "overall_score": evaluation["overall_score"],
-                            "engagement_score": evaluation["engagement_score"],
-                            "conversion_potential": evaluation["conversion_potential"],
-                            "brand_alignment": evaluation["brand_alignment_score"],
-                            "email_content": campaign.email_body
-                        })
-                        
-                    except Exception as e:
-                        logger.error(f"Error with {model_name} on {customer.customer_id}: {str(e)}")
+                # Generate email campaign
+                campaign = workflow.generate_campaign(customer)
                 
-                # Add all results for this model
-                results.extend(model_results)
+                # Evaluate the campaign
+                evaluation = self._evaluate_campaign(campaign, customer)
                 
-            except Exception as e:
-                logger.error(f"Error initializing model {model_name}: {str(e)}")
+                # Record results
+                record = {
+                    "customer_id": customer.customer_id,
+                    "model": model_name,
+                    "overall_score": evaluation["overall_score"],
+                    "engagement_score": evaluation["engagement_score"],
+                    "conversion_potential": evaluation["conversion_potential"],
+                    "brand_alignment": evaluation["brand_alignment_score"],
+                    "email_content": campaign.email_body
+                }
+            
+            if checkpoint_path:
+                with checkpoint_lock:
+                    with open(checkpoint_path, 'a') as f:
+                        f.write(json.dumps(record) + "\n")
+            
+            return record
+        
+        logger.info(f"Running {len(tasks)} comparisons across {len(self.models_to_test)} models")
+        results = list(completed.values())
+        
+        for (model_name, customer), (record, error) in zip(
+            tasks, map_bounded(run_task, tasks, max_workers=max_workers)
+        ):
+            if error:
+                logger.error(f"Error with {model_name} on {customer.customer_id}: {str(error)}")
+            else:
+                results.append(record)
         
         # Store results
         self.comparison_results = results
         return results
     
+    def _get_workflow(self, model_name):
+        """Look up the shared workflow for a model, building it on first use"""
+        return workflow_registry.get(
+            model_name,
+            trace_name=f"{self.project_name}-{model_name}"
+        )
+    
+    def _evaluate_campaign(self, campaign, customer):
+        """
+        Evaluate a generated campaign as a run with the customer's details as inputs
+        
+        Raises:
+            RuntimeError: If the evaluation failed, so the (model, customer) cell counts as failed
+        """
+        evaluation = self.evaluator.evaluate_run(SimpleNamespace(
+            outputs={"final_email": campaign.email_body},
+            inputs={
+                "customer_name": customer.name,
+                "tariff_type": customer.tariff_type,
+                "potential_savings": customer.potential_savings,
+                "recommended_plan": customer.recommended_plan
+            }
+        ))
+        if "error" in evaluation:
+            raise RuntimeError(f"Evaluation failed: {evaluation['error']}")
+        return evaluation
+    
+    def _checkpoint_header(self):
+        """Identify a comparison run by its models, prompt version and customer set"""
+        customers = json.dumps(
+            sorted(customer.model_dump_json() for customer in self.test_customers)
+        )
+        return {
+            "models": list(self.models_to_test),
+            "prompt_version": PROMPT_TEMPLATE_VERSION,
+            "customers": hashlib.sha256(customers.encode("utf-8")).hexdigest()
+        }
+    
+    def _load_checkpoint(self, checkpoint_path, header):
+        """
+        Read completed results from a JSONL checkpoint, keyed by (model, customer_id)
+        
+        Raises:
+            ValueError: If the checkpoint header does not match this run
+        """
+        completed = {}
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            return completed
+        
+        with open(checkpoint_path, 'r') as f:
+            try:
+                stored = json.loads(f.readline()).get("checkpoint")
+            except (json.JSONDecodeError, AttributeError):
+                stored = None
+            if stored != header:
+                raise ValueError(
+                    f"Checkpoint {checkpoint_path} belongs to a different comparison run "
+                    f"(models, prompt version or customers changed); use a new checkpoint path"
+                )
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    completed[(record["model"], record["customer_id"])] = record
+                except (json.JSONDecodeError, KeyError):
+                    # A partially written final line from an interrupted run
+                    logger.warning("Skipping malformed checkpoint line")
+        
+        return completed
+    
+    def compare_pipeline_shapes(self, model_name=None, shapes=None, max_workers=COMPARISON_MAX_WORKERS):
+        """
+        Measure latency and quality of each pipeline shape on the test cases
+        
+        Args:
+            model_name: Model to run (defaults to the first model under test)
+            shapes: GENERATION_MODES values to compare (defaults to all LLM-based shapes)
+            max_workers: Number of concurrent generations
+            
+        Returns:
+            Dict with per-shape mean latency, tokens and scores, whether each shape
+            meets TARGET_SCORES, and the fastest shape that does
+        """
+        model_name = model_name or self.models_to_test[0]
+        shapes = shapes or [
+            GENERATION_MODES["FULL"],
+            GENERATION_MODES["CONDITIONAL_REFINE"],
+            GENERATION_MODES["NO_REFINE"],
+            GENERATION_MODES["COMBINED"]
+        ]
+        # Stored insights would let later shapes skip analysis and skew their latency
+        workflow = EmailCampaignWorkflow(
+            model_name=model_name,
+            trace_name=f"{self.project_name}-{model_name}-shapes",
+            llm=workflow_registry.get_llm(model_name),
+            reuse_insights=False
+        )
+        tasks = [(shape, customer) for customer in self.test_customers for shape in shapes]
+        
+        def run_task(task):
+            shape, customer = task
+            campaign = workflow.generate_campaign(customer, mode=shape)
+            evaluation = self._evaluate_campaign(campaign, customer)
+            return {
+                "shape": shape,
+                "customer_id": customer.customer_id,
+                "latency_ms": campaign.metadata["generation_time_ms"],
+                "token_count": campaign.metadata["token_count"],
+                "llm_calls": sum(
+                    1 for stage in campaign.metadata["stages"]
+                    if stage in campaign.metadata["prompt_variants"]
+                ),
+                "overall_score": evaluation["overall_score"],
+                "engagement_score": evaluation["engagement_score"],
+                "conversion_potential": evaluation["conversion_potential"],
+                "brand_alignment_score": evaluation["brand_alignment_score"]
+            }
+        
+        records = []
+        for (shape, customer), (record, error) in zip(tasks, map_bounded(run_task, tasks, max_workers=max_workers)):
+            if error:
+                logger.error(f"Error with shape {shape} on {customer.customer_id}: {str(error)}")
+            else:
+                records.append(record)
+        
+        if not records:
+            return {"model": model_name, "shapes": {}, "recommended_shape": None}
+        
+        summary = pd.DataFrame(records).groupby("shape").mean(numeric_only=True).round(2)
+        summary["meets_targets"] = pd.concat([
+            summary[metric] >= target for metric, target in TARGET_SCORES.items()
+        ], axis=1).all(axis=1)
+        
+        passing = summary[summary["meets_targets"]].sort_values("latency_ms")
+        recommended = passing.index[0] if not passing.empty else None
+        logger.info(f"Fastest pipeline shape meeting targets for {model_name}: {recommended}")
+        
+        return {
+            "model": model_name,
+            "shapes": summary.to_dict(orient="index"),
+            "recommended_shape": recommended
+        }
+    
     def analyze_results(self):
         """Analyze comparison results and create reports"""
         if not hasattr(self, 'comparison_results'):
@@ -1,33 +1,78 @@
 # orchestration/agent.py
 
+import json
+import re
+
 from langchain.agents import Tool, AgentExecutor, create_structured_chat_agent
-from langchain.memory import ConversationBufferMemory
+from langchain.memory import ConversationBufferWindowMemory, ConversationSummaryBufferMemory
 from langchain_core.messages import SystemMessage
 from langchain_openai import ChatOpenAI
+from pydantic import ValidationError
 
-from orchestration.workflow import EmailCampaignWorkflow
+from config.settings import (
+    CHAT_MEMORY_STRATEGY, CHAT_MEMORY_MAX_TURNS, CHAT_MEMORY_MAX_TOKENS, CHAT_ROUTER_ENABLED
+)
+from orchestration.memory import SessionMemoryStore
+from orchestration.registry import workflow_registry
+from orchestration.router import IntentRouter
+from prompts.campaign_templates import MARKETER_TEMPLATES
 from prompts.system_prompts import ENERGY_MARKETING_EXPERT_PROMPT
 from schemas.customer import CustomerProfile
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Fields the refinement tool needs in its payload
+REFINEMENT_FIELDS = ("email_draft", "customer_name", "tariff_type")
+
+
+def _is_customer_profile(data):
+    """Whether a routed payload is a complete, valid customer profile"""
+    try:
+        CustomerProfile.model_validate(data)
+        return True
+    except ValidationError:
+        return False
+
+
+def _is_refinement_request(data):
+    """Whether a routed payload has every field the refinement tool needs"""
+    return all(isinstance(data.get(field), str) and data[field].strip() for field in REFINEMENT_FIELDS)
+
+
 class MarketingEmailAgent:
     """
     Intelligent agent that assists marketers in generating and refining
     email campaigns for Octopus Energy customers.
     """
     
-    def __init__(self, model_name="gpt-4"):
+    def __init__(self, model_name="gpt-4", intent_classifier=None):
         self.model_name = model_name
         self.llm = ChatOpenAI(model_name=model_name, temperature=0.7)
-        self.memory = ConversationBufferMemory(return_messages=True)
         
-        # Initialize workflow for email generation
-        self.email_workflow = EmailCampaignWorkflow(model_name=model_name)
+        # Bounded conversation memory per chat session
+        self.sessions = SessionMemoryStore(self._create_session_memory)
+        
+        # Reuse the shared workflow for email generation
+        self.email_workflow = workflow_registry.get(model_name)
         
-        # Build the agent
-        self.agent_executor = self._build_agent()
+        # Build the agent once; executors are bound to a session's memory per run
+        self.agent = self._build_agent()
+        
+        # Answer obvious tool requests directly, skipping the agent's planning calls
+        self.router = self._build_router(intent_classifier)
+    
+    def _create_session_memory(self):
+        """Create an empty memory for a new chat session"""
+        if CHAT_MEMORY_STRATEGY == "summary":
+            # Summarise older turns once the history exceeds the token budget
+            return ConversationSummaryBufferMemory(
+                llm=self.llm,
+                max_token_limit=CHAT_MEMORY_MAX_TOKENS,
+                return_messages=True
+            )
+        # Keep only the most recent turns
+        return ConversationBufferWindowMemory(k=CHAT_MEMORY_MAX_TURNS, return_messages=True)
     
     def _build_agent(self):
         """Build the marketing assistant agent with appropriate tools"""
@@ -58,7 +103,8 @@ class MarketingEmailAgent:
                 name="get_email_templates",
                 func=self._get_templates,
                 description="Get available email templates for different types of campaigns like "
-                           "new plans, seasonal offers, or retention. Input can be template type or 'all'."
+                           "new plans, seasonal offers, retention, win-back, eco focus or smart meters. "
+                           "Input can be template type or 'all'."
             )
         ]
         
@@ -81,35 +127,102 @@ class MarketingEmailAgent:
         - Focus on both cost savings and environmental benefits
         """
         
+        self.tools = tools
+        
         # Create the agent
-        agent = create_structured_chat_agent(
+        return create_structured_chat_agent(
             llm=self.llm,
             tools=tools,
             system_message=SystemMessage(content=system_message)
         )
+    
+    def _build_router(self, classifier=None):
+        """Build the fast-path router mapping unambiguous requests to tool functions"""
+        router = IntentRouter(classifier=classifier)
+        router.add_rule("refine_email_content", r"\b(refine|improve|polish)\b",
+                        lambda message: self._route_with_payload(
+                            message, self._refine_email, _is_refinement_request
+                        ))
+        router.add_rule("analyze_customer_data", r"\b(analy[sz]e|insights?)\b",
+                        lambda message: self._route_with_payload(
+                            message, self._analyze_customer, _is_customer_profile
+                        ))
+        router.add_rule("generate_email_campaign", r"\b(generate|write|create|draft)\b.*\bemail\b",
+                        lambda message: self._route_with_payload(
+                            message, self._generate_email, _is_customer_profile
+                        ))
+        # Only explicit template lookups; "write an email using the retention template" is generation
+        router.add_rule("get_email_templates", r"^\s*(list|show|get)\b.*\btemplates?\b", self._route_templates)
+        return router
+    
+    def _route_templates(self, message):
+        """Serve template requests locally; the template type is read from the message"""
+        match = re.search(r"new[ _-]?plan|seasonal|retention|win[ _-]?back|eco[ _-]?focus|smart[ _-]?meter",
+                          message, re.IGNORECASE)
+        if match is None:
+            return self._get_templates("all")
+        key = re.sub(r"[ _-]", "", match.group(0).lower())
+        return self._get_templates(next(name for name in MARKETER_TEMPLATES if name.replace("_", "") == key))
+    
+    def routing_stats(self):
+        """Return how many messages the fast-path router answered without the agent"""
+        return self.router.stats()
+    
+    @staticmethod
+    def _route_with_payload(message, tool, is_complete):
+        """
+        Call a tool with the JSON object embedded in the message
         
-        # Create the agent executor
+        Declines, so the agent handles the message, if there is no object or
+        is_complete rejects it; partial payloads would only produce tool errors.
+        """
+        start, end = message.find("{"), message.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        payload = message[start:end + 1]
+        try:
+            data = json.loads(payload)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(data, dict) or not is_complete(data):
+            return None
+        return tool(payload)
+    
+    def _build_executor(self, memory):
+        """Create an agent executor bound to a session's memory"""
         return AgentExecutor.from_agent_and_tools(
-            agent=agent,
-            tools=tools,
-            memory=self.memory,
+            agent=self.agent,
+            tools=self.tools,
+            memory=memory,
             verbose=True,
             handle_parsing_errors=True
         )
     
-    def run(self, input_query):
+    def run(self, input_query, session_id="default"):
         """
         Run the agent with a user query
         
         Args:
             input_query: String query from the marketer
+            session_id: Chat session the query belongs to
             
         Returns:
             Agent response
         """
         try:
+            memory = self.sessions.get(session_id)
+            
+            if CHAT_ROUTER_ENABLED:
+                routed = self.router.route(input_query)
+                if routed is not None:
+                    _, output = routed
+                    # Keep routed turns in the session so follow-ups have context
+                    memory.save_context({"input": input_query}, {"output": output})
+                    return output
+            
             logger.info(f"Running agent with input: {input_query[:100]}...")
-            response = self.agent_executor.invoke({"input": input_query})
+            executor = self._build_executor(memory)
+            response = executor.invoke({"input": input_query})
             return response["output"]
         except Exception as e:
             logger.error(f"Error running agent: {str(e)}")
@@ -119,7 +232,6 @@ class MarketingEmailAgent:
         """Tool function to generate an email campaign"""
         try:
             # Parse customer data from JSON string
-            import json
             customer_data = json.loads(customer_json_str)
             
             # Create CustomerProfile object
@@ -137,24 +249,13 @@ class MarketingEmailAgent:
         """Tool function to analyze customer data"""
         try:
             # Parse customer data from JSON string
-            import json
             customer_data = json.loads(customer_json_str)
             
             # Create CustomerProfile object
             customer = CustomerProfile(**customer_data)
             
-            # Use the analysis chain directly
-            analysis_input = {
-                "customer_name": customer.name,
-                "tariff_type": customer.tariff_type,
-                "energy_usage": customer.energy_usage,
-                "location": customer.location,
-                "peak_usage_time": customer.peak_usage_time,
-                "customer_history": customer.history_summary if hasattr(customer, "history_summary") else ""
-            }
-            
-            result = self.email_workflow.analysis_chain.invoke(analysis_input)
-            return result["customer_insights"]
+            # Run the analysis stage on its own
+            return self.email_workflow.analyze_customer(customer)
         except Exception as e:
             logger.error(f"Error analyzing customer: {str(e)}")
             return f"Error analyzing customer data: {str(e)}"
@@ -163,88 +264,21 @@ class MarketingEmailAgent:
         """Tool function to refine an email draft"""
         try:
             # Parse input data from JSON string
-            import json
             input_data = json.loads(input_json_str)
             
-            # Use the refinement chain directly
-            refinement_input = {
-                "email_draft": input_data["email_draft"],
-                "customer_name": input_data["customer_name"],
-                "tariff_type": input_data["tariff_type"]
-            }
-            
-            result = self.email_workflow.refinement_chain.invoke(refinement_input)
-            return result["final_email"]
+            # Run the refinement stage on its own
+            return self.email_workflow.refine_email(
+                input_data["email_draft"],
+                input_data["customer_name"],
+                input_data["tariff_type"]
+            )
         except Exception as e:
             logger.error(f"Error refining email: {str(e)}")
             return f"Error refining email: {str(e)}"
     
     def _get_templates(self, template_type="all"):
         """Tool function to provide email templates"""
-        templates = {
-            "new_plan": """
-                Subject: {customer_name}, Introducing Our New {plan_name} Plan!
-                
-                Hi {customer_name},
-                
-                We've just launched our new {plan_name} designed specifically for customers like you using around {energy_usage} kWh monthly.
-                
-                This plan offers:
-                • {feature_1}
-                • {feature_2}
-                • {feature_3}
-                
-                Based on your usage, you could save approximately {potential_savings}% compared to your current {tariff_type} tariff.
-                
-                Ready to learn more? Check your personalized savings:
-                
-                [Check My Savings]
-                
-                The Octopus Energy Team
-            """,
-            "seasonal": """
-                Subject: Prepare for {season}, {customer_name} - Special Offer Inside
-                
-                Hi {customer_name},
-                
-                With {season} approaching, we've analyzed your {tariff_type} plan and found you could optimize your energy usage to save during the {season} months.
-                
-                Our {season} {plan_name} offers:
-                • {seasonal_benefit_1}
-                • {seasonal_benefit_2}
-                • Up to {potential_savings}% savings
-                
-                Your current usage of {energy_usage} kWh would cost less with our seasonal adjustments!
-                
-                Take 2 minutes to switch before {deadline}:
-                
-                [Switch to {Season} Plan]
-                
-                Stay {warm/cool} and save,
-                Octopus Energy
-            """,
-            "retention": """
-                Subject: We'd Love You to Stay, {customer_name}
-                
-                Hi {customer_name},
-                
-                We noticed you've been with us on the {tariff_type} tariff for {duration}, and we wanted to thank you for choosing Octopus Energy.
-                
-                To show our appreciation, we've prepared a special loyalty offer:
-                • {loyalty_benefit_1}
-                • {loyalty_benefit_2}
-                • An extra {loyalty_discount}% off your current rate
-                
-                With your average usage of {energy_usage} kWh, this means approximately £{savings_amount} in additional savings annually.
-                
-                Activate your loyalty rewards here:
-                
-                [Claim My Loyalty Offer]
-                
-                Thank you for being an amazing customer!
-                The Octopus Energy Team
-            """
-        }
+        templates = MARKETER_TEMPLATES
         
         if template_type.lower() == "all":
             return json.dumps(templates, indent=2)
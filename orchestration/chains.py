@@ -5,7 +5,7 @@ from langchain.prompts import PromptTemplate
 from typing import Dict, List, Any, Callable
 
 from config.settings import DEMO_MODE
-from prompts.email_templates import (
+from prompts.email_template import (
     EMAIL_ANALYSIS_TEMPLATE,
     EMAIL_GENERATION_TEMPLATE,
     EMAIL_REFINEMENT_TEMPLATE
@@ -0,0 +1,92 @@
+# orchestration/cohorts.py
+
+"""
+Bucketing of customers into cohorts for shared analysis.
+
+Customers with the same tariff, usage band, location and peak usage time get
+near-identical insights from the analysis stage. Grouping them lets a batch run
+the analysis once per cohort, on a representative profile, and pass the shared
+insights to each member's generation stage.
+"""
+
+from collections import OrderedDict
+
+from config.settings import COHORT_USAGE_BAND_KWH
+from schemas.customer import CustomerProfile
+
+
+def usage_band(energy_usage, band_kwh=COHORT_USAGE_BAND_KWH):
+    """
+    Return the (low, high) monthly kWh band containing a usage figure.
+
+    Args:
+        energy_usage: Monthly usage in kWh
+        band_kwh: Width of each band
+
+    Returns:
+        Tuple of the band's inclusive lower and exclusive upper bounds
+    """
+    low = (energy_usage // band_kwh) * band_kwh
+    return low, low + band_kwh
+
+
+def cohort_key(customer_profile, band_kwh=COHORT_USAGE_BAND_KWH):
+    """
+    Return the cohort a customer belongs to.
+
+    Returns:
+        Tuple of (tariff_type, usage band, location, peak_usage_time)
+    """
+    return (
+        customer_profile.tariff_type,
+        usage_band(customer_profile.energy_usage, band_kwh),
+        customer_profile.location,
+        customer_profile.peak_usage_time
+    )
+
+
+def group_into_cohorts(customer_profiles, band_kwh=COHORT_USAGE_BAND_KWH):
+    """
+    Group customers by cohort, preserving first-seen order.
+
+    Returns:
+        OrderedDict mapping cohort key to the indices of its members in customer_profiles
+    """
+    cohorts = OrderedDict()
+    for index, customer_profile in enumerate(customer_profiles):
+        cohorts.setdefault(cohort_key(customer_profile, band_kwh), []).append(index)
+    return cohorts
+
+
+def cohort_profile(key, member_count):
+    """
+    Build the representative profile analysed on behalf of a cohort.
+
+    Usage is set to the middle of the band; name and history are generic, since
+    the members' own details are added back at the generation stage.
+
+    Args:
+        key: Cohort key from cohort_key
+        member_count: Number of customers in the cohort
+
+    Returns:
+        CustomerProfile
+    """
+    tariff_type, (low, high), location, peak_usage_time = key
+    return CustomerProfile(
+        customer_id=f"cohort:{tariff_type}:{low}-{high}:{location}:{peak_usage_time}",
+        name="the customer",
+        tariff_type=tariff_type,
+        energy_usage=(low + high) // 2,
+        potential_savings=0,
+        recommended_plan="",
+        location=location,
+        peak_usage_time=peak_usage_time,
+        history_summary=f"Representative of {member_count} customers using {low}-{high} kWh a month"
+    )
+
+
+def describe_cohort(key):
+    """Readable cohort label for campaign metadata"""
+    tariff_type, (low, high), location, peak_usage_time = key
+    return f"{tariff_type} | {low}-{high} kWh | {location} | {peak_usage_time}"
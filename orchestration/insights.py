@@ -0,0 +1,128 @@
+# orchestration/insights.py
+
+"""
+Store of customer insights produced by the analysis stage.
+
+The analysis depends only on profile fields, not on the campaign being sent,
+so its output can be reused by later campaigns for the same customer. Entries
+are keyed by customer_id plus a fingerprint of the analysed profile fields,
+the model and the prompt template version. An entry is stale, and a fresh
+analysis is run, once it is older than INSIGHT_MAX_AGE_SECONDS or as soon as
+any fingerprinted field changes.
+"""
+
+import hashlib
+import json
+import threading
+
+from config.settings import (
+    INSIGHT_STORE_BACKEND,
+    INSIGHT_STORE_MAX_ENTRIES,
+    INSIGHT_MAX_AGE_SECONDS,
+    INSIGHT_STORE_PATH,
+    PROMPT_TEMPLATE_VERSION
+)
+from utils.cache import InMemoryLRUCache, SQLiteCache, MISSING
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Profile fields the analysis stage reads
+INSIGHT_PROFILE_FIELDS = (
+    "name", "tariff_type", "energy_usage", "location", "peak_usage_time", "history_summary"
+)
+
+
+def profile_fingerprint(customer_profile, model_name):
+    """
+    Hash the inputs that determine a customer's insights.
+
+    Args:
+        customer_profile: CustomerProfile being analysed
+        model_name: Model producing the analysis
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    payload = json.dumps({
+        "fields": {field: getattr(customer_profile, field, None) for field in INSIGHT_PROFILE_FIELDS},
+        "model_name": model_name,
+        "template_version": PROMPT_TEMPLATE_VERSION
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class InsightStore:
+    """
+    Customer insights keyed by customer_id and profile fingerprint, on any cache backend.
+    Staleness by age is enforced by the backend's TTL.
+    """
+
+    def __init__(self, cache):
+        """
+        Args:
+            cache: InMemoryLRUCache or SQLiteCache whose TTL is the maximum insight age
+        """
+        self.cache = cache
+
+    @staticmethod
+    def key(customer_profile, model_name):
+        return f"{customer_profile.customer_id}:{profile_fingerprint(customer_profile, model_name)}"
+
+    def get(self, customer_profile, model_name):
+        """
+        Return stored insights for a customer, or None if absent or stale.
+        """
+        insights = self.cache.get(self.key(customer_profile, model_name))
+        return None if insights is MISSING else insights
+
+    def put(self, customer_profile, model_name, insights):
+        """Store insights for a customer"""
+        self.cache.set(self.key(customer_profile, model_name), insights)
+
+    def invalidate(self, customer_profile, model_name):
+        """Drop the stored insights for a customer, forcing a fresh analysis"""
+        self.cache.delete(self.key(customer_profile, model_name))
+
+    def stats(self):
+        """Return hit/miss counters of the underlying backend"""
+        return self.cache.stats()
+
+
+def create_insight_store(backend=INSIGHT_STORE_BACKEND):
+    """
+    Create an insight store for the configured backend.
+
+    Args:
+        backend: "memory", "sqlite" or "none"
+
+    Returns:
+        InsightStore, or None if insight reuse is disabled
+    """
+    if backend == "memory":
+        return InsightStore(InMemoryLRUCache(
+            max_entries=INSIGHT_STORE_MAX_ENTRIES, ttl_seconds=INSIGHT_MAX_AGE_SECONDS
+        ))
+    elif backend == "sqlite":
+        return InsightStore(SQLiteCache(
+            path=INSIGHT_STORE_PATH, ttl_seconds=INSIGHT_MAX_AGE_SECONDS, table="customer_insights"
+        ))
+    elif backend in ("none", "", None):
+        return None
+    else:
+        raise ValueError(f"Unsupported insight store backend: {backend}")
+
+
+_insight_store = None
+_insight_store_lock = threading.Lock()
+
+
+def get_insight_store():
+    """Return the process-wide insight store, creating it on first use"""
+    global _insight_store
+    with _insight_store_lock:
+        if _insight_store is None:
+            _insight_store = create_insight_store()
+            if _insight_store is not None:
+                logger.info(f"Using {INSIGHT_STORE_BACKEND} customer insight store")
+        return _insight_store
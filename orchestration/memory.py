@@ -0,0 +1,53 @@
+# orchestration/memory.py
+
+"""
+Session-scoped conversation memory for the marketing assistant agent.
+
+Each chat session gets its own bounded memory, created on first use. Sessions
+that have been idle longer than the TTL, or that fall off the end of the LRU
+once the session limit is reached, are evicted so memory use stays flat.
+"""
+
+import threading
+
+from config.settings import CHAT_MAX_SESSIONS, CHAT_SESSION_TTL_SECONDS
+from utils.cache import InMemoryLRUCache, MISSING
+
+
+class SessionMemoryStore:
+    """
+    Thread-safe store mapping session IDs to conversation memory objects.
+    """
+
+    def __init__(self, memory_factory, max_sessions=CHAT_MAX_SESSIONS,
+                 idle_ttl_seconds=CHAT_SESSION_TTL_SECONDS):
+        """
+        Args:
+            memory_factory: Callable returning a new, empty memory for a session
+            max_sessions: Maximum number of sessions kept before LRU eviction
+            idle_ttl_seconds: Seconds of inactivity after which a session is dropped
+        """
+        self.memory_factory = memory_factory
+        self._sessions = InMemoryLRUCache(max_entries=max_sessions, ttl_seconds=idle_ttl_seconds)
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """Return the memory for a session, creating it if new or expired"""
+        with self._lock:
+            memory = self._sessions.get(session_id)
+            if memory is MISSING:
+                memory = self.memory_factory()
+            # Re-store on every access so the TTL measures idle time
+            self._sessions.set(session_id, memory)
+            return memory
+
+    def end(self, session_id):
+        """Discard a session's memory"""
+        self._sessions.delete(session_id)
+
+    def stats(self):
+        """Return session counts and lookup counters"""
+        return self._sessions.stats()
+
+    def __len__(self):
+        return len(self._sessions)
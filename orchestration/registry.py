@@ -0,0 +1,96 @@
+# orchestration/registry.py
+
+"""
+Process-wide registry of EmailCampaignWorkflow instances and LLM clients.
+
+Building a workflow creates an LLM client with its own HTTP connection pool.
+The registry builds each (model_name, temperature, trace_name) workflow once,
+shares it between callers and evicts the least recently used entries, so
+switching models at request time is a lookup. LLM clients carry no tracer, so
+workflows of the same model and temperature share one client whatever their
+trace name.
+"""
+
+import threading
+
+from config.settings import WORKFLOW_REGISTRY_MAX_SIZE
+from orchestration.workflow import EmailCampaignWorkflow
+from utils.cache import InMemoryLRUCache, MISSING, with_llm_cache
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class WorkflowRegistry:
+    """
+    Thread-safe, lazily populated registry of workflows keyed by (model_name,
+    temperature, trace_name) and LLM clients keyed by (model_name, temperature).
+    """
+
+    def __init__(self, max_size=WORKFLOW_REGISTRY_MAX_SIZE):
+        # Entries are evicted by recency only, never by age
+        self._workflows = InMemoryLRUCache(max_entries=max_size, ttl_seconds=0)
+        self._llms = InMemoryLRUCache(max_entries=max_size, ttl_seconds=0)
+        self._lock = threading.RLock()
+
+    def get_llm(self, model_name, temperature=0.7):
+        """
+        Return the shared LLM client for a model, creating it on first use.
+
+        Args:
+            model_name: Name of the model
+            temperature: Sampling temperature
+
+        Returns:
+            LLM client wrapped with the response cache
+        """
+        key = (model_name, temperature)
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is MISSING:
+                llm = with_llm_cache(EmailCampaignWorkflow._initialize_llm(model_name, temperature))
+                self._llms.set(key, llm)
+            return llm
+
+    def get(self, model_name, temperature=0.7, trace_name="octopus-email-campaign"):
+        """
+        Return the shared workflow for a model, building it on first use.
+
+        Args:
+            model_name: Name of the model
+            temperature: Sampling temperature
+            trace_name: LangSmith project the workflow's runs are traced to
+
+        Returns:
+            EmailCampaignWorkflow instance
+        """
+        key = (model_name, temperature, trace_name)
+        with self._lock:
+            workflow = self._workflows.get(key)
+            if workflow is MISSING:
+                logger.info(f"Building workflow for {model_name} (temperature={temperature}, trace={trace_name})")
+                workflow = EmailCampaignWorkflow(
+                    model_name=model_name,
+                    trace_name=trace_name,
+                    temperature=temperature,
+                    llm=self.get_llm(model_name, temperature)
+                )
+                self._workflows.set(key, workflow)
+            return workflow
+
+    def clear(self):
+        """Drop all cached workflows and LLM clients"""
+        with self._lock:
+            self._workflows.clear()
+            self._llms.clear()
+
+    def stats(self):
+        """Return hit/miss counters for workflow and LLM lookups"""
+        return {
+            "workflows": self._workflows.stats(),
+            "llms": self._llms.stats()
+        }
+
+
+# Shared registry used by the marketing agent and the model comparison runner
+workflow_registry = WorkflowRegistry()
@@ -0,0 +1,101 @@
+# orchestration/router.py
+
+"""
+Deterministic intent router that answers obvious tool requests without the agent.
+
+Rules are checked in the order they were added. A rule matches when its regex
+matches the message, and its handler either returns a response or None to
+decline (e.g. when required input is missing). If no rule answers, an optional
+classifier callable returning (intent, confidence) is consulted. Anything still
+unanswered falls through to the full agent.
+"""
+
+import re
+import threading
+
+from config.settings import ROUTER_MIN_CONFIDENCE
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IntentRouter:
+    """
+    Routes chat messages straight to tool functions when the intent is unambiguous.
+    """
+
+    def __init__(self, classifier=None, min_confidence=ROUTER_MIN_CONFIDENCE):
+        """
+        Args:
+            classifier: Optional callable mapping a message to (intent, confidence),
+                e.g. a small local text classifier
+            min_confidence: Minimum classifier confidence required to route
+        """
+        self.classifier = classifier
+        self.min_confidence = min_confidence
+        self.rules = []
+        self.handlers = {}
+        self._counts = {"routed": 0, "fallthrough": 0, "intents": {}}
+        self._lock = threading.Lock()
+
+    def add_rule(self, intent, pattern, handler):
+        """
+        Register a keyword/regex rule for an intent.
+
+        Args:
+            intent: Name of the intent
+            pattern: Regex searched case-insensitively in the message
+            handler: Callable taking the message and returning a response or None
+        """
+        self.rules.append((intent, re.compile(pattern, re.IGNORECASE), handler))
+        # The first handler registered for an intent also serves classifier matches
+        self.handlers.setdefault(intent, handler)
+
+    def route(self, message):
+        """
+        Try to answer a message without the agent.
+
+        Args:
+            message: User message
+
+        Returns:
+            Tuple of (intent, response), or None if the agent should handle it
+        """
+        for intent, pattern, handler in self.rules:
+            if pattern.search(message):
+                response = handler(message)
+                if response is not None:
+                    return self._record(intent, response)
+
+        if self.classifier is not None:
+            try:
+                intent, confidence = self.classifier(message)
+            except Exception as e:
+                logger.warning(f"Intent classifier failed: {str(e)}")
+            else:
+                if intent in self.handlers and confidence >= self.min_confidence:
+                    response = self.handlers[intent](message)
+                    if response is not None:
+                        return self._record(intent, response)
+
+        with self._lock:
+            self._counts["fallthrough"] += 1
+        return None
+
+    def _record(self, intent, response):
+        with self._lock:
+            self._counts["routed"] += 1
+            self._counts["intents"][intent] = self._counts["intents"].get(intent, 0) + 1
+        logger.info(f"Routed message to '{intent}' without the agent")
+        return intent, response
+
+    def stats(self):
+        """Return routed/fallthrough counts, per-intent counts and the routing hit rate"""
+        with self._lock:
+            total = self._counts["routed"] + self._counts["fallthrough"]
+            return {
+                "routed": self._counts["routed"],
+                "fallthrough": self._counts["fallthrough"],
+                "intents": dict(self._counts["intents"]),
+                "hit_rate": round(self._counts["routed"] / total, 4) if total else 0.0
+            }
@@ -1,22 +1,37 @@
 # orchestration/workflow.py
 
-from langchain.chains import LLMChain, SequentialChain
-from langchain.memory import ConversationBufferMemory
-from langchain_core.tracers import LangChainTracer
-from langchain.prompts import PromptTemplate
 import langsmith
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_community.chat_models import BedrockChat
+from langchain_core.messages import SystemMessage, HumanMessage
 
-from config.settings import LANGSMITH_API_KEY, OPENAI_API_KEY, ANTHROPIC_API_KEY, AWS_REGION
-from prompts.email_templates import (
-    EMAIL_ANALYSIS_TEMPLATE,
-    EMAIL_GENERATION_TEMPLATE,
-    EMAIL_REFINEMENT_TEMPLATE
+import asyncio
+import hashlib
+import itertools
+import json
+from collections import deque
+from typing import Iterable, Iterator, List, Optional
+
+from config.constraints import CAMPAIGN_TYPES, GENERATION_MODES
+from config.settings import (
+    LANGSMITH_API_KEY, OPENAI_API_KEY, ANTHROPIC_API_KEY, AWS_REGION,
+    BATCH_MAX_WORKERS, ASYNC_MAX_CONCURRENCY, CAMPAIGN_GENERATION_MODES, DEFAULT_GENERATION_MODE,
+    EXPORT_DIR, EXPORT_FORMAT, PROMPT_TEMPLATE_VERSION, PROMPT_VARIANT_WEIGHTS
 )
+from evaluation.heuristics import HeuristicGate
+from prompts.email_template import EMAIL_REFINEMENT_PROMPT
+from orchestration.cohorts import cohort_key, cohort_profile, describe_cohort, group_into_cohorts
+from orchestration.insights import get_insight_store
+from prompts.campaign_templates import CAMPAIGN_BODY_PROMPTS, DEFAULT_PERSONAL_PARAGRAPH_PROMPT
+from prompts.experiments import choose_prompt_variants, choose_template_variants
+from prompts.registry import prompt_registry
 from schemas.customer import CustomerProfile
-from schemas.email import EmailCampaign
+from schemas.email import EmailCampaign, CampaignResult
+from utils.cache import with_llm_cache
+from utils.concurrency import imap_bounded
+from utils.export import create_exporter
+from utils.instrumentation import StageMetrics, reported_token_usage, reported_cached_tokens
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -30,43 +45,42 @@ class EmailCampaignWorkflow:
     3. Email Refinement and Optimization
     """
     
-    def __init__(self, model_name="gpt-4", trace_name="octopus-email-campaign"):
+    def __init__(self, model_name="gpt-4", trace_name="octopus-email-campaign",
+                 temperature=0.7, llm=None, reuse_insights=True):
         self.trace_name = trace_name
         self.model_name = model_name
-        self.tracer = LangChainTracer(project_name=trace_name)
-        
-        # Initialize the appropriate LLM based on model_name
-        self.llm = self._initialize_llm(model_name)
-        
-        # Set up conversation memory
-        self.memory = ConversationBufferMemory(return_messages=True)
+        self.temperature = temperature
         
-        # Build the individual chains
-        self.analysis_chain = self._build_analysis_chain()
-        self.generation_chain = self._build_generation_chain()
-        self.refinement_chain = self._build_refinement_chain()
+        # Initialize the appropriate LLM based on model_name, behind the response cache,
+        # unless a shared client is passed in (see orchestration/registry.py)
+        if llm is None:
+            llm = with_llm_cache(self._initialize_llm(model_name, temperature))
+        self.llm = llm
         
-        # Build the sequential workflow
-        self.workflow = self._build_workflow()
+        # Customer insights from earlier campaigns, reused to skip the analysis stage
+        self.insight_store = get_insight_store() if reuse_insights else None
+        # Heuristic check deciding whether a draft needs the refinement stage
+        self.draft_gate = HeuristicGate()
     
-    def _initialize_llm(self, model_name):
+    @staticmethod
+    def _initialize_llm(model_name, temperature=0.7):
         """Initialize the appropriate LLM based on model_name"""
         # DEMO MODE: Use mock LLM instead of actual API calls
         from utils.mock_llm import MockLLM
-        return MockLLM(model_name=model_name)
+        return MockLLM(model_name=model_name, temperature=temperature)
         
         # PRODUCTION MODE (commented out for demo)
         """
         if model_name.startswith("gpt"):
             return ChatOpenAI(
                 model_name=model_name,
-                temperature=0.7,
+                temperature=temperature,
                 openai_api_key=OPENAI_API_KEY
             )
         elif model_name.startswith("claude"):
             return ChatAnthropic(
                 model=model_name,
-                temperature=0.7,
+                temperature=temperature,
                 anthropic_api_key=ANTHROPIC_API_KEY
             )
         elif model_name.startswith("bedrock"):
@@ -75,74 +89,30 @@ class EmailCampaignWorkflow:
             return BedrockChat(
                 model_id=model_id,
                 region_name=AWS_REGION,
-                model_kwargs={"temperature": 0.7}
+                model_kwargs={"temperature": temperature}
             )
         else:
             raise ValueError(f"Unsupported model: {model_name}")
         """
     
-    def _build_analysis_chain(self):
-        """Build the customer data analysis chain"""
-        analysis_prompt = PromptTemplate(
-            template=EMAIL_ANALYSIS_TEMPLATE,
-            input_variables=["customer_name", "tariff_type", "energy_usage", 
-                            "location", "peak_usage_time", "customer_history"]
-        )
-        
-        return LLMChain(
-            llm=self.llm,
-            prompt=analysis_prompt,
-            output_key="customer_insights",
-            verbose=True
-        )
-    
-    def _build_generation_chain(self):
-        """Build the email generation chain"""
-        generation_prompt = PromptTemplate(
-            template=EMAIL_GENERATION_TEMPLATE,
-            input_variables=["customer_name", "tariff_type", "energy_usage", 
-                           "potential_savings", "recommended_plan", 
-                           "location", "peak_usage_time", "customer_insights"]
-        )
-        
-        return LLMChain(
-            llm=self.llm,
-            prompt=generation_prompt,
-            output_key="email_draft",
-            verbose=True
-        )
-    
-    def _build_refinement_chain(self):
-        """Build the email refinement and optimization chain"""
-        refinement_prompt = PromptTemplate(
-            template=EMAIL_REFINEMENT_TEMPLATE,
-            input_variables=["email_draft", "customer_name", "tariff_type"]
-        )
-        
-        return LLMChain(
-            llm=self.llm,
-            prompt=refinement_prompt,
-            output_key="final_email",
-            verbose=True
-        )
-    
-    def _build_workflow(self):
-        """Build the complete sequential workflow"""
-        return SequentialChain(
-            chains=[self.analysis_chain, self.generation_chain, self.refinement_chain],
-            input_variables=["customer_name", "tariff_type", "energy_usage", 
-                           "potential_savings", "recommended_plan", 
-                           "location", "peak_usage_time", "customer_history"],
-            output_variables=["customer_insights", "email_draft", "final_email"],
-            verbose=True
-        )
-    
-    def generate_campaign(self, customer_profile: CustomerProfile) -> EmailCampaign:
+    def generate_campaign(
+        self,
+        customer_profile: CustomerProfile,
+        campaign_type: Optional[str] = None,
+        mode: Optional[str] = None,
+        customer_insights: Optional[str] = None
+    ) -> EmailCampaign:
         """
         Generate an email campaign for a specific customer
         
         Args:
             customer_profile: Customer data including usage patterns
+            campaign_type: One of CAMPAIGN_TYPES; selects the generation mode
+                configured for that type and the template used by template modes
+            mode: One of GENERATION_MODES, overriding the mode configured for
+                the campaign type
+            customer_insights: Precomputed insights; when given, or when valid
+                insights are in the insight store, the analysis stage is skipped
             
         Returns:
             EmailCampaign object containing the generated campaign
@@ -150,42 +120,597 @@ class EmailCampaignWorkflow:
         try:
             # Start tracing with LangSmith
             with langsmith.trace(
+                name="generate_campaign",
                 project_name=self.trace_name,
                 tags=["production", f"model:{self.model_name}"]
             ):
-                # Prepare inputs
-                inputs = {
-                    "customer_name": customer_profile.name,
-                    "tariff_type": customer_profile.tariff_type,
-                    "energy_usage": customer_profile.energy_usage,
-                    "potential_savings": customer_profile.potential_savings,
-                    "recommended_plan": customer_profile.recommended_plan,
-                    "location": customer_profile.location,
-                    "peak_usage_time": customer_profile.peak_usage_time,
-                    "customer_history": customer_profile.history_summary
-                }
+                logger.info(f"Generating campaign for customer: {customer_profile.name}")
+                metrics = StageMetrics()
+                values = self._build_inputs(customer_profile)
+                mode = self.generation_mode(campaign_type, mode)
+                
+                # Execute each stage of the pipeline shape in turn
+                for stage, output_key in self._plan_stages(mode, customer_profile, values, customer_insights):
+                    self._run_stage(stage, output_key, values, metrics)
+                self._save_insights(customer_profile, values)
+                if mode == GENERATION_MODES["CONDITIONAL_REFINE"] and self._needs_refinement(values, metrics):
+                    self._run_stage("refinement", "final_email", values, metrics)
                 
-                # Execute the workflow
+                if mode in (GENERATION_MODES["TEMPLATE_ASSISTED"], GENERATION_MODES["TEMPLATE_ONLY"]):
+                    return self._build_templated_campaign(customer_profile, campaign_type, mode, values, metrics)
+                return self._build_campaign(customer_profile, values, metrics, mode)
+                
+        except Exception as e:
+            logger.error(f"Error generating campaign: {str(e)}")
+            raise
+    
+    async def agenerate_campaign(
+        self,
+        customer_profile: CustomerProfile,
+        campaign_type: Optional[str] = None,
+        mode: Optional[str] = None,
+        customer_insights: Optional[str] = None
+    ) -> EmailCampaign:
+        """
+        Generate an email campaign for a specific customer without blocking
+        
+        Each stage of the analysis, generation and refinement chains is awaited,
+        so the event loop can serve other generations while waiting on the LLM.
+        
+        Args:
+            customer_profile: Customer data including usage patterns
+            campaign_type: One of CAMPAIGN_TYPES, as for generate_campaign
+            mode: One of GENERATION_MODES, as for generate_campaign
+            customer_insights: Precomputed insights, as for generate_campaign
+            
+        Returns:
+            EmailCampaign object containing the generated campaign
+        """
+        try:
+            with langsmith.trace(
+                name="agenerate_campaign",
+                project_name=self.trace_name,
+                tags=["production", f"model:{self.model_name}"]
+            ):
                 logger.info(f"Generating campaign for customer: {customer_profile.name}")
-                results = self.workflow.invoke(inputs)
+                metrics = StageMetrics()
+                values = self._build_inputs(customer_profile)
+                mode = self.generation_mode(campaign_type, mode)
                 
-                # Create EmailCampaign object
-                campaign = EmailCampaign(
-                    customer_id=customer_profile.customer_id,
-                    email_subject=self._extract_subject(results["final_email"]),
-                    email_body=results["final_email"],
-                    customer_insights=results["customer_insights"],
-                    draft_version=results["email_draft"],
-                    final_version=results["final_email"],
-                    model_used=self.model_name
-                )
+                for stage, output_key in self._plan_stages(mode, customer_profile, values, customer_insights):
+                    await self._arun_stage(stage, output_key, values, metrics)
+                self._save_insights(customer_profile, values)
+                if mode == GENERATION_MODES["CONDITIONAL_REFINE"] and self._needs_refinement(values, metrics):
+                    await self._arun_stage("refinement", "final_email", values, metrics)
                 
-                return campaign
+                if mode in (GENERATION_MODES["TEMPLATE_ASSISTED"], GENERATION_MODES["TEMPLATE_ONLY"]):
+                    return self._build_templated_campaign(customer_profile, campaign_type, mode, values, metrics)
+                return self._build_campaign(customer_profile, values, metrics, mode)
                 
         except Exception as e:
             logger.error(f"Error generating campaign: {str(e)}")
             raise
     
+    @staticmethod
+    def generation_mode(campaign_type=None, mode=None):
+        """
+        Resolve the generation mode for a request
+        
+        Args:
+            campaign_type: One of CAMPAIGN_TYPES, or None
+            mode: Explicitly requested mode, taking precedence over the campaign type
+            
+        Returns:
+            One of GENERATION_MODES
+        """
+        mode = mode or CAMPAIGN_GENERATION_MODES.get(campaign_type, DEFAULT_GENERATION_MODE)
+        if mode not in GENERATION_MODES.values():
+            raise ValueError(f"Unknown generation mode '{mode}' for campaign type '{campaign_type}'")
+        return mode
+    
+    def _stage_plan(self, mode):
+        """The LLM stages run unconditionally for a mode, as (stage name, output key) pairs"""
+        analysis = ("analysis", "customer_insights")
+        generation = ("generation", "email_draft")
+        refinement = ("refinement", "final_email")
+        return {
+            GENERATION_MODES["FULL"]: [analysis, generation, refinement],
+            GENERATION_MODES["CONDITIONAL_REFINE"]: [analysis, generation],
+            GENERATION_MODES["NO_REFINE"]: [analysis, generation],
+            GENERATION_MODES["COMBINED"]: [("combined", "final_email")],
+            GENERATION_MODES["TEMPLATE_ASSISTED"]: [("personalization", "personal_paragraph")],
+            GENERATION_MODES["TEMPLATE_ONLY"]: []
+        }[mode]
+    
+    def _plan_stages(self, mode, customer_profile, values, customer_insights=None):
+        """
+        The stages to run for a mode, without the analysis stage when insights are already known
+        
+        Insights passed in by the caller take precedence over stored ones. The source is
+        recorded in values["insights_source"].
+        """
+        plan = self._stage_plan(mode)
+        if not any(stage == "analysis" for stage, _ in plan):
+            return plan
+        
+        if customer_insights is None and self.insight_store is not None:
+            customer_insights = self.insight_store.get(customer_profile, self.model_name)
+            source = "store"
+        else:
+            source = "provided"
+        
+        if customer_insights is None:
+            values["insights_source"] = "analysis"
+            return plan
+        
+        values["customer_insights"] = customer_insights
+        values["insights_source"] = source
+        return [(stage, output_key) for stage, output_key in plan if stage != "analysis"]
+    
+    def _save_insights(self, customer_profile, values):
+        """Store freshly generated insights for later campaigns"""
+        if self.insight_store is not None and values.get("insights_source") == "analysis":
+            self.insight_store.put(customer_profile, self.model_name, values["customer_insights"])
+    
+    def _needs_refinement(self, values, metrics):
+        """
+        Run the quick draft check for conditional refinement
+        
+        The draft passes if the heuristic scorer rates it clearly fine, measured
+        locally without an LLM call. The result is kept in values["draft_check"].
+        """
+        with metrics.stage("draft_check"):
+            assessment = self.draft_gate.assess(values["email_draft"], {
+                "name": values["customer_name"],
+                "tariff_type": values["tariff_type"],
+                "energy_usage": values["energy_usage"],
+                "location": values["location"],
+                "potential_savings": values["potential_savings"],
+                "recommended_plan": values["recommended_plan"]
+            })
+        passed = assessment["verdict"] == HeuristicGate.PASS
+        values["draft_check"] = {
+            "heuristic_score": assessment["heuristic_score"],
+            "personalization_score": assessment["personalization_score"],
+            "word_count": assessment["word_count"],
+            "failed_checks": [name for name, ok in assessment["checks"].items() if ok is False],
+            "passed": passed
+        }
+        return not passed
+    
+    def _render_stage_prompt(self, stage, values):
+        """Render the prompt variant chosen for this stage from the values accumulated so far"""
+        return prompt_registry.render(values["prompt_variants"][stage], **values)
+    
+    def _provider_prompt(self, prompt):
+        """
+        Split a rendered prompt into a cacheable system prefix and a per-customer message.
+        
+        Claude models get the prefix marked with cache_control; OpenAI and Bedrock
+        models cache a repeated leading system message automatically.
+        """
+        prefix = getattr(prompt, "cache_prefix", "")
+        if not prefix:
+            return prompt
+        if self.model_name.startswith("claude"):
+            system = SystemMessage(content=[
+                {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}
+            ])
+        else:
+            system = SystemMessage(content=prefix)
+        return [system, HumanMessage(content=prompt.suffix)]
+    
+    def _run_stage(self, stage, output_key, values, metrics):
+        """Run one stage, storing its output under the given key"""
+        prompt = self._render_stage_prompt(stage, values)
+        with metrics.stage(stage):
+            response = self.llm.invoke(self._provider_prompt(prompt))
+        values[output_key] = self._record_stage(stage, prompt, response, metrics)
+    
+    async def _arun_stage(self, stage, output_key, values, metrics):
+        """Async variant of _run_stage"""
+        prompt = self._render_stage_prompt(stage, values)
+        with metrics.stage(stage):
+            response = await self.llm.ainvoke(self._provider_prompt(prompt))
+        values[output_key] = self._record_stage(stage, prompt, response, metrics)
+    
+    def _record_stage(self, stage, prompt, response, metrics):
+        """Record token usage for a stage and return its output text"""
+        text = getattr(response, "content", response)
+        prompt_tokens, completion_tokens = reported_token_usage(response)
+        metrics.record_tokens(
+            stage,
+            prompt=prompt,
+            completion=text,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_prompt_tokens=reported_cached_tokens(response)
+        )
+        return text
+    
+    def _build_inputs(self, customer_profile):
+        """Map a customer profile onto the workflow input variables"""
+        return {
+            "customer_name": customer_profile.name,
+            "tariff_type": customer_profile.tariff_type,
+            "energy_usage": customer_profile.energy_usage,
+            "potential_savings": customer_profile.potential_savings,
+            "recommended_plan": customer_profile.recommended_plan,
+            "location": customer_profile.location,
+            "peak_usage_time": customer_profile.peak_usage_time,
+            "customer_history": customer_profile.history_summary,
+            # A/B prompt variant per stage, stable for each customer
+            "prompt_variants": {
+                **choose_prompt_variants(customer_profile.customer_id),
+                "combined": "email_combined",
+                "personalization": "personal_paragraph"
+            }
+        }
+    
+    def _build_campaign(self, customer_profile, results, metrics, mode=GENERATION_MODES["FULL"]):
+        """Create an EmailCampaign object from the workflow outputs"""
+        # Without a refinement stage the draft is the final email
+        final_email = results.get("final_email") or results["email_draft"]
+        with metrics.stage("subject_extraction"):
+            email_subject = self._extract_subject(final_email)
+        
+        metadata = {
+            **metrics.as_metadata(),
+            "generation_mode": mode,
+            "prompt_variants": self._used_prompt_variants(results, metrics)
+        }
+        if "draft_check" in results:
+            metadata["draft_check"] = results["draft_check"]
+        if "insights_source" in results:
+            metadata["insights_source"] = results["insights_source"]
+        
+        return EmailCampaign(
+            customer_id=customer_profile.customer_id,
+            email_subject=email_subject,
+            email_body=final_email,
+            customer_insights=results.get("customer_insights"),
+            draft_version=results.get("email_draft"),
+            final_version=final_email,
+            model_used=self.model_name,
+            metadata=metadata
+        )
+    
+    @staticmethod
+    def _used_prompt_variants(values, metrics):
+        """The prompt variants of the stages that actually ran"""
+        return {
+            stage: variant for stage, variant in values["prompt_variants"].items()
+            if stage in metrics.stages
+        }
+    
+    def _build_templated_campaign(self, customer_profile, campaign_type, mode, values, metrics):
+        """
+        Render an EmailCampaign from the campaign templates
+        
+        The subject line and CTA styles are A/B variants chosen per customer. The
+        opening paragraph is the LLM output in template-assisted mode, or a fixed
+        sentence in template-only mode.
+        """
+        campaign_type = campaign_type or CAMPAIGN_TYPES["NEW_PLAN"]
+        if campaign_type not in CAMPAIGN_BODY_PROMPTS:
+            raise ValueError(f"No email template for campaign type '{campaign_type}'")
+        
+        with metrics.stage("template_rendering"):
+            fields = {
+                **values,
+                "location": customer_profile.location or "your area",
+                "peak_usage_time": (customer_profile.peak_usage_time or "peak hours").lower()
+            }
+            variants = choose_template_variants(customer_profile.customer_id)
+            email_subject = prompt_registry.render(variants["subject"], **fields)
+            paragraph = values.get("personal_paragraph") or DEFAULT_PERSONAL_PARAGRAPH_PROMPT.render(**fields)
+            email_body = CAMPAIGN_BODY_PROMPTS[campaign_type].render(**{
+                **fields,
+                "personal_paragraph": paragraph.strip(),
+                "cta": prompt_registry.render(variants["cta"], **fields)
+            })
+            final_email = f"Subject: {email_subject}\n\n{email_body}"
+        
+        return EmailCampaign(
+            customer_id=customer_profile.customer_id,
+            email_subject=email_subject,
+            email_body=final_email,
+            final_version=final_email,
+            model_used=self.model_name if "personal_paragraph" in values else "template",
+            metadata={
+                **metrics.as_metadata(),
+                "generation_mode": mode,
+                "campaign_type": campaign_type,
+                "template_variants": variants,
+                "prompt_variants": self._used_prompt_variants(values, metrics)
+            }
+        )
+    
+    def generate_campaigns(
+        self,
+        customer_profiles: List[CustomerProfile],
+        max_workers: Optional[int] = None,
+        campaign_type: Optional[str] = None,
+        mode: Optional[str] = None,
+        cohort_analysis: bool = False
+    ) -> List[CampaignResult]:
+        """
+        Generate email campaigns for many customers concurrently
+        
+        Args:
+            customer_profiles: Customer profiles to generate campaigns for
+            max_workers: Maximum number of concurrent generations
+                (defaults to BATCH_MAX_WORKERS)
+            campaign_type: Campaign type applied to every customer
+            mode: Generation mode applied to every customer
+            cohort_analysis: Run the analysis stage once per cohort of similar
+                customers and share its insights with every member
+            
+        Returns:
+            List of CampaignResult objects in the same order as the input,
+            each holding either the campaign or the error for that customer
+        """
+        max_workers = max_workers or BATCH_MAX_WORKERS
+        logger.info(f"Generating campaigns for {len(customer_profiles)} customers "
+                    f"with {max_workers} workers")
+        
+        if cohort_analysis and self._mode_runs_analysis(campaign_type, mode):
+            cohorts = group_into_cohorts(customer_profiles)
+            cohort_keys = list(cohorts)
+            logger.info(f"Analysing {len(cohorts)} cohorts instead of {len(customer_profiles)} customers")
+            cohort_insights = {}
+            for index, insights, error in imap_bounded(
+                lambda key: self.analyze_customer(cohort_profile(key, len(cohorts[key]))),
+                cohort_keys,
+                max_workers=max_workers
+            ):
+                cohort_insights[cohort_keys[index]] = error or insights
+            
+            def generate(customer_profile):
+                key = cohort_key(customer_profile)
+                insights = cohort_insights[key]
+                if isinstance(insights, Exception):
+                    raise insights
+                campaign = self.generate_campaign(customer_profile, campaign_type, mode, customer_insights=insights)
+                return self._tag_cohort(campaign, key)
+        else:
+            def generate(customer_profile):
+                return self.generate_campaign(customer_profile, campaign_type, mode)
+        
+        results = []
+        for index, campaign, error in imap_bounded(generate, customer_profiles, max_workers=max_workers):
+            results.append(CampaignResult(
+                index=index,
+                customer_id=customer_profiles[index].customer_id,
+                campaign=campaign,
+                error=str(error) if error else None
+            ))
+        
+        return results
+    
+    def iter_campaigns(
+        self,
+        customer_profiles: Iterable[CustomerProfile],
+        max_workers: Optional[int] = None,
+        campaign_type: Optional[str] = None,
+        mode: Optional[str] = None,
+        start_index: int = 0
+    ) -> Iterator[CampaignResult]:
+        """
+        Generate campaigns lazily, yielding each result in input order as it completes
+        
+        Profiles are pulled from the iterable only as workers free up, so a
+        generator of any length can be streamed without holding every profile
+        or campaign in memory.
+        
+        Args:
+            customer_profiles: Iterable of customer profiles
+            max_workers: Maximum number of concurrent generations
+                (defaults to BATCH_MAX_WORKERS)
+            campaign_type: Campaign type applied to every customer
+            mode: Generation mode applied to every customer
+            start_index: Index given to the first profile, e.g. when resuming
+            
+        Yields:
+            CampaignResult objects holding either the campaign or the error
+        """
+        # Customer IDs of profiles in flight, consumed in the same order results arrive
+        customer_ids = deque()
+        
+        def track(profiles):
+            for customer_profile in profiles:
+                customer_ids.append(customer_profile.customer_id)
+                yield customer_profile
+        
+        for index, campaign, error in imap_bounded(
+            lambda customer_profile: self.generate_campaign(customer_profile, campaign_type, mode),
+            track(customer_profiles),
+            max_workers=max_workers or BATCH_MAX_WORKERS
+        ):
+            yield CampaignResult(
+                index=start_index + index,
+                customer_id=customer_ids.popleft(),
+                campaign=campaign,
+                error=str(error) if error else None
+            )
+    
+    def export_campaigns(
+        self,
+        customer_profiles: Iterable[CustomerProfile],
+        directory: str = EXPORT_DIR,
+        export_format: str = EXPORT_FORMAT,
+        max_workers: Optional[int] = None,
+        campaign_type: Optional[str] = None,
+        mode: Optional[str] = None,
+        resume: bool = False,
+        **exporter_options
+    ) -> dict:
+        """
+        Generate campaigns and stream them to part files as they complete
+        
+        Args:
+            customer_profiles: Iterable of customer profiles, in the same order on every run
+            directory: Output directory, one per export run
+            export_format: "jsonl.gz", "csv" or "parquet"
+            max_workers: Maximum number of concurrent generations
+            campaign_type: Campaign type applied to every customer
+            mode: Generation mode applied to every customer
+            resume: Continue an unfinished export of the same input and settings in directory
+            **exporter_options: Passed to the exporter, e.g. part_size
+            
+        Returns:
+            Dict of export statistics
+            
+        Raises:
+            ValueError: If directory holds a finished export, or one of a different
+                format, input or settings
+        """
+        run_fingerprint = hashlib.sha256(json.dumps({
+            "model_name": self.model_name,
+            "temperature": self.temperature,
+            "campaign_type": campaign_type,
+            "mode": mode,
+            "prompt_version": PROMPT_TEMPLATE_VERSION,
+            "prompt_variants": PROMPT_VARIANT_WEIGHTS
+        }, sort_keys=True).encode("utf-8")).hexdigest()
+        
+        with create_exporter(
+            directory, export_format, resume=resume, run_fingerprint=run_fingerprint, **exporter_options
+        ) as exporter:
+            profiles = iter(customer_profiles)
+            skip = exporter.completed_records
+            if skip:
+                exporter.verify_input(profile.customer_id for profile in itertools.islice(profiles, skip))
+                logger.info(f"Resuming export to {directory} after {skip} campaigns")
+            
+            for result in self.iter_campaigns(
+                profiles,
+                max_workers=max_workers,
+                campaign_type=campaign_type,
+                mode=mode,
+                start_index=skip
+            ):
+                exporter.write(result)
+        
+        return exporter.stats()
+    
+    async def agenerate_campaigns(
+        self,
+        customer_profiles: List[CustomerProfile],
+        max_concurrency: Optional[int] = None,
+        campaign_type: Optional[str] = None,
+        mode: Optional[str] = None,
+        cohort_analysis: bool = False
+    ) -> List[CampaignResult]:
+        """
+        Generate email campaigns for many customers on a single event loop
+        
+        Args:
+            customer_profiles: Customer profiles to generate campaigns for
+            max_concurrency: Maximum number of generations in flight
+                (defaults to ASYNC_MAX_CONCURRENCY)
+            campaign_type: Campaign type applied to every customer
+            mode: Generation mode applied to every customer
+            cohort_analysis: Analyse once per cohort, as for generate_campaigns
+            
+        Returns:
+            List of CampaignResult objects in the same order as the input
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or ASYNC_MAX_CONCURRENCY)
+        
+        cohort_insights = None
+        if cohort_analysis and self._mode_runs_analysis(campaign_type, mode):
+            cohorts = group_into_cohorts(customer_profiles)
+            logger.info(f"Analysing {len(cohorts)} cohorts instead of {len(customer_profiles)} customers")
+            
+            async def analyze_one(key):
+                async with semaphore:
+                    return await self.aanalyze_customer(cohort_profile(key, len(cohorts[key])))
+            
+            insights = await asyncio.gather(*[analyze_one(key) for key in cohorts], return_exceptions=True)
+            cohort_insights = dict(zip(cohorts, insights))
+        
+        async def generate_one(index, customer_profile):
+            async with semaphore:
+                try:
+                    if cohort_insights is None:
+                        campaign = await self.agenerate_campaign(customer_profile, campaign_type, mode)
+                    else:
+                        key = cohort_key(customer_profile)
+                        if isinstance(cohort_insights[key], Exception):
+                            raise cohort_insights[key]
+                        campaign = self._tag_cohort(await self.agenerate_campaign(
+                            customer_profile, campaign_type, mode, customer_insights=cohort_insights[key]
+                        ), key)
+                    return CampaignResult(
+                        index=index,
+                        customer_id=customer_profile.customer_id,
+                        campaign=campaign
+                    )
+                except Exception as e:
+                    return CampaignResult(
+                        index=index,
+                        customer_id=customer_profile.customer_id,
+                        error=str(e)
+                    )
+        
+        return await asyncio.gather(*[
+            generate_one(index, customer_profile)
+            for index, customer_profile in enumerate(customer_profiles)
+        ])
+    
+    def analyze_customer(self, customer_profile: CustomerProfile) -> str:
+        """
+        Run only the analysis stage for a profile
+        
+        Args:
+            customer_profile: Customer, or cohort representative, to analyse
+            
+        Returns:
+            Customer insights text
+        """
+        values = self._build_inputs(customer_profile)
+        self._run_stage("analysis", "customer_insights", values, StageMetrics())
+        return values["customer_insights"]
+    
+    async def aanalyze_customer(self, customer_profile: CustomerProfile) -> str:
+        """Async variant of analyze_customer"""
+        values = self._build_inputs(customer_profile)
+        await self._arun_stage("analysis", "customer_insights", values, StageMetrics())
+        return values["customer_insights"]
+    
+    def refine_email(self, email_draft: str, customer_name: str, tariff_type: str) -> str:
+        """
+        Run only the refinement stage on an existing draft
+        
+        Args:
+            email_draft: Email to refine
+            customer_name: Customer the email is addressed to
+            tariff_type: Customer's current tariff
+            
+        Returns:
+            Refined email text
+        """
+        values = {
+            "email_draft": email_draft,
+            "customer_name": customer_name,
+            "tariff_type": tariff_type,
+            "prompt_variants": {"refinement": EMAIL_REFINEMENT_PROMPT.name}
+        }
+        self._run_stage("refinement", "final_email", values, StageMetrics())
+        return values["final_email"]
+    
+    def _mode_runs_analysis(self, campaign_type=None, mode=None):
+        """Whether the resolved generation mode includes the analysis stage"""
+        return any(stage == "analysis" for stage, _ in self._stage_plan(self.generation_mode(campaign_type, mode)))
+    
+    @staticmethod
+    def _tag_cohort(campaign, key):
+        """Record the cohort whose shared insights a campaign used"""
+        campaign.metadata["insights_source"] = "cohort"
+        campaign.metadata["cohort"] = describe_cohort(key)
+        return campaign
+    
     def _extract_subject(self, email_text):
         """Extract the subject line from the generated email"""
         if "Subject:" in email_text:
@@ -1,10 +1,12 @@
-# prompts/base_templates.py
+# prompts/base_template.py
 
 """
 Base templates with versioning and A/B testing variations.
 These templates allow for systematic testing of different prompt approaches.
 """
 
+from prompts.registry import prompt_registry
+
 # Base template versions for customer analysis
 ANALYSIS_TEMPLATE_V1 = """
 Analyze the following customer data and provide insights for email personalization:
@@ -143,6 +145,15 @@ Improve the following aspects:
 The final email should be ready to send without further edits.
 """
 
+# Register every version so the workflow can serve them as A/B variants
+for _stage, _versions in {
+    "analysis": (ANALYSIS_TEMPLATE_V1, ANALYSIS_TEMPLATE_V2, ANALYSIS_TEMPLATE_V3),
+    "generation": (GENERATION_TEMPLATE_V1, GENERATION_TEMPLATE_V2, GENERATION_TEMPLATE_V3),
+    "refinement": (REFINEMENT_TEMPLATE_V1, REFINEMENT_TEMPLATE_V2, REFINEMENT_TEMPLATE_V3)
+}.items():
+    for _version, _template in enumerate(_versions, start=1):
+        prompt_registry.register(f"{_stage}_v{_version}", _template)
+
 # A/B testing variants for email subject lines
 SUBJECT_LINE_VARIANTS = {
     "savings_focused": "{customer_name}, Save {potential_savings}% on Your Energy Bills This Month",
@@ -161,11 +172,36 @@ CTA_VARIANTS = {
     "curiosity_based": "Discover How Much You Could Save"
 }
 
+# Subject lines and CTAs are compiled too, for template-only generation
+for _name, _template in SUBJECT_LINE_VARIANTS.items():
+    prompt_registry.register(f"subject_{_name}", _template)
+for _name, _template in CTA_VARIANTS.items():
+    prompt_registry.register(f"cta_{_name}", _template)
+
 # Functions to create template variations for testing
-def create_template_variation(base_template, subject_variant, cta_variant):
-    """Create a template variation with specific subject and CTA styles"""
-    return base_template.replace(
+def create_template_variation(base_name, subject_variant, cta_variant):
+    """
+    Create a variation of a registered template with specific subject and CTA styles.
+    Each variation is compiled and registered as '<base>__<subject>__<cta>' on first use,
+    so a test run compiles every base/variant combination once.
+    
+    Args:
+        base_name: Registered prompt containing [SUBJECT_VARIANT] and [CTA_VARIANT] markers
+        subject_variant: Key into SUBJECT_LINE_VARIANTS
+        cta_variant: Key into CTA_VARIANTS
+    
+    Returns:
+        The CompiledPrompt for the variation
+    """
+    name = f"{base_name}__{subject_variant}__{cta_variant}"
+    try:
+        return prompt_registry.get(name)
+    except KeyError:
+        pass
+    
+    template = prompt_registry.get(base_name).template.replace(
         "[SUBJECT_VARIANT]", SUBJECT_LINE_VARIANTS[subject_variant]
     ).replace(
         "[CTA_VARIANT]", CTA_VARIANTS[cta_variant]
-    )
\ No newline at end of file
+    )
+    return prompt_registry.register(name, template)
@@ -0,0 +1,232 @@
+# prompts/campaign_templates.py
+
+"""
+Email templates for each campaign type.
+
+MARKETER_TEMPLATES are the fill-in-the-blanks templates offered to marketers by
+the assistant agent. CAMPAIGN_BODY_TEMPLATES are skeletons for the same
+campaigns that only use CustomerProfile fields, so template-only and
+template-assisted generation can render a complete email without the full
+LLM workflow.
+"""
+
+from prompts.registry import prompt_registry
+
+# Templates shown to marketers, keyed by campaign type
+MARKETER_TEMPLATES = {
+    "new_plan": """
+                Subject: {customer_name}, Introducing Our New {plan_name} Plan!
+
+                Hi {customer_name},
+
+                We've just launched our new {plan_name} designed specifically for customers like you using around {energy_usage} kWh monthly.
+
+                This plan offers:
+                • {feature_1}
+                • {feature_2}
+                • {feature_3}
+
+                Based on your usage, you could save approximately {potential_savings}% compared to your current {tariff_type} tariff.
+
+                Ready to learn more? Check your personalized savings:
+
+                [Check My Savings]
+
+                The Octopus Energy Team
+            """,
+    "seasonal": """
+                Subject: Prepare for {season}, {customer_name} - Special Offer Inside
+
+                Hi {customer_name},
+
+                With {season} approaching, we've analyzed your {tariff_type} plan and found you could optimize your energy usage to save during the {season} months.
+
+                Our {season} {plan_name} offers:
+                • {seasonal_benefit_1}
+                • {seasonal_benefit_2}
+                • Up to {potential_savings}% savings
+
+                Your current usage of {energy_usage} kWh would cost less with our seasonal adjustments!
+
+                Take 2 minutes to switch before {deadline}:
+
+                [Switch to {Season} Plan]
+
+                Stay {warm/cool} and save,
+                Octopus Energy
+            """,
+    "retention": """
+                Subject: We'd Love You to Stay, {customer_name}
+
+                Hi {customer_name},
+
+                We noticed you've been with us on the {tariff_type} tariff for {duration}, and we wanted to thank you for choosing Octopus Energy.
+
+                To show our appreciation, we've prepared a special loyalty offer:
+                • {loyalty_benefit_1}
+                • {loyalty_benefit_2}
+                • An extra {loyalty_discount}% off your current rate
+
+                With your average usage of {energy_usage} kWh, this means approximately £{savings_amount} in additional savings annually.
+
+                Activate your loyalty rewards here:
+
+                [Claim My Loyalty Offer]
+
+                Thank you for being an amazing customer!
+                The Octopus Energy Team
+            """,
+    "winback": """
+                Subject: We've Missed You, {customer_name}
+
+                Hi {customer_name},
+
+                It's been {time_away} since you left Octopus Energy, and a lot has changed. Customers using around {energy_usage} kWh a month are now saving with our {plan_name} plan.
+
+                Come back and enjoy:
+                • {return_benefit_1}
+                • {return_benefit_2}
+                • Up to {potential_savings}% lower bills than your current supplier
+
+                Switching back takes just a few minutes, and we'll handle everything.
+
+                [Welcome Me Back]
+
+                Hope to see you soon,
+                The Octopus Energy Team
+            """,
+    "eco_focus": """
+                Subject: {customer_name}, Make Your Home Greener This Year
+
+                Hi {customer_name},
+
+                Your {energy_usage} kWh a month could be powered by 100% renewable electricity. Our {plan_name} plan helps you cut around {carbon_saving} of CO2 a year.
+
+                Going green with us means:
+                • {eco_benefit_1}
+                • {eco_benefit_2}
+                • Up to {potential_savings}% savings compared to your {tariff_type} tariff
+
+                [Go Green Today]
+
+                For a brighter future,
+                The Octopus Energy Team
+            """,
+    "smart_meter": """
+                Subject: {customer_name}, Your Free Smart Meter Is Waiting
+
+                Hi {customer_name},
+
+                A smart meter would show exactly where your {energy_usage} kWh a month goes, and unlock smart tariffs like {plan_name}.
+
+                With a smart meter you get:
+                • {smart_benefit_1}
+                • {smart_benefit_2}
+                • No more estimated bills
+
+                Installation is free and takes about {install_time}.
+
+                [Book My Installation]
+
+                The Octopus Energy Team
+            """
+}
+
+# Body skeletons rendered from CustomerProfile fields, keyed by campaign type.
+# {personal_paragraph} is either a fixed sentence or a short LLM-written paragraph.
+CAMPAIGN_BODY_TEMPLATES = {
+    "new_plan": """Hi {customer_name},
+
+{personal_paragraph}
+
+Our {recommended_plan} plan is designed for homes like yours using around {energy_usage} kWh a month:
+- Rates that suit how you use energy
+- 100% renewable electricity
+- Easy tracking in the Octopus app
+
+You could save around {potential_savings}% compared to your current {tariff_type} tariff.
+
+[{cta}]
+
+The Octopus Energy Team""",
+    "seasonal": """Hi {customer_name},
+
+{personal_paragraph}
+
+As the season changes, {recommended_plan} can help you stay comfortable for less:
+- Rates that follow your {peak_usage_time} usage
+- 100% renewable electricity
+- Up to {potential_savings}% off your {tariff_type} costs
+
+Your {energy_usage} kWh a month could cost less with a quick switch.
+
+[{cta}]
+
+Stay comfortable and save,
+The Octopus Energy Team""",
+    "retention": """Hi {customer_name},
+
+{personal_paragraph}
+
+Thank you for choosing Octopus Energy. To say thanks, we've found a better fit for you:
+- {recommended_plan}, matched to your {energy_usage} kWh a month
+- Around {potential_savings}% savings on your {tariff_type} costs
+- No exit fees, ever
+
+[{cta}]
+
+Thank you for being an amazing customer!
+The Octopus Energy Team""",
+    "winback": """Hi {customer_name},
+
+{personal_paragraph}
+
+A lot has changed since you left. Homes using around {energy_usage} kWh a month are now saving with {recommended_plan}:
+- Up to {potential_savings}% lower bills
+- 100% renewable electricity
+- Switching back takes minutes
+
+[{cta}]
+
+Hope to see you soon,
+The Octopus Energy Team""",
+    "eco_focus": """Hi {customer_name},
+
+{personal_paragraph}
+
+Your {energy_usage} kWh a month could be 100% renewable with {recommended_plan}:
+- Electricity from wind, solar and hydro
+- Around {potential_savings}% savings compared to your {tariff_type} tariff
+- Carbon tracking in the Octopus app
+
+[{cta}]
+
+For a brighter future,
+The Octopus Energy Team""",
+    "smart_meter": """Hi {customer_name},
+
+{personal_paragraph}
+
+A free smart meter shows exactly where your {energy_usage} kWh a month goes and unlocks {recommended_plan}:
+- Cheaper rates at your {peak_usage_time} peak
+- No more estimated bills
+- Up to {potential_savings}% savings on your {tariff_type} costs
+
+[{cta}]
+
+The Octopus Energy Team"""
+}
+
+# Personal paragraph used when no LLM call is made
+DEFAULT_PERSONAL_PARAGRAPH = (
+    "We've been looking at your {tariff_type} tariff and noticed you use most energy "
+    "in the {peak_usage_time}, so there's room to save."
+)
+
+CAMPAIGN_BODY_PROMPTS = {
+    campaign_type: prompt_registry.register(f"body_{campaign_type}", template)
+    for campaign_type, template in CAMPAIGN_BODY_TEMPLATES.items()
+}
+DEFAULT_PERSONAL_PARAGRAPH_PROMPT = prompt_registry.register(
+    "default_personal_paragraph", DEFAULT_PERSONAL_PARAGRAPH
+)
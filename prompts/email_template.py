@@ -1,4 +1,4 @@
-# prompts/email_templates.py
+# prompts/email_template.py
 
 """
 Specific prompt templates for each stage of the email generation workflow.
@@ -6,12 +6,20 @@ These templates are structured to extract the maximum value from the LLM
 while ensuring outputs meet our quality standards.
 """
 
+from prompts.registry import prompt_registry
 from prompts.system_prompts import ENERGY_MARKETING_EXPERT_PROMPT, OCTOPUS_BRAND_VOICE_PROMPT
 
+# Templates are compiled once by the prompt registry, with the system prompt and
+# brand voice bound as a shared prefix. Every stage starts with the same two blocks
+# so providers can serve that prefix from their prompt cache. Each *_TEMPLATE is
+# then rebound to the compiled form, which only contains the per-customer variables.
+
 # Template for analyzing customer data
 EMAIL_ANALYSIS_TEMPLATE = """
 {system_prompt}
 
+{brand_voice}
+
 ## TASK: ANALYZE CUSTOMER DATA FOR EMAIL PERSONALIZATION
 
 You'll be provided with customer data for an Octopus Energy user. Analyze this data to identify 
@@ -40,7 +48,14 @@ key insights that would help personalize a marketing email.
 - Suggest tone and approach based on their profile (e.g., data-driven, cost-conscious, eco-minded)
 
 Your analysis should be structured, evidence-based, and focused on actionable insights for email personalization.
-""".format(system_prompt=ENERGY_MARKETING_EXPERT_PROMPT)
+"""
+
+EMAIL_ANALYSIS_PROMPT = prompt_registry.register(
+    "email_analysis",
+    EMAIL_ANALYSIS_TEMPLATE,
+    partials={"system_prompt": ENERGY_MARKETING_EXPERT_PROMPT, "brand_voice": OCTOPUS_BRAND_VOICE_PROMPT}
+)
+EMAIL_ANALYSIS_TEMPLATE = EMAIL_ANALYSIS_PROMPT.template
 
 # Template for generating the initial email draft
 EMAIL_GENERATION_TEMPLATE = """
@@ -83,10 +98,14 @@ Using the customer insights provided, create a persuasive marketing email for an
 Subject: [Your subject line]
 
 [Email body with appropriate paragraphs, formatting and a single CTA]
-""".format(
-    system_prompt=ENERGY_MARKETING_EXPERT_PROMPT,
-    brand_voice=OCTOPUS_BRAND_VOICE_PROMPT
+"""
+
+EMAIL_GENERATION_PROMPT = prompt_registry.register(
+    "email_generation",
+    EMAIL_GENERATION_TEMPLATE,
+    partials={"system_prompt": ENERGY_MARKETING_EXPERT_PROMPT, "brand_voice": OCTOPUS_BRAND_VOICE_PROMPT}
 )
+EMAIL_GENERATION_TEMPLATE = EMAIL_GENERATION_PROMPT.template
 
 # Template for refining and optimizing the email
 EMAIL_REFINEMENT_TEMPLATE = """
@@ -124,7 +143,82 @@ this email to maximize engagement, clarity, and conversion potential.
 - Actionability: Is the CTA clear and compelling?
 
 Provide the completely refined email, ready to send.
-""".format(
-    system_prompt=ENERGY_MARKETING_EXPERT_PROMPT,
-    brand_voice=OCTOPUS_BRAND_VOICE_PROMPT
-)
\ No newline at end of file
+"""
+
+EMAIL_REFINEMENT_PROMPT = prompt_registry.register(
+    "email_refinement",
+    EMAIL_REFINEMENT_TEMPLATE,
+    partials={"system_prompt": ENERGY_MARKETING_EXPERT_PROMPT, "brand_voice": OCTOPUS_BRAND_VOICE_PROMPT}
+)
+EMAIL_REFINEMENT_TEMPLATE = EMAIL_REFINEMENT_PROMPT.template
+
+# Template that analyses the customer and writes the final email in one call
+EMAIL_COMBINED_TEMPLATE = """
+{system_prompt}
+
+{brand_voice}
+
+## TASK: ANALYSE CUSTOMER AND WRITE MARKETING EMAIL
+
+First, silently analyse this Octopus Energy customer's data for savings opportunities, the best-suited
+plan features and the right tone. Then write a send-ready, personalised marketing email based on that analysis.
+
+### CUSTOMER PROFILE:
+- Name: {customer_name}
+- Current Tariff: {tariff_type}
+- Monthly Energy Usage: {energy_usage} kWh
+- Location: {location}
+- Peak Usage Time: {peak_usage_time}
+- Potential Savings: {potential_savings}%
+- Recommended Plan: {recommended_plan}
+- Customer History: {customer_history}
+
+### EMAIL REQUIREMENTS:
+1. Attention-grabbing, personalized subject line (maximum 60 characters)
+2. Warm greeting and a reference to their usage patterns and potential savings
+3. One bulleted list of 3-4 benefits of the recommended plan, including renewable energy
+4. One clear call-to-action
+5. Total length 100-150 words, short scannable paragraphs
+
+### OUTPUT FORMAT:
+Subject: [Your subject line]
+
+[Email body]
+
+Return only the email, not the analysis.
+"""
+
+EMAIL_COMBINED_PROMPT = prompt_registry.register(
+    "email_combined",
+    EMAIL_COMBINED_TEMPLATE,
+    partials={"system_prompt": ENERGY_MARKETING_EXPERT_PROMPT, "brand_voice": OCTOPUS_BRAND_VOICE_PROMPT}
+)
+EMAIL_COMBINED_TEMPLATE = EMAIL_COMBINED_PROMPT.template
+
+# Template for the short personalised paragraph used in template-assisted generation
+PERSONAL_PARAGRAPH_TEMPLATE = """
+{system_prompt}
+
+{brand_voice}
+
+## TASK: WRITE PERSONALISED PARAGRAPH
+
+Write one short paragraph (2 sentences, under 40 words) that opens a marketing email to this
+Octopus Energy customer. The rest of the email is already written, so do not add a greeting,
+subject line, benefits list or call-to-action.
+
+### CUSTOMER PROFILE:
+- Name: {customer_name}
+- Current Tariff: {tariff_type}
+- Monthly Energy Usage: {energy_usage} kWh
+- Peak Usage Time: {peak_usage_time}
+- Customer History: {customer_history}
+
+Return only the paragraph.
+"""
+
+PERSONAL_PARAGRAPH_PROMPT = prompt_registry.register(
+    "personal_paragraph",
+    PERSONAL_PARAGRAPH_TEMPLATE,
+    partials={"system_prompt": ENERGY_MARKETING_EXPERT_PROMPT, "brand_voice": OCTOPUS_BRAND_VOICE_PROMPT}
+)
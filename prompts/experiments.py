@@ -0,0 +1,149 @@
+# prompts/experiments.py
+
+"""
+Traffic-split A/B serving of prompt variants.
+
+Each workflow stage has an experiment mapping registered prompt names to
+weights. A customer is assigned a variant by hashing their customer_id, so the
+same customer always sees the same variant for a given set of weights, and
+weights can be changed through configuration without touching the code.
+"""
+
+import hashlib
+import threading
+
+from config.settings import PROMPT_VARIANT_WEIGHTS
+from prompts.registry import prompt_registry
+import prompts.email_template  # noqa: F401 - registers the default stage prompts
+from prompts.base_template import SUBJECT_LINE_VARIANTS, CTA_VARIANTS
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Prompt served for each stage when no weights are configured
+DEFAULT_STAGE_PROMPTS = {
+    "analysis": "email_analysis",
+    "generation": "email_generation",
+    "refinement": "email_refinement"
+}
+
+
+class PromptExperiment:
+    """
+    Weighted assignment of units (customers) to prompt variants by consistent hashing.
+    """
+
+    def __init__(self, name, weights):
+        """
+        Args:
+            name: Experiment name, also used to salt the hash so stages split independently
+            weights: Dict mapping registered prompt names to relative weights
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self.set_weights(weights)
+
+    def set_weights(self, weights):
+        """
+        Replace the traffic split.
+
+        Raises:
+            ValueError: If weights is not a dict of numbers, no weight is positive
+                or a variant is not registered
+        """
+        if not isinstance(weights, dict):
+            raise ValueError(f"Experiment '{self.name}' weights must be an object mapping variants to weights")
+        try:
+            weights = {variant: float(weight) for variant, weight in weights.items()}
+        except (TypeError, ValueError):
+            raise ValueError(f"Experiment '{self.name}' weights must be numbers: {weights}") from None
+        weights = {variant: weight for variant, weight in weights.items() if weight > 0}
+        if not weights:
+            raise ValueError(f"Experiment '{self.name}' needs at least one variant with a positive weight")
+        for variant in weights:
+            try:
+                prompt_registry.get(variant)
+            except KeyError as e:
+                raise ValueError(str(e).strip("\"'")) from None
+
+        total = sum(weights.values())
+        # Cumulative bucket boundaries, in a fixed order so assignment is stable
+        boundaries, cumulative = [], 0.0
+        for variant in sorted(weights):
+            cumulative += weights[variant] / total
+            boundaries.append((cumulative, variant))
+        with self._lock:
+            self.weights = weights
+            self._boundaries = boundaries
+
+    def choose(self, unit_id):
+        """
+        Return the variant for a unit.
+
+        Args:
+            unit_id: Stable identifier, e.g. customer_id
+
+        Returns:
+            Name of the registered prompt to serve
+        """
+        digest = hashlib.sha256(f"{self.name}:{unit_id}".encode("utf-8")).digest()
+        bucket = int.from_bytes(digest[:8], "big") / 2 ** 64
+        with self._lock:
+            boundaries = self._boundaries
+        for boundary, variant in boundaries:
+            if bucket < boundary:
+                return variant
+        return boundaries[-1][1]
+
+
+def configured_experiment(name, default_weights):
+    """
+    Build an experiment from its PROMPT_VARIANT_WEIGHTS entry.
+
+    An invalid entry is logged and replaced by default_weights, so a bad
+    configuration cannot stop the application from starting.
+    """
+    weights = PROMPT_VARIANT_WEIGHTS.get(name)
+    if weights:
+        try:
+            return PromptExperiment(name, weights)
+        except ValueError as e:
+            logger.error(f"Ignoring PROMPT_VARIANT_WEIGHTS for '{name}': {e}")
+    return PromptExperiment(name, default_weights)
+
+
+# One experiment per workflow stage, configured by PROMPT_VARIANT_WEIGHTS
+prompt_experiments = {
+    stage: configured_experiment(stage, {default: 1})
+    for stage, default in DEFAULT_STAGE_PROMPTS.items()
+}
+
+
+# Subject line and CTA styles for template-based generation, split evenly unless configured
+template_experiments = {
+    "subject": configured_experiment("subject", {f"subject_{name}": 1 for name in SUBJECT_LINE_VARIANTS}),
+    "cta": configured_experiment("cta", {f"cta_{name}": 1 for name in CTA_VARIANTS})
+}
+
+
+def choose_template_variants(customer_id):
+    """
+    Pick the subject line and CTA variants for template-based generation.
+
+    Returns:
+        Dict with the registered prompt names under "subject" and "cta"
+    """
+    return {part: experiment.choose(customer_id) for part, experiment in template_experiments.items()}
+
+
+def choose_prompt_variants(customer_id):
+    """
+    Pick the prompt variant for every workflow stage.
+
+    Args:
+        customer_id: Customer the campaign is generated for
+
+    Returns:
+        Dict mapping stage name to registered prompt name
+    """
+    return {stage: experiment.choose(customer_id) for stage, experiment in prompt_experiments.items()}
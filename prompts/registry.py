@@ -0,0 +1,192 @@
+# prompts/registry.py
+
+"""
+Registry of precompiled prompt templates.
+
+Each template is parsed once, at registration, into a render plan: the static
+text segments and the variable slots between them. Partials such as the system
+prompt and brand voice are bound at compile time, so the text before the first
+slot is a fixed prefix shared by every render. Rendering is then a single join,
+with missing variables rejected before any text is produced.
+
+Rendered prompts carry the partials bound ahead of the first slot as
+cache_prefix, so callers can send that text separately and mark it for
+provider-side prompt caching.
+"""
+
+import string
+import threading
+import time
+
+_formatter = string.Formatter()
+
+
+def _format_field(value, conversion, format_spec):
+    """Apply a replacement field's conversion and format spec to a value"""
+    if conversion == "r":
+        value = repr(value)
+    elif conversion == "s":
+        value = str(value)
+    elif conversion == "a":
+        value = ascii(value)
+    return format(value, format_spec) if format_spec else str(value)
+
+
+def _escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class PromptText(str):
+    """
+    A rendered prompt that remembers its cacheable prefix.
+
+    Behaves as a plain string; cache_prefix is the leading text shared by every
+    render of prompts compiled with the same partials.
+    """
+
+    def __new__(cls, text, cache_prefix=""):
+        prompt = super().__new__(cls, text)
+        prompt.cache_prefix = cache_prefix
+        return prompt
+
+    @property
+    def suffix(self):
+        """The per-request text following the cacheable prefix"""
+        return self[len(self.cache_prefix):]
+
+    def __reduce__(self):
+        return (PromptText, (str(self), self.cache_prefix))
+
+
+class CompiledPrompt:
+    """
+    A prompt template compiled into static segments and variable slots.
+    """
+
+    def __init__(self, name, template, partials=None):
+        """
+        Args:
+            name: Name the prompt is registered under
+            template: str.format-style template
+            partials: Values bound at compile time, e.g. system prompt and brand voice
+        """
+        self.name = name
+        partials = partials or {}
+
+        # Plan entries are literal strings or (variable, conversion, format_spec) slots
+        plan = []
+        literal = []
+        shared_prefix = None
+        for text, field, format_spec, conversion in _formatter.parse(template):
+            literal.append(text)
+            if field is None:
+                continue
+            if field in partials:
+                literal.append(_format_field(partials[field], conversion, format_spec))
+                if not plan:
+                    # Partials bound before the first slot form the shared prefix
+                    shared_prefix = "".join(literal)
+                continue
+            if not field.isidentifier():
+                raise ValueError(f"Prompt '{name}' uses unsupported field '{{{field}}}'")
+            plan.append("".join(literal))
+            plan.append((field, conversion, format_spec))
+            literal = []
+        plan.append("".join(literal))
+
+        self._plan = [part for part in plan if part != ""]
+        self.input_variables = tuple(dict.fromkeys(
+            part[0] for part in self._plan if isinstance(part, tuple)
+        ))
+        # Static text before the first slot, identical for every render
+        self.prefix = self._plan[0] if self._plan and isinstance(self._plan[0], str) else ""
+        # Leading partials only, identical across prompts compiled with the same partials
+        self.cache_prefix = shared_prefix or ""
+        # Equivalent template with partials bound, for PromptTemplate and similar consumers
+        self.template = "".join(
+            _escape(part) if isinstance(part, str)
+            else "{" + part[0] + (f"!{part[1]}" if part[1] else "") + (f":{part[2]}" if part[2] else "") + "}"
+            for part in self._plan
+        )
+
+        self.render_count = 0
+        self.render_time_ms = 0.0
+        self._lock = threading.Lock()
+
+    def render(self, **values):
+        """
+        Render the prompt.
+
+        Args:
+            **values: Variable values; extra keys are ignored
+
+        Returns:
+            PromptText with the cacheable prefix attached
+
+        Raises:
+            KeyError: If any template variable is missing
+        """
+        missing = [variable for variable in self.input_variables if variable not in values]
+        if missing:
+            raise KeyError(f"Prompt '{self.name}' is missing variables: {', '.join(missing)}")
+
+        start = time.perf_counter()
+        rendered = PromptText("".join(
+            part if isinstance(part, str) else _format_field(values[part[0]], part[1], part[2])
+            for part in self._plan
+        ), self.cache_prefix)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.render_count += 1
+            self.render_time_ms += elapsed_ms
+        return rendered
+
+    def stats(self):
+        """Return render count and timing for this prompt"""
+        with self._lock:
+            return {
+                "renders": self.render_count,
+                "total_ms": round(self.render_time_ms, 3),
+                "avg_ms": round(self.render_time_ms / self.render_count, 4) if self.render_count else 0.0,
+                "prefix_chars": len(self.prefix),
+                "cache_prefix_chars": len(self.cache_prefix),
+                "input_variables": list(self.input_variables)
+            }
+
+
+class PromptRegistry:
+    """
+    Named collection of compiled prompts.
+    """
+
+    def __init__(self):
+        self._prompts = {}
+
+    def register(self, name, template, partials=None):
+        """
+        Compile a template and register it under a name.
+
+        Returns:
+            The CompiledPrompt
+        """
+        prompt = CompiledPrompt(name, template, partials)
+        self._prompts[name] = prompt
+        return prompt
+
+    def get(self, name):
+        """Return a compiled prompt by name"""
+        if name not in self._prompts:
+            raise KeyError(f"Unknown prompt '{name}'. Registered prompts: {', '.join(self._prompts)}")
+        return self._prompts[name]
+
+    def render(self, name, **values):
+        """Render a registered prompt"""
+        return self.get(name).render(**values)
+
+    def stats(self):
+        """Return render statistics for every registered prompt"""
+        return {name: prompt.stats() for name, prompt in self._prompts.items()}
+
+
+# Shared registry populated by the prompt modules at import time
+prompt_registry = PromptRegistry()
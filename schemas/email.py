@@ -37,6 +37,20 @@ class EmailCampaign(BaseModel):
             }
         }
 
+class CampaignResult(BaseModel):
+    """
+    Schema for a single item of a batch campaign generation.
+    Holds either the generated campaign or the error raised for that customer.
+    """
+    index: int
+    customer_id: Optional[str] = None
+    campaign: Optional[EmailCampaign] = None
+    error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
 
 # config/settings.py
 
@@ -0,0 +1,87 @@
+# schemas/evaluation.py
+
+from pydantic import BaseModel, Field, model_validator
+from typing import ClassVar, Optional
+
+class CriterionScore(BaseModel):
+    """
+    Score for a single evaluation criterion.
+    A bare number is accepted as the score.
+    """
+    score: float = Field(ge=0, le=10)
+    reason: Optional[str] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _bare_score(cls, data):
+        if isinstance(data, (int, float, str)):
+            return {"score": data}
+        return data
+
+class DimensionScores(BaseModel):
+    """
+    Base schema for the scores of one evaluation dimension.
+    Subclasses declare their criteria and the overall_key holding the dimension score.
+    If the overall score is missing, it is set to the mean of the criterion scores.
+    """
+    overall_key: ClassVar[Optional[str]] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _default_overall(cls, data):
+        if isinstance(data, dict) and data.get(cls.overall_key) is None:
+            scores = [
+                value.get("score") if isinstance(value, dict) else value
+                for name, value in data.items() if name in cls.model_fields and name != cls.overall_key
+            ]
+            scores = [score for score in scores if isinstance(score, (int, float))]
+            if scores:
+                data = {**data, cls.overall_key: round(sum(scores) / len(scores), 1)}
+        return data
+
+class ContentQualityScores(DimensionScores):
+    """Scores for the content_quality dimension"""
+    overall_key: ClassVar[str] = "overall_content_quality"
+    clarity: CriterionScore
+    conciseness: CriterionScore
+    grammar: CriterionScore
+    persuasiveness: CriterionScore
+    readability: CriterionScore
+    overall_content_quality: float = Field(ge=0, le=10)
+
+class BrandAlignmentScores(DimensionScores):
+    """Scores for the brand_alignment dimension"""
+    overall_key: ClassVar[str] = "overall_brand_alignment"
+    tone_alignment: CriterionScore
+    language_clarity: CriterionScore
+    brand_personality: CriterionScore
+    distinctiveness: CriterionScore
+    overall_brand_alignment: float = Field(ge=0, le=10)
+
+class PersonalizationScores(DimensionScores):
+    """Scores for the personalization dimension"""
+    overall_key: ClassVar[str] = "overall_personalization"
+    name_usage: CriterionScore
+    tariff_relevance: CriterionScore
+    specific_needs: CriterionScore
+    tailored_benefits: CriterionScore
+    personal_connection: CriterionScore
+    overall_personalization: float = Field(ge=0, le=10)
+
+class CTAEffectivenessScores(DimensionScores):
+    """Scores for the cta_effectiveness dimension"""
+    overall_key: ClassVar[str] = "overall_cta_effectiveness"
+    clarity: CriterionScore
+    prominence: CriterionScore
+    persuasiveness: CriterionScore
+    urgency: CriterionScore
+    value_proposition: CriterionScore
+    overall_cta_effectiveness: float = Field(ge=0, le=10)
+
+# Schema for each built-in evaluation dimension, keyed by result name
+DIMENSION_SCHEMAS = {
+    "content_quality": ContentQualityScores,
+    "brand_alignment": BrandAlignmentScores,
+    "personalization": PersonalizationScores,
+    "cta_effectiveness": CTAEffectivenessScores
+}
@@ -0,0 +1,395 @@
+# utils/cache.py
+
+"""
+Content-addressed response cache for LLM calls.
+
+Responses are keyed on a hash of the model name, temperature, rendered prompt
+and prompt template version, so byte-identical requests are served without
+calling the LLM again. Two backends are provided: an in-memory LRU and a
+disk-backed SQLite store. Both support TTL eviction and hit/miss counters.
+
+The response text is what gets cached. Cache hits are returned as
+CachedResponse objects that report zero token usage, since no tokens were spent.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import (
+    LLM_CACHE_BACKEND,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_PATH,
+    PROMPT_TEMPLATE_VERSION
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Sentinel distinguishing a cache miss from a cached None
+MISSING = object()
+
+
+class InMemoryLRUCache:
+    """
+    Thread-safe in-memory cache with least-recently-used and TTL eviction.
+    Values are stored as-is, so any Python object can be cached.
+    """
+
+    def __init__(self, max_entries=LLM_CACHE_MAX_ENTRIES, ttl_seconds=LLM_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        """Return the cached value for key, or default if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._is_expired(entry[1]):
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+
+            while self.max_entries and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Remove a key from the cache if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        """Remove every key starting with prefix and return how many were removed"""
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        """Remove all entries from the cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        return _build_stats("memory", self.hits, self.misses, self.evictions, len(self))
+
+    def _is_expired(self, stored_at):
+        return bool(self.ttl_seconds) and time.monotonic() - stored_at > self.ttl_seconds
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    Disk-backed cache stored in a single SQLite file with TTL eviction.
+    Values are stored as JSON, so the cache survives process restarts and only
+    JSON-serialisable values can be cached.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, table="llm_cache"):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key, default=MISSING):
+        """Return the cached value for key, or default if absent or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or self._is_expired(row[1]):
+                if row is not None:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.evictions += 1
+                self.misses += 1
+                return default
+
+            try:
+                value = json.loads(row[0])
+            except ValueError:
+                # Unreadable entries, e.g. from an older storage format, count as misses
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store a value, replacing any existing entry for key"""
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            self._conn.commit()
+
+    def delete(self, key):
+        """Remove a key from the cache if present"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def delete_prefix(self, prefix):
+        """Remove every key starting with prefix and return how many were removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        """Remove all entries from the cache"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def purge_expired(self):
+        """Delete all expired entries and return how many were removed"""
+        if not self.ttl_seconds:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+            self.evictions += cursor.rowcount
+            return cursor.rowcount
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        return _build_stats("sqlite", self.hits, self.misses, self.evictions, len(self))
+
+    def _is_expired(self, created_at):
+        return bool(self.ttl_seconds) and time.time() - created_at > self.ttl_seconds
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class CachedResponse(str):
+    """
+    A response served from the cache. Behaves as a plain string, exposes the text
+    as content like a chat model message, and reports zero token usage.
+    """
+
+    def __new__(cls, text):
+        response = super().__new__(cls, text)
+        response.usage_metadata = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "total_tokens": 0,
+            "input_token_details": {"cache_read": 0}
+        }
+        return response
+
+    @property
+    def content(self):
+        return str(self)
+
+
+def response_text(response):
+    """Return the text of an LLM response or stream chunk"""
+    return str(getattr(response, "content", response))
+
+
+class CachedLLM:
+    """
+    Wraps any LLM exposing invoke/ainvoke/stream with a response cache.
+    Attributes not defined here are delegated to the wrapped LLM.
+
+    Keyword arguments other than config, e.g. stop sequences, are part of the
+    cache key; config only carries callbacks and tracing, so it is passed
+    through without affecting the key.
+    """
+
+    def __init__(self, llm, cache, template_version=PROMPT_TEMPLATE_VERSION):
+        self.llm = llm
+        self.cache = cache
+        self.template_version = template_version
+
+    def cache_key(self, prompt, **kwargs):
+        """Hash the model settings, rendered prompt and call options into a cache key"""
+        return make_cache_key(
+            model_name=getattr(self.llm, "model_name", type(self.llm).__name__),
+            temperature=getattr(self.llm, "temperature", None),
+            prompt=prompt,
+            template_version=self.template_version,
+            options=kwargs
+        )
+
+    def invoke(self, prompt, config=None, **kwargs):
+        key = self.cache_key(prompt, **kwargs)
+        text = self.cache.get(key)
+        if text is not MISSING:
+            return CachedResponse(text)
+        response = self.llm.invoke(prompt, **_call_kwargs(config, kwargs))
+        self.cache.set(key, response_text(response))
+        return response
+
+    async def ainvoke(self, prompt, config=None, **kwargs):
+        key = self.cache_key(prompt, **kwargs)
+        text = self.cache.get(key)
+        if text is not MISSING:
+            return CachedResponse(text)
+        response = await self.llm.ainvoke(prompt, **_call_kwargs(config, kwargs))
+        self.cache.set(key, response_text(response))
+        return response
+
+    def stream(self, prompt, config=None, **kwargs):
+        """Replay a cached response word by word, or stream and cache it"""
+        key = self.cache_key(prompt, **kwargs)
+        text = self.cache.get(key)
+        if text is not MISSING:
+            for chunk in _REPLAY_CHUNK.findall(text):
+                yield CachedResponse(chunk)
+            return
+
+        chunks = []
+        for chunk in self.llm.stream(prompt, **_call_kwargs(config, kwargs)):
+            chunks.append(response_text(chunk))
+            yield chunk
+        self.cache.set(key, "".join(chunks))
+
+    def __getattr__(self, name):
+        # Guard against recursion before __init__ has set the wrapped LLM
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+
+# Words with their trailing whitespace, so the replayed chunks join back into the text
+_REPLAY_CHUNK = re.compile(r"\S+\s*|\s+")
+
+
+def _call_kwargs(config, kwargs):
+    """Forward config only when given, so LLMs without a config parameter still work"""
+    return kwargs if config is None else {**kwargs, "config": config}
+
+
+def make_cache_key(model_name, temperature, prompt, template_version, options=None):
+    """
+    Build a content-addressed cache key.
+
+    Args:
+        model_name: Name of the model serving the request
+        temperature: Sampling temperature
+        prompt: Rendered prompt (string or message list)
+        template_version: Version of the prompt templates in use
+        options: Call options that change the response, e.g. stop sequences
+
+    Returns:
+        str: SHA-256 hex digest identifying the request
+    """
+    payload = json.dumps({
+        "model_name": model_name,
+        "temperature": temperature,
+        "prompt": str(prompt),
+        "template_version": template_version,
+        "options": options or {}
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def create_cache(backend=LLM_CACHE_BACKEND):
+    """
+    Create a cache for the configured backend.
+
+    Args:
+        backend: "memory", "sqlite" or "none"
+
+    Returns:
+        Cache instance, or None if caching is disabled
+    """
+    if backend == "memory":
+        return InMemoryLRUCache()
+    elif backend == "sqlite":
+        return SQLiteCache()
+    elif backend in ("none", "", None):
+        return None
+    else:
+        raise ValueError(f"Unsupported cache backend: {backend}")
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Return the process-wide LLM response cache, creating it on first use"""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = create_cache()
+            if _llm_cache is not None:
+                logger.info(f"Using {LLM_CACHE_BACKEND} LLM response cache")
+        return _llm_cache
+
+
+def with_llm_cache(llm):
+    """Wrap an LLM with the process-wide response cache if caching is enabled"""
+    cache = get_llm_cache()
+    if cache is None:
+        return llm
+    return CachedLLM(llm, cache)
+
+
+def _build_stats(backend, hits, misses, evictions, size):
+    lookups = hits + misses
+    return {
+        "backend": backend,
+        "hits": hits,
+        "misses": misses,
+        "evictions": evictions,
+        "size": size,
+        "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+    }
@@ -0,0 +1,77 @@
+# utils/concurrency.py
+
+"""
+Helpers for running independent units of work concurrently with a bounded
+worker pool while keeping results in input order.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+
+def imap_bounded(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 4
+) -> Iterator[Tuple[int, Any, Optional[Exception]]]:
+    """
+    Apply a function to each item on a thread pool, yielding results in input order.
+
+    At most max_workers * 2 items are in flight at any time, so the input can be
+    a lazy iterator of arbitrary length. Exceptions raised by func are captured
+    per item instead of aborting the whole run.
+
+    Args:
+        func: Callable applied to each item
+        items: Iterable of inputs
+        max_workers: Maximum number of concurrent workers
+
+    Yields:
+        Tuple of (index, result, error) where exactly one of result/error is set
+    """
+    max_workers = max(1, int(max_workers))
+    window = max_workers * 2
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+
+        for index, item in enumerate(items):
+            pending.append((index, executor.submit(func, item)))
+
+            # Drain the oldest result once the window is full
+            if len(pending) >= window:
+                yield _collect(*pending.popleft())
+
+        while pending:
+            yield _collect(*pending.popleft())
+
+
+def map_bounded(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 4
+) -> List[Tuple[Any, Optional[Exception]]]:
+    """
+    Apply a function to each item on a thread pool and collect all results.
+
+    Args:
+        func: Callable applied to each item
+        items: Iterable of inputs
+        max_workers: Maximum number of concurrent workers
+
+    Returns:
+        List of (result, error) tuples in input order
+    """
+    return [
+        (result, error)
+        for _, result, error in imap_bounded(func, items, max_workers=max_workers)
+    ]
+
+
+def _collect(index, future):
+    """Wait for a future and split it into (index, result, error)"""
+    try:
+        return index, future.result(), None
+    except Exception as e:
+        return index, None, e
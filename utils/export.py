@@ -0,0 +1,360 @@
+# utils/export.py
+
+"""
+Streaming export of generated campaigns to gzip-compressed JSONL, CSV or Parquet.
+
+Campaigns are written as they complete, so memory use is bounded by one part
+file's buffer however many customers a run covers. Output is split into part
+files of at most part_size records. Each part is written under a temporary name
+and renamed once complete, then recorded in a manifest; an interrupted run
+leaves only completed parts behind, and resuming continues from the first
+record not in the manifest.
+
+The manifest starts with a header naming the format, part prefix and a
+fingerprint of the run's settings, and each part records a hash of the customer
+IDs it holds. A resume is refused if the header or the already-exported input
+differs, and a finished export is marked complete so it is never resumed.
+"""
+
+import csv
+import gzip
+import hashlib
+import itertools
+import json
+import os
+from abc import ABC, abstractmethod
+
+from config.settings import EXPORT_FORMAT, EXPORT_PART_SIZE, EXPORT_PARQUET_ROW_GROUP_SIZE
+from utils.logger import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+logger = get_logger(__name__)
+
+# Columns written for every campaign, in order
+CAMPAIGN_COLUMNS = [
+    "index", "customer_id", "error", "email_subject", "email_body", "model_used", "created_at", "metadata"
+]
+
+MANIFEST_NAME = "_manifest.jsonl"
+
+
+def campaign_record(result):
+    """
+    Flatten a CampaignResult into an export record.
+
+    Args:
+        result: CampaignResult from the workflow's batch generation
+
+    Returns:
+        Dict with a value for every column in CAMPAIGN_COLUMNS
+    """
+    campaign = result.campaign
+    return {
+        "index": result.index,
+        "customer_id": result.customer_id,
+        "error": result.error,
+        "email_subject": campaign.email_subject if campaign else None,
+        "email_body": campaign.email_body if campaign else None,
+        "model_used": campaign.model_used if campaign else None,
+        "created_at": campaign.created_at.isoformat() if campaign else None,
+        "metadata": campaign.metadata if campaign else None
+    }
+
+
+class CampaignExporter(ABC):
+    """
+    Base class for part-file campaign exporters.
+
+    Subclasses implement _open_part, _write_record and _close_part for one format.
+    """
+
+    extension = None
+
+    def __init__(self, directory, part_size=EXPORT_PART_SIZE, prefix="campaigns", resume=False,
+                 run_fingerprint=None):
+        """
+        Args:
+            directory: Output directory
+            part_size: Maximum records per part file
+            prefix: File name prefix of the part files
+            resume: Continue an unfinished export in directory rather than refusing to reuse it
+            run_fingerprint: Identifies the settings of the run; a resume must pass the same value
+
+        Raises:
+            ValueError: If directory holds an export that cannot be resumed by this run
+        """
+        self.directory = directory
+        self.part_size = max(1, int(part_size))
+        self.prefix = prefix
+        self.header = {"format": self.extension, "prefix": prefix, "run": run_fingerprint}
+        os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(self.manifest_path):
+            if not resume:
+                raise ValueError(f"{directory} already holds an export; pass resume=True or use a new directory")
+            self.parts = self._load_manifest()
+        else:
+            self.parts = []
+            self._append_manifest({"header": self.header})
+        self._discard_incomplete_parts()
+        # Records in completed parts, i.e. the input position to resume from
+        self.completed_records = sum(part["records"] for part in self.parts)
+        self.written = 0
+        self.errors = 0
+        self.complete = False
+        self._part = None
+        self._part_records = 0
+        self._part_first_index = None
+        self._part_last_index = None
+        self._part_input = None
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def verify_input(self, customer_ids):
+        """
+        Check that the input skipped on resume is the input already exported.
+
+        Args:
+            customer_ids: Customer IDs of the first completed_records input profiles
+
+        Raises:
+            ValueError: If they differ from the customer IDs recorded in the manifest
+        """
+        customer_ids = iter(customer_ids)
+        for part in self.parts:
+            digest = hashlib.sha256()
+            for customer_id in itertools.islice(customer_ids, part["records"]):
+                digest.update(f"{customer_id}\n".encode("utf-8"))
+            if digest.hexdigest() != part["input_sha256"]:
+                raise ValueError(
+                    f"Input differs from the customers exported to {part['part']}; use a new directory"
+                )
+
+    def write(self, result):
+        """Write one CampaignResult, completing the current part once it is full"""
+        if self._part is None:
+            self._start_part(result.index)
+        self._write_record(campaign_record(result))
+        self._part_input.update(f"{result.customer_id}\n".encode("utf-8"))
+        self._part_records += 1
+        self._part_last_index = result.index
+        self.written += 1
+        self.errors += int(result.error is not None)
+        if self._part_records >= self.part_size:
+            self._finish_part()
+
+    def close(self, complete=True):
+        """
+        Complete the current part, if any.
+
+        Args:
+            complete: Mark the export finished, so it is never resumed
+        """
+        if self._part is not None:
+            self._finish_part()
+        if complete and not self.complete:
+            self._append_manifest({"complete": True, "records": self.completed_records})
+            self.complete = True
+
+    def stats(self):
+        """Return record and part counts"""
+        return {
+            "directory": self.directory,
+            "records_written": self.written,
+            "errors": self.errors,
+            "total_records": self.completed_records,
+            "parts": len(self.parts),
+            "complete": self.complete
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # An export that raised is left unfinished so it can be resumed
+        self.close(complete=exc_type is None)
+
+    def _part_name(self, number):
+        return f"{self.prefix}-{number:05d}.{self.extension}"
+
+    def _start_part(self, first_index):
+        name = self._part_name(len(self.parts))
+        self._part = {"name": name, "path": os.path.join(self.directory, name)}
+        self._part_records = 0
+        self._part_first_index = first_index
+        self._part_input = hashlib.sha256()
+        self._open_part(self._part["path"] + ".tmp")
+
+    def _finish_part(self):
+        self._close_part()
+        os.replace(self._part["path"] + ".tmp", self._part["path"])
+        entry = {
+            "part": self._part["name"],
+            "records": self._part_records,
+            "first_index": self._part_first_index,
+            "last_index": self._part_last_index,
+            "input_sha256": self._part_input.hexdigest()
+        }
+        # The manifest is only appended once the part is in place, so it never lists a partial file
+        self._append_manifest(entry)
+        self.parts.append(entry)
+        self.completed_records += self._part_records
+        logger.info(f"Exported {entry['part']} ({entry['records']} campaigns)")
+        self._part = None
+
+    def _append_manifest(self, entry):
+        with open(self.manifest_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _load_manifest(self):
+        """Read the completed parts of an unfinished export made with the same header"""
+        parts = []
+        with open(self.manifest_path) as f:
+            try:
+                header = json.loads(f.readline()).get("header")
+            except (json.JSONDecodeError, AttributeError):
+                header = None
+            if header != self.header:
+                raise ValueError(
+                    f"{self.directory} holds an export with a different format or run settings; "
+                    f"use a new directory"
+                )
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line means its part was never recorded
+                    break
+                if entry.get("complete"):
+                    raise ValueError(f"{self.directory} holds a finished export; use a new directory")
+                parts.append(entry)
+        return parts
+
+    def _discard_incomplete_parts(self):
+        """Remove temporary files and parts missing from the manifest, left by an interrupted run"""
+        recorded = {part["part"] for part in self.parts}
+        for name in os.listdir(self.directory):
+            if name.startswith(f"{self.prefix}-") and name not in recorded:
+                logger.warning(f"Removing incomplete export part {name}")
+                os.remove(os.path.join(self.directory, name))
+
+    @abstractmethod
+    def _open_part(self, path):
+        """Open a part file for writing"""
+
+    @abstractmethod
+    def _write_record(self, record):
+        """Write one export record to the open part"""
+
+    @abstractmethod
+    def _close_part(self):
+        """Flush and close the open part"""
+
+
+class JSONLGzipExporter(CampaignExporter):
+    """Writes campaigns as gzip-compressed JSON lines"""
+
+    extension = "jsonl.gz"
+
+    def _open_part(self, path):
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    def _write_record(self, record):
+        self._file.write(json.dumps(record, default=str) + "\n")
+
+    def _close_part(self):
+        self._file.close()
+
+
+class CSVExporter(CampaignExporter):
+    """Writes campaigns as CSV, with metadata serialised as JSON"""
+
+    extension = "csv"
+
+    def _open_part(self, path):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=CAMPAIGN_COLUMNS)
+        self._writer.writeheader()
+
+    def _write_record(self, record):
+        self._writer.writerow({**record, "metadata": json.dumps(record["metadata"], default=str)})
+
+    def _close_part(self):
+        self._file.close()
+
+
+class ParquetExporter(CampaignExporter):
+    """
+    Writes campaigns as Parquet, with metadata serialised as JSON.
+    Records are buffered up to row_group_size before each row group is written.
+    """
+
+    extension = "parquet"
+
+    def __init__(self, directory, part_size=EXPORT_PART_SIZE, prefix="campaigns",
+                 row_group_size=EXPORT_PARQUET_ROW_GROUP_SIZE, **kwargs):
+        if pa is None:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+        self.row_group_size = max(1, int(row_group_size))
+        self.schema = pa.schema([
+            ("index", pa.int64()),
+            ("customer_id", pa.string()),
+            ("error", pa.string()),
+            ("email_subject", pa.string()),
+            ("email_body", pa.string()),
+            ("model_used", pa.string()),
+            ("created_at", pa.string()),
+            ("metadata", pa.string())
+        ])
+        super().__init__(directory, part_size, prefix, **kwargs)
+
+    def _open_part(self, path):
+        self._writer = pq.ParquetWriter(path, self.schema, compression="snappy")
+        self._rows = []
+
+    def _write_record(self, record):
+        self._rows.append({**record, "metadata": json.dumps(record["metadata"], default=str)})
+        if len(self._rows) >= self.row_group_size:
+            self._flush_rows()
+
+    def _flush_rows(self):
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def _close_part(self):
+        self._flush_rows()
+        self._writer.close()
+
+
+EXPORTERS = {
+    "jsonl.gz": JSONLGzipExporter,
+    "csv": CSVExporter,
+    "parquet": ParquetExporter
+}
+
+
+def create_exporter(directory, export_format=EXPORT_FORMAT, **kwargs):
+    """
+    Create a campaign exporter for an output format.
+
+    Args:
+        directory: Output directory
+        export_format: "jsonl.gz", "csv" or "parquet"
+        **kwargs: Passed to the exporter, e.g. part_size, resume or run_fingerprint
+
+    Returns:
+        CampaignExporter
+    """
+    if export_format not in EXPORTERS:
+        raise ValueError(f"Unsupported export format: {export_format}. Choose from: {', '.join(EXPORTERS)}")
+    return EXPORTERS[export_format](directory, **kwargs)
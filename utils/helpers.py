@@ -21,6 +21,23 @@ def extract_subject_line(email_text: str) -> str:
         return match.group(1).strip()
     return "Special Offer from Octopus Energy"  # Default subject
 
+def estimate_token_count(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in a piece of text.
+    
+    Uses the common approximation of ~4 characters per token, which is close
+    enough for latency and cost accounting when the provider reports no usage.
+    
+    Args:
+        text: Prompt or completion text
+        
+    Returns:
+        int: Estimated token count
+    """
+    if not text:
+        return 0
+    return max(1, round(len(text) / 4))
+
 def parse_customer_data(customer_text: str) -> Dict[str, Any]:
     """
     Parse customer data from structured text input.
@@ -0,0 +1,293 @@
+# utils/ingestion.py
+
+"""
+Streaming ingestion of customer records from CSV, JSONL or JSON files.
+
+Files are read lazily, optionally gzip-compressed, and records are validated
+into CustomerProfile objects a chunk at a time, so memory use does not grow
+with file size. Rows that fail to parse or validate are recorded in an
+IngestionReport and skipped rather than aborting the run. The profile
+generator can be passed straight to EmailCampaignWorkflow.iter_campaigns or
+export_campaigns.
+"""
+
+import csv
+import gzip
+import json
+import re
+import threading
+
+from pydantic import ValidationError
+
+from config.settings import INGESTION_CHUNK_SIZE, INGESTION_MAX_REPORTED_BAD_ROWS
+from schemas.customer import CustomerProfile
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FORMATS_BY_EXTENSION = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".json": "json"
+}
+
+# Whitespace and commas between the elements of a JSON array
+_ARRAY_SEPARATORS = re.compile(r"[\s,]*")
+_JSON_READ_CHARS = 64 * 1024
+
+
+def detect_format(path):
+    """
+    Infer the record format from a file name, ignoring a trailing .gz.
+
+    Returns:
+        "csv", "jsonl" or "json"
+    """
+    name = path[:-3] if path.endswith(".gz") else path
+    for extension, file_format in FORMATS_BY_EXTENSION.items():
+        if name.endswith(extension):
+            return file_format
+    raise ValueError(f"Cannot infer the format of {path}; expected one of: {', '.join(FORMATS_BY_EXTENSION)}")
+
+
+def open_text(path):
+    """
+    Open a file for text reading, decompressing .gz files on the fly.
+    A leading byte order mark is dropped, so it does not end up in the first CSV header.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, "r", encoding="utf-8-sig", newline="")
+
+
+class IngestionReport:
+    """
+    Counts of rows read, accepted and rejected during ingestion.
+
+    The first max_reported bad rows are kept with their errors; the rest are
+    only counted, so the report stays small for any file size.
+    """
+
+    def __init__(self, max_reported=INGESTION_MAX_REPORTED_BAD_ROWS):
+        self.max_reported = max_reported
+        self.rows_read = 0
+        self.valid = 0
+        self.invalid = 0
+        self.bad_rows = []
+        self._lock = threading.Lock()
+
+    def record_valid(self):
+        with self._lock:
+            self.rows_read += 1
+            self.valid += 1
+
+    def record_invalid(self, row, error):
+        """
+        Record a rejected row.
+
+        Args:
+            row: Line or element number of the row in the source file
+            error: Description of why it was rejected
+        """
+        with self._lock:
+            self.rows_read += 1
+            self.invalid += 1
+            if len(self.bad_rows) < self.max_reported:
+                self.bad_rows.append({"row": row, "error": error})
+
+    def stats(self):
+        """Return row counts and the reported bad rows"""
+        with self._lock:
+            return {
+                "rows_read": self.rows_read,
+                "valid": self.valid,
+                "invalid": self.invalid,
+                "bad_rows": list(self.bad_rows)
+            }
+
+
+def _iter_csv(handle):
+    reader = csv.DictReader(handle)
+    for record in reader:
+        if None in record:
+            yield reader.line_num, None, "More values than header columns"
+            continue
+        # Empty cells are missing values, so optional fields fall back to None
+        yield reader.line_num, {key: value for key, value in record.items() if value not in ("", None)}, None
+
+
+def _iter_jsonl(handle):
+    for line_number, line in enumerate(handle, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e.msg}"
+
+
+def _element_end(buffer, start):
+    """
+    Find the end of the array element starting at start, without decoding it.
+
+    Braces are balanced, ignoring those inside strings, so a malformed element is
+    skipped up to the next top-level separator or object.
+
+    Returns:
+        Position just past the element, or None if it runs past the end of buffer
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(buffer)):
+        char = buffer[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            if depth == 0 and index > start:
+                return index
+            depth += 1
+        elif char == "}":
+            depth = max(depth - 1, 0)
+            if depth == 0:
+                return index + 1
+        elif char in ",]" and depth == 0:
+            return index
+    return None
+
+
+def _iter_json_array(handle):
+    """
+    Decode the elements of a top-level JSON array one at a time.
+
+    Only the text of the element being decoded is buffered. A malformed element
+    is reported and skipped, and decoding resumes at the next element.
+    """
+    decoder = json.JSONDecoder()
+    buffer = handle.read(_JSON_READ_CHARS).lstrip()
+    if not buffer.startswith("["):
+        yield 1, None, "Expected a JSON array of customer records"
+        return
+    position = 1
+    element = 0
+    eof = False
+    while True:
+        position = _ARRAY_SEPARATORS.match(buffer, position).end()
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+            error = None
+        except json.JSONDecodeError as e:
+            record, error = None, e
+            end = _element_end(buffer, position)
+        # An element reaching the end of the buffer may just be cut off by the read
+        if not eof and (end is None or end >= len(buffer)):
+            chunk = handle.read(_JSON_READ_CHARS)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        element += 1
+        if error is not None:
+            yield element, None, f"Invalid JSON: {error.msg}"
+            if end is None:
+                return
+        else:
+            yield element, record, None
+        position = end
+
+
+_READERS = {
+    "csv": _iter_csv,
+    "jsonl": _iter_jsonl,
+    "json": _iter_json_array
+}
+
+
+def iter_records(path, file_format=None):
+    """
+    Lazily read raw records from a file.
+
+    Args:
+        path: CSV, JSONL or JSON array file, optionally gzip-compressed
+        file_format: "csv", "jsonl" or "json" (inferred from the name by default)
+
+    Yields:
+        Tuple of (row number, record dict or None, parse error or None)
+    """
+    file_format = file_format or detect_format(path)
+    if file_format not in _READERS:
+        raise ValueError(f"Unsupported ingestion format: {file_format}")
+    with open_text(path) as handle:
+        yield from _READERS[file_format](handle)
+
+
+def _validate(row, record, error, report):
+    """Validate one raw record into a CustomerProfile, or record why it was rejected"""
+    if error is None and not isinstance(record, dict):
+        error = "Record is not an object"
+    if error is None:
+        try:
+            profile = CustomerProfile.model_validate(record)
+            report.record_valid()
+            return profile
+        except ValidationError as e:
+            error = "; ".join(
+                f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in e.errors()
+            )
+    report.record_invalid(row, error)
+    return None
+
+
+def iter_profile_chunks(path, chunk_size=INGESTION_CHUNK_SIZE, file_format=None, report=None):
+    """
+    Read and validate customer profiles a chunk at a time.
+
+    Args:
+        path: Source file
+        chunk_size: Maximum profiles per chunk
+        file_format: "csv", "jsonl" or "json" (inferred from the name by default)
+        report: IngestionReport collecting counts and bad rows
+
+    Yields:
+        Lists of up to chunk_size valid CustomerProfile objects
+    """
+    report = report if report is not None else IngestionReport()
+    chunk = []
+    for row, record, error in iter_records(path, file_format):
+        profile = _validate(row, record, error, report)
+        if profile is not None:
+            chunk.append(profile)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+    if report.invalid:
+        logger.warning(f"Skipped {report.invalid} of {report.rows_read} customer records in {path}")
+
+
+def iter_customer_profiles(path, chunk_size=INGESTION_CHUNK_SIZE, file_format=None, report=None):
+    """
+    Stream valid customer profiles from a file.
+
+    Args:
+        path: Source file
+        chunk_size: Records validated per chunk
+        file_format: "csv", "jsonl" or "json" (inferred from the name by default)
+        report: IngestionReport collecting counts and bad rows
+
+    Yields:
+        CustomerProfile objects in file order, skipping bad rows
+    """
+    for chunk in iter_profile_chunks(path, chunk_size, file_format, report):
+        yield from chunk
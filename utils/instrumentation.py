@@ -0,0 +1,96 @@
+# utils/instrumentation.py
+
+"""
+Per-stage timing and token accounting for the generation workflow.
+"""
+
+import time
+from contextlib import contextmanager
+
+from utils.helpers import estimate_token_count
+
+
+class StageMetrics:
+    """
+    Collects wall-clock time and token counts for each stage of a generation.
+    Timings use a monotonic clock, so they are unaffected by system clock changes.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block and record it under the given stage name"""
+        entry = self._entry(name)
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["time_ms"] = round(entry["time_ms"] + (time.perf_counter() - start) * 1000, 2)
+
+    def record_tokens(self, name, prompt=None, completion=None, prompt_tokens=None, completion_tokens=None,
+                      cached_prompt_tokens=0):
+        """
+        Record token usage for a stage.
+
+        Provider-reported counts are used when given, otherwise the counts are
+        estimated from the prompt and completion text. cached_prompt_tokens is the
+        part of the prompt the provider served from its prompt cache.
+        """
+        entry = self._entry(name)
+        entry["cached_prompt_tokens"] += cached_prompt_tokens or 0
+        entry["prompt_tokens"] += (
+            prompt_tokens if prompt_tokens is not None else estimate_token_count(str(prompt or ""))
+        )
+        entry["completion_tokens"] += (
+            completion_tokens if completion_tokens is not None else estimate_token_count(str(completion or ""))
+        )
+
+    def _entry(self, name):
+        return self.stages.setdefault(name, {
+            "time_ms": 0.0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0
+        })
+
+    def as_metadata(self):
+        """
+        Summarize the collected metrics for EmailCampaign.metadata.
+
+        Returns:
+            Dict with total generation time, token totals and a per-stage breakdown
+        """
+        prompt_tokens = sum(stage["prompt_tokens"] for stage in self.stages.values())
+        completion_tokens = sum(stage["completion_tokens"] for stage in self.stages.values())
+        cached_prompt_tokens = sum(stage["cached_prompt_tokens"] for stage in self.stages.values())
+        return {
+            "generation_time_ms": round((time.perf_counter() - self._started) * 1000, 2),
+            "token_count": prompt_tokens + completion_tokens,
+            "prompt_tokens": prompt_tokens,
+            "cached_prompt_tokens": cached_prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "stages": {name: dict(stage) for name, stage in self.stages.items()}
+        }
+
+
+def reported_token_usage(response):
+    """
+    Extract provider-reported (prompt_tokens, completion_tokens) from an LLM response.
+
+    Returns (None, None) when the response carries no usage, e.g. plain strings
+    from MockLLM, so callers fall back to estimates.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens"), usage.get("output_tokens")
+    return None, None
+
+
+def reported_cached_tokens(response):
+    """
+    Extract the number of prompt tokens the provider read from its prompt cache.
+
+    Returns 0 when the response does not report cache reads.
+    """
+    usage = getattr(response, "usage_metadata", None) or {}
+    return (usage.get("input_token_details") or {}).get("cache_read") or 0
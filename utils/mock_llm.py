@@ -1,29 +1,219 @@
 # utils/mock_llm.py
 
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import (
+    MOCK_LLM_LATENCY_MS, MOCK_LLM_TOKEN_LATENCY_MS, MOCK_LLM_STREAM_DELAY_MS,
+    MOCK_LLM_PROMPT_TOKEN_LATENCY_MS, MOCK_LLM_CACHED_PREFIX_DISCOUNT
+)
+from utils.helpers import estimate_token_count
+
+# Phrases identifying each workflow stage across the default and V1-V3 prompt variants
+ANALYSIS_MARKERS = ("analyze customer data", "analyze the following customer data",
+                    "energy marketing analyst", "customer analysis task")
+GENERATION_MARKERS = ("generate personalized marketing email", "create a marketing email",
+                      "write a personalized email", "email generation task")
+REFINEMENT_MARKERS = ("optimize and refine", "improve this marketing email draft",
+                      "refine this octopus energy email draft", "email refinement task")
+
+# Number of distinct prompt prefixes the simulated provider cache holds
+PREFIX_CACHE_SIZE = 256
+
+
+class MockResponse(str):
+    """
+    A mock completion. Behaves as a plain string and carries usage_metadata in
+    the same shape LangChain chat models report it.
+    """
+
+    def __new__(cls, text, usage_metadata=None):
+        response = super().__new__(cls, text)
+        response.usage_metadata = usage_metadata or {}
+        return response
+
+    def __reduce__(self):
+        return (MockResponse, (str(self), self.usage_metadata))
+
+
 class MockLLM:
     """
     Mock LLM implementation that simulates responses without requiring API access.
     For demonstration and testing purposes only.
     """
     
-    def __init__(self, model_name="mock-gpt-4", temperature=0.7):
+    def __init__(self, model_name="mock-gpt-4", temperature=0.7, latency_ms=None,
+                 token_latency_ms=None, stream_delay_ms=None, prompt_token_latency_ms=None,
+                 cached_prefix_discount=None):
         self.model_name = model_name
         self.temperature = temperature
+        # Simulated round-trip latency per call, used to benchmark concurrency offline
+        self.latency_ms = MOCK_LLM_LATENCY_MS if latency_ms is None else latency_ms
+        # Simulated generation time per completion token, so latency scales with output size
+        self.token_latency_ms = MOCK_LLM_TOKEN_LATENCY_MS if token_latency_ms is None else token_latency_ms
+        # Simulated delay between streamed chunks
+        self.stream_delay_ms = MOCK_LLM_STREAM_DELAY_MS if stream_delay_ms is None else stream_delay_ms
+        # Simulated prompt processing time per input token
+        self.prompt_token_latency_ms = (
+            MOCK_LLM_PROMPT_TOKEN_LATENCY_MS if prompt_token_latency_ms is None else prompt_token_latency_ms
+        )
+        # Cost and latency multiplier for prompt tokens served from the prefix cache
+        self.cached_prefix_discount = (
+            MOCK_LLM_CACHED_PREFIX_DISCOUNT if cached_prefix_discount is None else cached_prefix_discount
+        )
+        # Simulated provider-side prompt cache of recently seen prefixes
+        self._prefix_cache = OrderedDict()
+        self._usage = {"calls": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0}
+        self._lock = threading.Lock()
         
     def invoke(self, prompt):
         """
         Simulate an LLM response based on the content of the prompt.
         In a real implementation, this would call the actual LLM API.
         """
-        if "analyze customer data" in prompt.lower():
+        response = self._complete(prompt)
+        delay_ms = self._simulated_latency_ms(response)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        return response
+    
+    async def ainvoke(self, prompt):
+        """
+        Async variant of invoke. Simulated latency is awaited rather than slept,
+        so many calls can be in flight on a single event loop.
+        """
+        response = self._complete(prompt)
+        delay_ms = self._simulated_latency_ms(response)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        return response
+    
+    def stream(self, prompt):
+        """
+        Simulate a streamed LLM response, yielding the reply one word at a time.
+        Joining all chunks reproduces the output of invoke for the same prompt.
+        """
+        for chunk in re.findall(r"\S+\s*|\s+", self._respond(self._prompt_text(prompt)[0])):
+            if self.stream_delay_ms > 0:
+                time.sleep(self.stream_delay_ms / 1000)
+            yield chunk
+    
+    def _simulated_latency_ms(self, response):
+        """
+        Fixed round-trip latency plus prompt processing and generation time.
+        Prompt tokens read from the prefix cache are charged at the discounted rate.
+        """
+        usage = response.usage_metadata
+        cached_tokens = usage["input_token_details"]["cache_read"]
+        prompt_cost = (usage["input_tokens"] - cached_tokens) + cached_tokens * self.cached_prefix_discount
+        return (
+            self.latency_ms
+            + self.prompt_token_latency_ms * prompt_cost
+            + self.token_latency_ms * usage["output_tokens"]
+        )
+    
+    def _complete(self, prompt):
+        """Produce the canned response with simulated token usage, including prefix cache reads"""
+        text, prefix = self._prompt_text(prompt)
+        response = self._respond(text)
+        
+        prompt_tokens = estimate_token_count(text)
+        completion_tokens = estimate_token_count(response)
+        cached_tokens = estimate_token_count(prefix) if prefix and self._prefix_cache_lookup(prefix) else 0
+        
+        with self._lock:
+            self._usage["calls"] += 1
+            self._usage["prompt_tokens"] += prompt_tokens
+            self._usage["cached_prompt_tokens"] += cached_tokens
+            self._usage["completion_tokens"] += completion_tokens
+        
+        return MockResponse(response, {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "input_token_details": {"cache_read": cached_tokens}
+        })
+    
+    def _prefix_cache_lookup(self, prefix):
+        """Return True if the prefix was cached; a miss writes it to the cache"""
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._prefix_cache:
+                self._prefix_cache.move_to_end(key)
+                return True
+            self._prefix_cache[key] = True
+            if len(self._prefix_cache) > PREFIX_CACHE_SIZE:
+                self._prefix_cache.popitem(last=False)
+            return False
+    
+    @staticmethod
+    def _prompt_text(prompt):
+        """
+        Flatten a prompt into (text, cacheable prefix).
+        
+        Accepts plain strings, rendered prompts carrying cache_prefix, and chat
+        message lists, where system messages form the cacheable prefix.
+        """
+        if isinstance(prompt, str):
+            return prompt, getattr(prompt, "cache_prefix", "")
+        
+        parts, prefix = [], []
+        for message in prompt:
+            content = getattr(message, "content", message)
+            if isinstance(content, list):
+                content = "".join(block.get("text", "") for block in content if isinstance(block, dict))
+            parts.append(str(content))
+            if getattr(message, "type", None) == "system":
+                prefix.append(str(content))
+        return "".join(parts), "".join(prefix)
+    
+    def usage_stats(self):
+        """
+        Return simulated token usage, including the share of prompt tokens read from
+        the prefix cache and the prompt tokens billed after the cache discount.
+        """
+        with self._lock:
+            usage = dict(self._usage)
+        uncached = usage["prompt_tokens"] - usage["cached_prompt_tokens"]
+        usage["billed_prompt_tokens"] = round(uncached + usage["cached_prompt_tokens"] * self.cached_prefix_discount, 1)
+        usage["prefix_cache_hit_rate"] = (
+            round(usage["cached_prompt_tokens"] / usage["prompt_tokens"], 4) if usage["prompt_tokens"] else 0.0
+        )
+        return usage
+    
+    def _respond(self, prompt):
+        """Select the canned response matching the prompt"""
+        lowered = prompt.lower()
+        if "evaluation criteria" in lowered:
+            return self._generate_evaluation(prompt)
+        elif "analyse customer and write marketing email" in lowered:
+            return self._generate_refined_email()
+        elif "write personalised paragraph" in lowered:
+            return self._generate_personal_paragraph()
+        elif any(marker in lowered for marker in ANALYSIS_MARKERS):
             return self._generate_customer_analysis()
-        elif "generate personalized marketing email" in prompt.lower():
+        elif any(marker in lowered for marker in GENERATION_MARKERS):
             return self._generate_email_draft()
-        elif "optimize and refine" in prompt.lower():
+        elif any(marker in lowered for marker in REFINEMENT_MARKERS):
             return self._generate_refined_email()
         else:
             return "This is a simulated response. In production, this would connect to an actual LLM API."
     
+    def _generate_evaluation(self, prompt):
+        """
+        Generate a mock evaluator response by filling in the JSON skeleton
+        requested by the evaluation prompt with fixed scores.
+        """
+        start = prompt.find("{\n", prompt.lower().rfind("json"))
+        skeleton = prompt[start:] if start != -1 else "{}"
+        skeleton = re.sub(r"\b(score|reason):", r'"\1":', skeleton)
+        skeleton = re.sub(r'("score":\s*|:\s*)X\b', r"\g<1>8", skeleton)
+        return skeleton.strip()
+    
     def _generate_customer_analysis(self):
         """Generate a mock customer analysis response"""
         return """
@@ -48,6 +238,13 @@ Recommended messaging angles:
 Suggested tone: Data-driven but friendly, emphasizing both practical benefits and environmental impact.
         """
     
+    def _generate_personal_paragraph(self):
+        """Generate a mock personalised opening paragraph"""
+        return (
+            "You use most of your energy in the evenings, so your Standard Variable tariff "
+            "isn't doing you any favours. A few small changes could make a real difference."
+        )
+    
     def _generate_email_draft(self):
         """Generate a mock email draft response"""
         return """